@@ -1,6 +1,6 @@
 # app/__init__.py
 from __future__ import annotations
-import os, secrets
+import os, secrets, time
 import logging
 import click
 from flask import Flask
@@ -88,6 +88,37 @@ def create_app() -> Flask:
     )
     app.config.setdefault("SQLALCHEMY_TRACK_MODIFICATIONS", False)
     app.config.setdefault("GAME24_WARMUP", True)
+    # Which generated puzzle set the store plays (content_json["dataset"], see game24-build-dataset)
+    app.config.setdefault("GAME24_DATASET", None)
+    # Precomputed (hand, target) table; default <instance>/game24_solution_table.json.gz
+    app.config.setdefault("GAME24_SOLUTION_TABLE", None)
+    # Binary store snapshot workers boot from; default <instance>/game24_store.snapshot, False disables
+    app.config.setdefault("GAME24_STORE_SNAPSHOT", None)
+    # How often (seconds) each worker checks for puzzle changes made elsewhere; 0 disables
+    app.config.setdefault("GAME24_STORE_CHECK_SECONDS", 5)
+    # Shared file writers touch after committing; unset = poll the DB watermark instead
+    app.config.setdefault("GAME24_STORE_VERSION_FILE", None)
+    # Recursive solver memo bounds (entries / approximate bytes per worker)
+    app.config.setdefault("GAME24_SOLVER_CACHE_SIZE", 50_000)
+    app.config.setdefault("GAME24_SOLVER_CACHE_BYTES", 32 * 1024 * 1024)
+    # Subset-DP reachable-value memo for 5-6 card hands (entries / approximate bytes per process)
+    app.config.setdefault("GAME24_REACHABLE_CACHE_SIZE", 8192)
+    app.config.setdefault("GAME24_REACHABLE_CACHE_BYTES", 32 * 1024 * 1024)
+    # /api/check verdicts per (answer, hand, target, operator set)
+    app.config.setdefault("GAME24_CHECK_CACHE_SIZE", 50_000)
+    # Items per /api/check/batch request (streamed, so this bounds work, not memory)
+    app.config.setdefault("GAME24_BATCH_MAX_ITEMS", 20_000)
+    # Case ids per /api/pool/query answer (custom / competition pool builder)
+    app.config.setdefault("GAME24_POOL_QUERY_MAX", 500)
+    # On-demand solves of request-supplied hands (see games/core/solver_service.py)
+    app.config.setdefault("GAME24_SOLVER_MAX_CARDS", 6)
+    app.config.setdefault("GAME24_SOLVER_MAX_VALUE", 100)
+    app.config.setdefault("GAME24_SOLVER_MAX_TARGET", 100_000)
+    app.config.setdefault("GAME24_SOLVER_INLINE_CARDS", 4)     # larger hands go to the process pool
+    app.config.setdefault("GAME24_SOLVER_STEP_BUDGET", 250_000)
+    app.config.setdefault("GAME24_SOLVER_TIMEOUT", 5.0)        # seconds
+    app.config.setdefault("GAME24_SOLVER_WORKERS", 2)
+    app.config.setdefault("GAME24_SOLVER_MAX_PENDING", 8)
 
     if not app.config.get("SQLALCHEMY_DATABASE_URI"):
         raise RuntimeError(
@@ -186,6 +217,19 @@ def create_app() -> Flask:
     # Auto-discover and register any additional games under app/games/*
     _auto_register_game_blueprints(app)
 
+    from .games.core.game_core import configure_solver_cache
+    configure_solver_cache(
+        max_entries=app.config["GAME24_SOLVER_CACHE_SIZE"],
+        max_bytes=app.config["GAME24_SOLVER_CACHE_BYTES"],
+    )
+    from .games.core.subset_solver import configure_reachable_cache
+    configure_reachable_cache(
+        max_entries=app.config["GAME24_REACHABLE_CACHE_SIZE"],
+        max_bytes=app.config["GAME24_REACHABLE_CACHE_BYTES"],
+    )
+    from .games.core.answer_check import CHECK_CACHE
+    CHECK_CACHE.resize(max_entries=app.config["GAME24_CHECK_CACHE_SIZE"])
+
     # ---------------------------
     # Warmup Game24 store (DB-first, fallback JSON)
     # ---------------------------
@@ -203,12 +247,170 @@ def create_app() -> Flask:
     # ---------------------------
     @app.cli.command("game24-rebuild-store")
     def game24_rebuild_store():
-        """Rebuild Game24 puzzle caches from DB (fallback to JSON)."""
-        from .games.core.puzzle_store_game24 import warmup_store, get_store
+        """Rebuild Game24 puzzle caches from DB (fallback to JSON) and write the boot snapshot."""
+        from .games.core.puzzle_store_game24 import (
+            Game24Store, warmup_store, get_store, snapshot_path, touch_store_version,
+        )
         with app.app_context():
             warmup_store(force=True)
             store = get_store(load=False)
-            click.echo(f"✅ Rebuilt Game24 store. Pools: {store.pool_report()}")
+            click.echo(f"✅ Rebuilt Game24 store from {store.loaded_from} in {store.load_ms:.0f} ms. "
+                       f"Pools: {store.pool_report()}")
+            t0 = time.perf_counter()
+            size = store.write_snapshot()
+            if size is None:
+                click.echo("⚠️  No snapshot written (snapshot disabled, empty store or DB watermark unavailable)")
+                return
+            click.echo(f"✅ Wrote snapshot {snapshot_path()} ({size / 1024:.0f} KiB) "
+                       f"in {(time.perf_counter() - t0) * 1000:.0f} ms")
+            check = Game24Store()
+            check.load()
+            click.echo(f"   boot from {check.loaded_from}: {check.load_ms:.0f} ms")
+            if touch_store_version():
+                click.echo("   serving workers notified (GAME24_STORE_VERSION_FILE)")
+
+    @app.cli.command("game24-build-dataset")
+    @click.option("--ranks", default="1-13", show_default=True, help="Inclusive rank range, e.g. 1-20.")
+    @click.option("--cards", type=int, default=4, show_default=True, help="Cards per hand (1-6).")
+    @click.option("--target", type=int, default=24, show_default=True)
+    @click.option("--solutions", type=int, default=20, show_default=True, help="Solutions kept per hand.")
+    @click.option("--shard-size", type=int, default=250, show_default=True, help="Hands per checkpoint shard.")
+    @click.option("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+    @click.option("--out", "out_dir", type=click.Path(file_okay=False), default=None,
+                  help="Shard directory (default: <instance>/datasets).")
+    @click.option("--fresh", is_flag=True, help="Discard existing shards instead of resuming.")
+    @click.option("--json", "json_path", type=click.Path(dir_okay=False), default=None,
+                  help="Also write the merged rows as an answers.json-style file.")
+    @click.option("--load", "do_load", is_flag=True, help="Bulk-upsert into game24_puzzles and game_items.")
+    @click.option("--replace", is_flag=True,
+                  help="With --load: retire seed.py rows of the same dataset (hands keep their case ids).")
+    def game24_build_dataset(ranks, cards, target, solutions, shard_size, workers, out_dir, fresh, json_path,
+                             do_load, replace):
+        """Generate (or resume) a full Game24 puzzle dataset, optionally loading it into the DB."""
+        from .games.core.dataset_builder import DatasetBuilder, DatasetSpec, bulk_load
+        try:
+            lo, hi = (int(x) for x in ranks.split("-", 1))
+            spec = DatasetSpec(lo, hi, cards, target, solutions, shard_size)
+            builder = DatasetBuilder(spec, Path(out_dir) if out_dir else Path(app.instance_path) / "datasets")
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        click.echo(f"Dataset {spec.key}: {spec.n_hands()} hands in {builder.n_shards} shards -> {builder.dir}")
+        try:
+            built = builder.build(
+                workers=workers, fresh=fresh,
+                progress=lambda i, n: click.echo(f"  ... shard {i}/{n}"),
+            )
+        except ValueError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"✅ Built {built} shard(s); {builder.n_shards - built} reused")
+        if json_path:
+            click.echo(f"✅ Wrote {builder.write_json(Path(json_path))} rows -> {json_path}")
+        if do_load:
+            from .games.core.puzzle_store_game24 import touch_store_version
+            with app.app_context():
+                try:
+                    n = bulk_load(builder, replace=replace)
+                except ValueError as e:
+                    raise click.ClickException(str(e))
+                touch_store_version()
+            click.echo(f"✅ Upserted {n} rows into game24_puzzles and game_items")
+
+    @app.cli.command("game24-backfill-features")
+    @click.option("--force", is_flag=True, help="Recompute rows that already have features.")
+    def game24_backfill_features(force):
+        """Compute content_json['features'] for Game24 rows loaded before it existed."""
+        from .games.core.dataset_builder import backfill_features
+        from .games.core.puzzle_store_game24 import get_store, touch_store_version, warmup_store
+        with app.app_context():
+            try:
+                n = backfill_features(force=force)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            warmup_store(force=True)
+            get_store(load=False).write_snapshot()
+            touch_store_version()
+        click.echo(f"✅ Features written for {n} row(s)")
+
+    @app.cli.command("game24-merge-discoveries")
+    def game24_merge_discoveries():
+        """Append solutions players found that weren't stored (game24_new_solution events)."""
+        from .games.core.discoveries import merge_discoveries
+        from .games.core.puzzle_store_game24 import get_store, touch_store_version, warmup_store
+        with app.app_context():
+            try:
+                n = merge_discoveries()
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            if n:
+                warmup_store(force=True)
+                get_store(load=False).write_snapshot()
+                touch_store_version()
+        click.echo(f"✅ Merged {n} new solution(s)")
+
+    @app.cli.command("game24-set-active")
+    @click.argument("case_ids", nargs=-1, type=int, required=True)
+    @click.option("--off", "deactivate", is_flag=True, help="Deactivate instead of (re)activating.")
+    def game24_set_active(case_ids, deactivate):
+        """(De)activate Game24 puzzles by case_id; workers pick it up within GAME24_STORE_CHECK_SECONDS."""
+        from .games.core.puzzle_store_game24 import set_puzzles_active, touch_store_version
+        with app.app_context():
+            try:
+                n = set_puzzles_active(case_ids, active=not deactivate)
+            except ValueError as e:
+                raise click.ClickException(str(e))
+            touch_store_version()
+        click.echo(f"✅ {'Deactivated' if deactivate else 'Activated'} {n} row(s)")
+
+    @app.cli.command("game24-build-solution-table")
+    @click.option("--min", "t_min", type=int, default=-100, show_default=True, help="Lowest target.")
+    @click.option("--max", "t_max", type=int, default=200, show_default=True, help="Highest target.")
+    @click.option("--out", "out_path", type=click.Path(dir_okay=False), default=None,
+                  help="Output file (default: GAME24_SOLUTION_TABLE or instance folder).")
+    @click.option("--engine", type=click.Choice(["dp", "batch"]), default="dp", show_default=True,
+                  help="dp: per-hand subset DP; batch: NumPy template sweep (needs numpy).")
+    def game24_build_solution_table(t_min, t_max, out_path, engine):
+        """Precompute solvability + one solution for every 4-card hand and target."""
+        from .games.core.solution_table import build_table
+        from .games.core.puzzle_store_game24 import solution_table_path
+        with app.app_context():
+            path = Path(out_path) if out_path else solution_table_path()
+            if engine == "batch":
+                from .games.core.batch_solver import sweep
+                try:
+                    table = sweep(t_min, t_max).to_solution_table()
+                except RuntimeError as e:
+                    raise click.ClickException(str(e))
+            else:
+                table = build_table(
+                    t_min, t_max,
+                    progress=lambda i, n: click.echo(f"  ... {i}/{n} hands"),
+                )
+            table.save(path)
+            click.echo(f"✅ Solution table: {len(table)} hands, targets {t_min}..{t_max} -> {path}")
+
+    @app.cli.command("game24-target-sweep")
+    @click.option("--min", "t_min", type=int, default=-100, show_default=True, help="Lowest target.")
+    @click.option("--max", "t_max", type=int, default=200, show_default=True, help="Highest target.")
+    @click.option("--csv", "csv_path", type=click.Path(dir_okay=False), default=None,
+                  help="Write target,solvable_hands rows here instead of a summary.")
+    def game24_target_sweep(t_min, t_max, csv_path):
+        """Solve every 4-card hand for every target in range at once (NumPy)."""
+        from .games.core.batch_solver import sweep
+        started = time.time()
+        try:
+            result = sweep(t_min, t_max)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        counts = result.solvable_counts()
+        if csv_path:
+            with open(csv_path, "w", encoding="utf-8") as f:
+                f.write("target,solvable_hands\n")
+                f.writelines(f"{t},{n}\n" for t, n in counts.items())
+        else:
+            for t in (24, t_min, t_max):
+                if t in counts:
+                    click.echo(f"  target {t}: {counts[t]}/{len(result.hands)} hands solvable")
+        click.echo(f"✅ Swept {len(result.hands)} hands x {len(counts)} targets in {time.time() - started:.2f}s")
 
     @app.cli.command("game24-stats")
     def game24_stats():
@@ -216,11 +418,16 @@ def create_app() -> Flask:
         from .games.core.puzzle_store_game24 import get_store
         with app.app_context():
             store = get_store()
-            total = len(store.by_id)
-            with_solutions = sum(1 for p in store.by_id.values() if p.solutions)
+            total = len(store)
+            with_solutions = store.count_with_solutions()
             click.echo(
                 f"Game24 puzzles loaded: total={total}, with_solutions={with_solutions}, pools={store.pool_report()}"
             )
+            if store.load_ms is not None:
+                click.echo(f"Game24 store loaded from {store.loaded_from} in {store.load_ms:.0f} ms")
+        from .games.core.bounded_cache import cache_stats
+        for name, st in cache_stats().items():
+            click.echo(f"cache[{name}]: {st}")
 
     from flask import g
 
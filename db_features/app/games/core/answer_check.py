@@ -0,0 +1,105 @@
+# app/games/core/answer_check.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Any, FrozenSet, List, Optional
+import re
+
+from .bounded_cache import BoundedCache
+from .expr_parser import ExprSyntaxError, parse_expression
+from .game_core import hand_key
+from .op_sets import DEFAULT_OP_SET, allows_concat
+
+# ============================================================
+# Memoised answer checks for /api/check
+# ============================================================
+# A class or a competition pool submits the same expressions for the same
+# hands over and over. Verdicts are cached on (answer text, hand, target,
+# operator set) so a repeat costs a string normalisation and a dict lookup.
+# The key text is normalised without parsing: glyphs folded to ASCII, letters
+# upper-cased, whitespace dropped unless it separates two tokens that would
+# otherwise merge ("1 0", "* *"), so equivalent spellings share an entry.
+# Correct verdicts carry the answer's canonical form (canonical.py), built in
+# the same parse, so the caller can tell a stored solution from a new one.
+
+CHECK_CACHE_SIZE = 50_000
+CHECK_CACHE = BoundedCache("answer_check", CHECK_CACHE_SIZE)
+
+CARD_REASON = "Expression must use each card exactly once."
+INVALID_REASON = "Unsafe or invalid expression"
+
+_GLYPHS = str.maketrans({"×": "*", "∗": "*", "·": "*", "÷": "/", "／": "/", "−": "-", "—": "-", "–": "-"})
+_WS_RE = re.compile(r"\s+")
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    correct: bool
+    reason: str = ""
+    value: Optional[float] = None
+    canonical: Any = None     # normal form of a correct exact answer
+
+
+def _word(c: str) -> bool:
+    return c.isalnum() or c == "."
+
+
+def answer_key(answer: str) -> str:
+    s = (answer or "").strip().translate(_GLYPHS).upper()
+
+    def space(m: re.Match) -> str:
+        a, b = s[m.start() - 1], s[m.end()]
+        return " " if (_word(a) and _word(b)) or (a == "*" and b == "*") else ""
+
+    return _WS_RE.sub(space, s)
+
+
+def evaluate_answer(answer: str, values: List[int], target: int, concat: bool = False) -> CheckResult:
+    """Uncached check: card usage first, then the exact value against target."""
+    try:
+        parsed = parse_expression(answer, canonical=True)
+    except ExprSyntaxError:
+        return CheckResult(False, CARD_REASON)
+    try:
+        if not parsed.uses_cards(values, concat=concat):
+            return CheckResult(False, CARD_REASON)
+    except (TypeError, ValueError):
+        return CheckResult(False, CARD_REASON)
+    if parsed.value is None:
+        return CheckResult(False, INVALID_REASON)
+    val = parsed.as_float()
+    if parsed.equals(target):
+        return CheckResult(True, "", val, parsed.canonical)
+    return CheckResult(False, f"Your result = {val:g}, target = {target}", val)
+
+
+def canonical_forms(expressions: List[str]) -> FrozenSet[Any]:
+    """Canonical forms of a hand's stored solutions (unparsable entries skipped)."""
+    out = set()
+    for e in expressions or ():
+        try:
+            node = parse_expression(e, canonical=True).canonical
+        except ExprSyntaxError:
+            continue
+        if node is not None:
+            out.add(node)
+    return frozenset(out)
+
+
+def check_expression(answer: str, values: List[int], target: int, op_set: str = DEFAULT_OP_SET) -> CheckResult:
+    concat = allows_concat(op_set)
+    try:
+        key = (answer_key(answer), hand_key(values), int(target), concat)
+    except (TypeError, ValueError):
+        return CheckResult(False, CARD_REASON)   # cards that aren't numbers can't be matched
+    hit = CHECK_CACHE.get(key)
+    if hit is not None:
+        return hit
+    out = evaluate_answer(answer, values, int(target), concat)
+    CHECK_CACHE.put(key, out)
+    return out
+
+
+__all__ = [
+    "CheckResult", "CARD_REASON", "INVALID_REASON", "CHECK_CACHE",
+    "answer_key", "evaluate_answer", "check_expression", "canonical_forms",
+]
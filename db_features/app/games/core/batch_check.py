@@ -0,0 +1,178 @@
+# app/games/core/batch_check.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, IO, Iterable, Iterator, List, Optional, Tuple
+import json
+
+from .answer_check import check_expression
+from .game_core import hand_key
+from .op_sets import DEFAULT_OP_SET, normalize_op_set
+from .solver_service import SolverBusy, SolverRejected, SolverTimeout
+
+# ============================================================
+# Stateless batch grading (/api/check/batch)
+# ============================================================
+# Worksheet grading: a teacher uploads many (hand, target, answer) items and
+# gets one verdict per item back. Nothing here reads or writes SESSIONS, so
+# a batch never moves anyone's stats. The request body is NDJSON (one item
+# per line) read in fixed-size chunks, and verdicts are yielded as each line
+# is graded, so a 10k-item upload never sits in memory as a whole. Answers go
+# through the shared check_expression cache; "no solution" claims are
+# memoised per batch, since a worksheet repeats the same few hands.
+
+BATCH_CHUNK = 64 * 1024
+MAX_LINE = 16 * 1024
+MAX_ANSWER_LEN = 200
+
+NO_SOLUTION_ANSWERS = {"no solution", "nosolution", "no-solution", "n", "0", "-1"}
+
+Item = Tuple[Optional[Dict[str, Any]], Optional[str]]   # (parsed item, or error)
+
+
+def iter_ndjson(stream: IO[bytes], chunk_size: int = BATCH_CHUNK, max_line: int = MAX_LINE) -> Iterator[Item]:
+    """(item, None) per JSON object line, (None, reason) per bad line; blank lines skipped."""
+    buf = b""
+    skipping = False     # inside a line that already overflowed max_line
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            if len(line) > max_line:
+                yield None, f"line longer than {max_line} bytes"
+                continue
+            out = _decode(line)
+            if out is not None:
+                yield out
+        if len(buf) > max_line:
+            if not skipping:
+                yield None, f"line longer than {max_line} bytes"
+            skipping, buf = True, b""
+    if buf and not skipping:
+        out = _decode(buf)
+        if out is not None:
+            yield out
+
+
+def _decode(line: bytes) -> Optional[Item]:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        obj = json.loads(line)
+    except ValueError:
+        return None, "not valid JSON"
+    return (obj, None) if isinstance(obj, dict) else (None, "item must be a JSON object")
+
+
+def iter_items(items: Iterable[Any]) -> Iterator[Item]:
+    """Same shape as iter_ndjson for an already-decoded JSON list."""
+    for obj in items:
+        yield (obj, None) if isinstance(obj, dict) else (None, "item must be a JSON object")
+
+
+class BatchGrader:
+    """
+    Grades items {"values" | "case_id", "target"?, "answer", "ops"?, "id"?}.
+    `cards_for(case_id)` resolves stored hands; `no_solution(values, case_id,
+    target, op_set)` answers "no solution" claims (True if the claim is right).
+    """
+
+    def __init__(
+        self,
+        cards_for: Callable[[int], Optional[List[int]]],
+        no_solution: Callable[[List[int], Optional[int], int, str], bool],
+        is_known: Optional[Callable[[int, List[int], Any], Optional[bool]]] = None,
+        target: int = 24,
+        op_set: str = DEFAULT_OP_SET,
+    ):
+        self.cards_for = cards_for
+        self.no_solution = no_solution
+        self.is_known = is_known
+        self.target = int(target)
+        self.op_set = normalize_op_set(op_set)
+        self.graded = 0
+        self.correct = 0
+        self.rejected = 0
+        self._claims: Dict[Tuple[int, int, str], bool] = {}
+
+    def run(self, items: Iterable[Item], max_items: int) -> Iterator[Dict[str, Any]]:
+        for i, (item, error) in enumerate(items):
+            if i >= max_items:
+                yield {"i": i, "ok": False, "error": "too_many_items",
+                       "reason": f"at most {max_items} items per batch"}
+                return
+            yield self.grade(i, item) if error is None else self._reject(i, None, error)
+
+    def summary(self) -> Dict[str, Any]:
+        return {"done": True, "graded": self.graded, "correct": self.correct, "rejected": self.rejected}
+
+    def grade(self, i: int, item: Dict[str, Any]) -> Dict[str, Any]:
+        answer = item.get("answer")
+        if not isinstance(answer, str) or not answer.strip():
+            return self._reject(i, item, "missing answer")
+        answer = answer.strip()
+        if len(answer) > MAX_ANSWER_LEN:
+            return self._reject(i, item, f"answer longer than {MAX_ANSWER_LEN} characters")
+
+        case_id = item.get("case_id")
+        values = item.get("values")
+        try:
+            target = int(item["target"]) if item.get("target") is not None else self.target
+            case_id = int(case_id) if case_id is not None else None
+        except (TypeError, ValueError):
+            return self._reject(i, item, "target and case_id must be integers")
+        if not values:
+            values = self.cards_for(case_id) if case_id is not None else None
+            if not values:
+                return self._reject(i, item, "unknown case_id" if case_id is not None else "missing values")
+        if not isinstance(values, list):
+            return self._reject(i, item, "values must be a list")
+        op_set = normalize_op_set(item["ops"]) if item.get("ops") else self.op_set
+
+        out: Dict[str, Any] = {"i": i}
+        if "id" in item:
+            out["id"] = item["id"]
+        if answer.lower() in NO_SOLUTION_ANSWERS:
+            try:
+                claim = (hand_key(values), target, op_set)
+            except (TypeError, ValueError):
+                return self._reject(i, item, "values must be integers")
+            right = self._claims.get(claim)
+            if right is None:
+                try:
+                    right = self._claims[claim] = bool(self.no_solution(values, case_id, target, op_set))
+                except SolverRejected as e:
+                    return self._reject(i, item, str(e))
+                except (SolverBusy, SolverTimeout):
+                    return self._reject(i, item, "The solver is busy or the hand is too hard right now.")
+            out.update(ok=right, kind="no-solution",
+                       reason="" if right else f"This hand has a solution for target {target}.")
+        else:
+            result = check_expression(answer, values, target, op_set)
+            out.update(ok=result.correct, reason=result.reason)
+            if result.value is not None:
+                out["value"] = result.value
+            if (result.correct and self.is_known is not None and case_id is not None
+                    and target == 24 and op_set == DEFAULT_OP_SET):
+                out["known"] = self.is_known(case_id, values, result.canonical)
+        self.graded += 1
+        self.correct += bool(out["ok"])
+        return out
+
+    def _reject(self, i: int, item: Optional[Dict[str, Any]], reason: str) -> Dict[str, Any]:
+        self.rejected += 1
+        out: Dict[str, Any] = {"i": i, "ok": False, "error": "bad_item", "reason": reason}
+        if item is not None and "id" in item:
+            out["id"] = item["id"]
+        return out
+
+
+__all__ = [
+    "BATCH_CHUNK", "MAX_LINE", "MAX_ANSWER_LEN", "NO_SOLUTION_ANSWERS",
+    "iter_ndjson", "iter_items", "BatchGrader",
+]
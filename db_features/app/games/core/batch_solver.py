@@ -0,0 +1,188 @@
+# app/games/core/batch_solver.py
+from __future__ import annotations
+from itertools import permutations, product
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging, time
+
+try:  # optional: only the offline sweep / dataset tooling needs it
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+from .game_core import hand_key
+from .solution_table import DEFAULT_RANKS, SolutionTable, all_hands
+from .subset_solver import ATOM, render_binop
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Vectorised template evaluation for every 4-card hand at once
+# ============================================================
+# A 4-card expression is a tree shape (5 of them) x an operator per inner node
+# (4^3) x an order of the cards (24). Each (shape, operators) template is
+# evaluated as NumPy array operations over all hands x permutations together,
+# on exact numerator/denominator int64 arrays. Division by zero is not
+# branched on: it yields den == 0, which every later operation preserves, and
+# such lanes are masked out at the end. Magnitudes stay far below int64 for
+# ranks <= 13, so no reduction is needed until the final integer test.
+
+OPS = ("+", "-", "*", "/")
+
+# leaves are card positions 0..3; inner nodes are (op slot, left, right)
+SHAPES = (
+    (2, (1, (0, 0, 1), 2), 3),     # ((a b) c) d
+    (2, (0, 0, (1, 1, 2)), 3),     # (a (b c)) d
+    (2, (0, 0, 1), (1, 2, 3)),     # (a b) (c d)
+    (2, 0, (1, (0, 1, 2), 3)),     # a ((b c) d)
+    (2, 0, (0, 1, (1, 2, 3))),     # a (b (c d))
+)
+PERMS = tuple(permutations(range(4)))
+OP_ASSIGNMENTS = tuple(product(range(len(OPS)), repeat=3))
+N_TEMPLATES = len(SHAPES) * len(OP_ASSIGNMENTS)
+
+
+def require_numpy() -> None:
+    if np is None:
+        raise RuntimeError("the batch solver needs numpy (pip install numpy)")
+
+
+def _apply(op: int, a, b):
+    an, ad = a
+    bn, bd = b
+    if op == 0:
+        return an * bd + bn * ad, ad * bd
+    if op == 1:
+        return an * bd - bn * ad, ad * bd
+    if op == 2:
+        return an * bn, ad * bd
+    return an * bd, ad * bn
+
+
+def _eval(node, ops, leaves, memo):
+    if isinstance(node, int):
+        return leaves[node]
+    # subtrees such as (a b) repeat across shapes; memo is per operator assignment
+    hit = memo.get(node)
+    if hit is not None:
+        return hit
+    slot, left, right = node
+    out = _apply(ops[slot], _eval(left, ops, leaves, memo), _eval(right, ops, leaves, memo))
+    memo[node] = out
+    return out
+
+
+def _render(node, ops, cards) -> Tuple[str, int]:
+    if isinstance(node, int):
+        return str(cards[node]), ATOM
+    slot, left, right = node
+    return render_binop(_render(left, ops, cards), _render(right, ops, cards), OPS[ops[slot]])
+
+
+def render_template(code: int, values: Sequence[int]) -> str:
+    """Expression for a template code (as stored in TargetSweep.first) applied to `values`."""
+    template, perm = divmod(int(code), len(PERMS))
+    shape, ops = divmod(template, len(OP_ASSIGNMENTS))
+    cards = [values[i] for i in PERMS[perm]]
+    return _render(SHAPES[shape], OP_ASSIGNMENTS[ops], cards)[0]
+
+
+class TargetSweep:
+    """
+    Reachability of every integer target in [t_min, t_max] for a list of hands:
+      reachable[h, t - t_min]  bool
+      first[h, t - t_min]      code of one template reaching it, -1 if none
+    """
+    def __init__(self, hands: List[Tuple[int, ...]], t_min: int, t_max: int, reachable, first):
+        self.hands = hands
+        self.t_min = int(t_min)
+        self.t_max = int(t_max)
+        self.reachable = reachable
+        self.first = first
+        self._row = {hand_key(h): i for i, h in enumerate(hands)}
+
+    def targets(self) -> List[int]:
+        return list(range(self.t_min, self.t_max + 1))
+
+    def is_solvable(self, values: Sequence[int], target: int) -> Optional[bool]:
+        row = self._row.get(hand_key(values))
+        if row is None or not self.t_min <= int(target) <= self.t_max:
+            return None
+        return bool(self.reachable[row, int(target) - self.t_min])
+
+    def solution(self, values: Sequence[int], target: int) -> Optional[str]:
+        row = self._row.get(hand_key(values))
+        if row is None or not self.t_min <= int(target) <= self.t_max:
+            return None
+        code = int(self.first[row, int(target) - self.t_min])
+        return render_template(code, self.hands[row]) if code >= 0 else None
+
+    def solvable_counts(self) -> Dict[int, int]:
+        """target -> number of solvable hands."""
+        return dict(zip(self.targets(), (int(c) for c in self.reachable.sum(axis=0))))
+
+    def to_solution_table(self, ranks: Tuple[int, int] = DEFAULT_RANKS) -> SolutionTable:
+        """Same content as solution_table.build_table, solutions rendered from templates."""
+        table = SolutionTable(self.t_min, self.t_max, ranks)
+        for row, hand in enumerate(self.hands):
+            cols = np.flatnonzero(self.reachable[row])
+            bits = 0
+            for c in cols:
+                bits |= 1 << int(c)
+            sols = "\n".join(render_template(int(self.first[row, c]), hand) for c in cols)
+            table.hands[hand_key(hand)] = (bits, sols)
+        return table
+
+
+def sweep(
+    t_min: int,
+    t_max: int,
+    ranks: Tuple[int, int] = DEFAULT_RANKS,
+    hands: Optional[List[Tuple[int, ...]]] = None,
+) -> TargetSweep:
+    """Evaluate all templates for all 4-card hands and record integer targets in range."""
+    require_numpy()
+    if t_min > t_max:
+        raise ValueError("t_min must be <= t_max")
+    hands = [tuple(sorted(int(v) for v in h)) for h in (hands or all_hands(ranks))]
+    if any(len(h) != 4 for h in hands):
+        raise ValueError("the batch solver handles 4-card hands only")
+    started = time.time()
+
+    n_hands, n_perm, width = len(hands), len(PERMS), t_max - t_min + 1
+    # rows are hand-major: row = hand * 24 + perm
+    dealt = np.asarray(hands, dtype=np.int64)[:, PERMS].reshape(-1, 4)
+    ones = np.ones(len(dealt), dtype=np.int64)
+    leaves = [(dealt[:, i], ones) for i in range(4)]
+    hand_of_row = np.repeat(np.arange(n_hands), n_perm)
+    perm_of_row = np.tile(np.arange(n_perm), n_hands)
+
+    reachable = np.zeros((n_hands, width), dtype=bool)
+    first = np.full((n_hands, width), -1, dtype=np.int32)
+
+    for oi, ops in enumerate(OP_ASSIGNMENTS):
+        memo: Dict = {}
+        for si, shape in enumerate(SHAPES):
+            num, den = _eval(shape, ops, leaves, memo)
+            ok = den != 0
+            safe = np.where(ok, den, 1)
+            ok &= num % safe == 0
+            val = num // safe
+            ok &= (val >= t_min) & (val <= t_max)
+            rows = np.flatnonzero(ok)
+            if not rows.size:
+                continue
+            h = hand_of_row[rows]
+            col = (val[rows] - t_min).astype(np.int64)
+            fresh = ~reachable[h, col]
+            reachable[h, col] = True
+            h, col = h[fresh], col[fresh]
+            code = (si * len(OP_ASSIGNMENTS) + oi) * n_perm + perm_of_row[rows[fresh]]
+            # duplicates within one template: keep whichever write lands; all are valid
+            first[h, col] = code
+
+    logger.info("target sweep: hands=%d targets=%d..%d templates=%d in %.2fs",
+                n_hands, t_min, t_max, N_TEMPLATES * n_perm, time.time() - started)
+    return TargetSweep(hands, t_min, t_max, reachable, first)
+
+
+__all__ = ["TargetSweep", "sweep", "render_template", "require_numpy", "N_TEMPLATES"]
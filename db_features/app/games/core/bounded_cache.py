@@ -0,0 +1,121 @@
+# app/games/core/bounded_cache.py
+from __future__ import annotations
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+import sys
+
+# ============================================================
+# Size- and memory-bounded LRU with hit/miss/eviction counters
+# ============================================================
+# Long-lived workers must not grow per-process caches forever (custom targets,
+# arbitrary hands). Every cache registers itself by name so one call
+# (cache_stats) reports all of them for debug endpoints and CLI output.
+
+_MISSING = object()
+
+CACHES: Dict[str, "BoundedCache"] = {}
+
+
+def approx_size(obj: Any) -> int:
+    """Shallow size plus one level of container members (good enough for budgeting)."""
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list, frozenset, set)):
+        size += sum(sys.getsizeof(x) for x in obj)
+    elif isinstance(obj, dict):
+        size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in obj.items())
+    return size
+
+
+class BoundedCache:
+    """
+    Thread-safe LRU bounded by entry count and (optionally) approximate bytes.
+    Sizes are measured with `sizeof` on insert; the oldest entries are evicted
+    until both limits hold again.
+    """
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 10_000,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = approx_size,
+    ):
+        self.name = name
+        self.max_entries = int(max_entries)
+        self.max_bytes = int(max_bytes) if max_bytes else None
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        CACHES[name] = self
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            hit = self._data.get(key, _MISSING)
+            if hit is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return hit[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        nbytes = self._sizeof(key) + self._sizeof(value) if self.max_bytes else 0
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (value, nbytes)
+            self._bytes += nbytes
+            self._evict_locked()
+
+    def resize(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = int(max_entries)
+            if max_bytes is not None:
+                self.max_bytes = int(max_bytes) or None
+            self._evict_locked()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "bytes": self._bytes if self.max_bytes else None,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def _evict_locked(self) -> None:
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            _key, (_value, nbytes) = self._data.popitem(last=False)
+            self._bytes -= nbytes
+            self.evictions += 1
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every registered cache, keyed by cache name."""
+    return {name: cache.stats() for name, cache in sorted(CACHES.items())}
@@ -0,0 +1,63 @@
+# app/games/core/canonical.py
+from __future__ import annotations
+from typing import Any, Optional, Tuple
+
+from .game_core import _chain, _chain_terms
+
+# ============================================================
+# Canonical forms of typed expressions
+# ============================================================
+# Same normal form as the canonical enumeration in game_core (flattened,
+# sorted + / - and * / / chains, opaque ^ nodes, "- 0" -> "+ 0", "/ 1" -> "* 1"),
+# extended with a sign so answers written with negative intermediates meet
+# their sign-free twins:
+#   node = (negative, key)   where key denotes the absolute value
+# so (2 - 5) * (1 - 9) and (5 - 2) * (9 - 1) get the same form. Nodes are built
+# bottom-up by the expression parser from the values it already computes.
+
+Node = Tuple[bool, Any]
+
+
+def _negative(v) -> bool:
+    return v[0] < 0 if isinstance(v, tuple) else v < 0
+
+
+def _is_zero(v) -> bool:
+    return v[0] == 0 if isinstance(v, tuple) else v == 0
+
+
+def atom(n: int) -> Node:
+    return (False, ("#", int(n)))
+
+
+def negate(node: Node, value) -> Node:
+    """-x; zero stays unsigned."""
+    return node if _is_zero(value) else (not node[0], node[1])
+
+
+def _signed_terms(node: Node):
+    pos, neg = _chain_terms(node[1], "+")
+    return (neg, pos) if node[0] else (pos, neg)
+
+
+def combine(op: str, a: Node, b: Node, result) -> Optional[Node]:
+    """Node for `a op b` whose value is `result` (None if result is None)."""
+    if result is None:
+        return None
+    negative = _negative(result)
+    if op in ("+", "-"):
+        key = _chain("+", _signed_terms(a), _signed_terms(b), invert=op == "-")
+        flipped = _chain("+", (key[2], key[1]), ((), ()))   # re-folds a "+ 0" moved to the minus side
+        if negative:
+            return (True, flipped)
+        if _is_zero(result):
+            return (False, min(key, flipped))
+        return (False, key)
+    if op in ("*", "/"):
+        key = _chain("*", _chain_terms(a[1], "*"), _chain_terms(b[1], "*"), invert=op == "/")
+        return (negative and not _is_zero(result), key)
+    # powers stay opaque; the signed operands are part of the key
+    return (negative, ("^", a, b))
+
+
+__all__ = ["Node", "atom", "negate", "combine"]
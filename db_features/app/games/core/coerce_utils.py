@@ -2,9 +2,7 @@
 from typing import List, Optional, Dict, Any
 import re
 
-def values_key(values: List[int]) -> str:
-    """Create a sorted key from values for consistent lookup."""
-    return "-".join(map(str, sorted(values)))
+from .game_core import values_key  # one hand-key format app-wide ("01-04-08-08")
 
 def coerce_int_list(val) -> List[int]:
     """Coerce various input types to list of integers."""
@@ -0,0 +1,382 @@
+# app/games/core/dataset_builder.py
+from __future__ import annotations
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from itertools import combinations_with_replacement, islice
+from math import comb
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import hashlib, json, logging, multiprocessing, os, shutil, time
+
+from .game_core import hand_key
+from .hand_features import hand_features
+from .puzzle_store_game24 import DEFAULT_DATASET, touch_game
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Offline dataset builder (answers.json-style puzzle sets)
+# ============================================================
+# Generates every hand for a rank range / card count, solves it for one
+# target, and assigns a level plus structured features (hand_features.py)
+# for the store pools. Work is split
+# into fixed shards of consecutive hands; each finished shard is written
+# atomically to <out>/<dataset key>/shard-NNNNN.json, so an interrupted run
+# resumes by skipping shards already on disk. The merged rows can be written
+# as an answers.json file and/or bulk-upserted into game24_puzzles and
+# game_items.
+
+DATASET_FORMAT = 2   # 2: rows carry "features"
+DEFAULT_SHARD_SIZE = 250
+DEFAULT_SOLUTIONS = 20
+EASY_MIN_SOLUTIONS = 3
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    rank_min: int = 1
+    rank_max: int = 13
+    cards: int = 4
+    target: int = 24
+    solutions: int = DEFAULT_SOLUTIONS   # canonical solutions kept per hand
+    shard_size: int = DEFAULT_SHARD_SIZE
+
+    @property
+    def key(self) -> str:
+        """e.g. r1-13_c4_t24 (stable directory name and content_json['dataset'])."""
+        return f"r{self.rank_min}-{self.rank_max}_c{self.cards}_t{self.target}"
+
+    def validate(self) -> None:
+        if self.rank_min > self.rank_max or self.rank_min < 0:
+            raise ValueError("rank range must satisfy 0 <= min <= max")
+        if not 1 <= self.cards <= 6:
+            raise ValueError("card count must be between 1 and 6")
+        if self.shard_size < 1 or self.solutions < 1:
+            raise ValueError("shard size and solutions must be positive")
+
+    def hands(self) -> Iterator[Tuple[int, ...]]:
+        return combinations_with_replacement(range(self.rank_min, self.rank_max + 1), self.cards)
+
+    def n_hands(self) -> int:
+        return comb(self.rank_max - self.rank_min + self.cards, self.cards)
+
+
+def classify_level(solutions: List[str]) -> str:
+    """
+    Level from the canonical solution list (one entry per distinct solution):
+      hard    every solution divides
+      easy    at least EASY_MIN_SOLUTIONS solutions, one of them division-free
+      medium  otherwise; 'nosol' when there is no solution
+    """
+    if not solutions:
+        return "nosol"
+    if all("/" in s for s in solutions):
+        return "hard"
+    if len(solutions) >= EASY_MIN_SOLUTIONS and any("/" not in s for s in solutions):
+        return "easy"
+    return "medium"
+
+
+def _build_shard(spec_json: Dict[str, Any], shard: int) -> Tuple[int, List[Dict[str, Any]]]:
+    """Worker: solve hands [shard * size, (shard + 1) * size) in generation order."""
+    spec = DatasetSpec(**spec_json)
+    start = shard * spec.shard_size
+    rows = []
+    for i, hand in enumerate(islice(spec.hands(), start, start + spec.shard_size), start=start):
+        # features and level see every solution; only the first few are stored
+        features, sols = hand_features(hand, spec.target)
+        rows.append({
+            "case_id": i + 1,
+            "cards": list(hand),
+            "solutions": sols[:spec.solutions],
+            "level": classify_level(sols),
+            "features": features,
+        })
+    return shard, rows
+
+
+class DatasetBuilder:
+    """Sharded, resumable build of one DatasetSpec under `out_dir`."""
+    def __init__(self, spec: DatasetSpec, out_dir: Path):
+        spec.validate()
+        self.spec = spec
+        self.dir = Path(out_dir) / spec.key
+
+    @property
+    def n_shards(self) -> int:
+        return -(-self.spec.n_hands() // self.spec.shard_size)
+
+    def shard_path(self, shard: int) -> Path:
+        return self.dir / f"shard-{shard:05d}.json"
+
+    def _expected_rows(self, shard: int) -> int:
+        return min(self.spec.shard_size, self.spec.n_hands() - shard * self.spec.shard_size)
+
+    def _check_manifest(self, fresh: bool) -> None:
+        manifest = self.dir / "manifest.json"
+        if fresh and self.dir.exists():
+            shutil.rmtree(self.dir)
+        self.dir.mkdir(parents=True, exist_ok=True)
+        want = {"format": DATASET_FORMAT, "spec": asdict(self.spec)}
+        if manifest.exists():
+            have = json.loads(manifest.read_text(encoding="utf-8"))
+            if have != want:
+                raise ValueError(f"{self.dir} holds shards for a different spec; use --fresh")
+        else:
+            manifest.write_text(json.dumps(want, indent=2), encoding="utf-8")
+
+    def done_shards(self) -> List[int]:
+        done = []
+        for s in range(self.n_shards):
+            path = self.shard_path(s)
+            if not path.exists():
+                continue
+            try:
+                rows = json.loads(path.read_text(encoding="utf-8"))
+            except ValueError:
+                logger.warning("dataset shard unreadable, rebuilding: %s", path)
+                continue
+            if len(rows) == self._expected_rows(s):
+                done.append(s)
+        return done
+
+    def _write_shard(self, shard: int, rows: List[Dict[str, Any]]) -> None:
+        path = self.shard_path(shard)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(rows, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)   # a shard is either complete on disk or absent
+
+    def build(
+        self,
+        workers: Optional[int] = None,
+        fresh: bool = False,
+        progress: Optional[Callable[[int, int], None]] = None,
+    ) -> int:
+        """Build missing shards; returns how many were built this run."""
+        self._check_manifest(fresh)
+        todo = sorted(set(range(self.n_shards)) - set(self.done_shards()))
+        if not todo:
+            return 0
+        started = time.time()
+        spec_json = asdict(self.spec)
+        finished = self.n_shards - len(todo)
+        workers = workers or os.cpu_count() or 1
+        if workers <= 1:
+            for s in todo:
+                self._write_shard(*_build_shard(spec_json, s))
+                finished += 1
+                if progress:
+                    progress(finished, self.n_shards)
+        else:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = [pool.submit(_build_shard, spec_json, s) for s in todo]
+                for fut in as_completed(futures):
+                    self._write_shard(*fut.result())
+                    finished += 1
+                    if progress:
+                        progress(finished, self.n_shards)
+        logger.info("dataset %s: built %d shards in %.1fs", self.spec.key, len(todo), time.time() - started)
+        return len(todo)
+
+    def rows(self) -> Iterator[Dict[str, Any]]:
+        """Merged rows in case_id order (all shards must be built)."""
+        for s in range(self.n_shards):
+            path = self.shard_path(s)
+            if not path.exists():
+                raise FileNotFoundError(f"missing shard {path}; run the build first")
+            yield from json.loads(path.read_text(encoding="utf-8"))
+
+    def write_json(self, path: Path) -> int:
+        rows = list(self.rows())
+        Path(path).write_text(json.dumps(rows, ensure_ascii=False, indent=1), encoding="utf-8")
+        return len(rows)
+
+
+# -------- bulk load --------
+LOAD_BATCH = 1000
+_ITEM_DIFFICULTIES = {"easy", "medium", "hard"}
+
+
+def external_id_for(spec: DatasetSpec, case_id: int) -> str:
+    """Always namespaced, so generated rows never upsert over seed.py rows ("0001")."""
+    return f"{spec.key}-{case_id:05d}"
+
+
+def _existing_case_ids(game_id: int, spec: DatasetSpec) -> Tuple[Dict[int, int], Dict[int, str]]:
+    """
+    (hand_key -> case_id already used for that hand in this dataset, with seed
+    rows first; Puzzle.id -> external_id of the active seed rows). Generation
+    order differs from answers.json order, so the default dataset keeps the
+    case ids sessions and history refer to by matching hands, not positions.
+    """
+    from app.models import Puzzle
+
+    known: Dict[int, int] = {}
+    generated: Dict[int, int] = {}
+    seed: Dict[int, str] = {}
+    prefix = f"{spec.key}-"
+    for r in Puzzle.query.filter_by(game_id=game_id).order_by(Puzzle.id.asc()):
+        cj = r.content_json or {}
+        if (cj.get("dataset") or DEFAULT_DATASET) != spec.key or int(cj.get("target", 24)) != spec.target:
+            continue
+        ext = str(r.external_id or "")
+        try:
+            cards = [int(c) for c in cj.get("cards") or []]
+            case_id = int(ext) if ext.isdigit() else int(cj.get("case_id"))
+        except (TypeError, ValueError):
+            continue
+        if len(cards) != spec.cards:
+            continue
+        if ext.startswith(prefix):
+            generated.setdefault(hand_key(cards), case_id)
+        else:
+            known.setdefault(hand_key(cards), case_id)
+            if r.is_active:
+                seed[r.id] = ext
+    for k, cid in generated.items():
+        known.setdefault(k, cid)
+    return known, seed
+
+
+def _content(spec: DatasetSpec, row: Dict[str, Any]) -> Dict[str, Any]:
+    return {**row, "target": spec.target, "dataset": spec.key}
+
+
+def bulk_load(builder: DatasetBuilder, game_key: str = "game24", replace: bool = False) -> int:
+    """
+    Upsert every row into game24_puzzles and game_items (ON CONFLICT on
+    (game_id, external_id)), LOAD_BATCH rows per statement. Returns the row count.
+    Hands that already have a case id in this dataset keep it; new hands get
+    ids above the largest one. Active seed.py rows of the same dataset are
+    only retired (deactivated, with their game_items) when replace is set;
+    otherwise loading over them is refused.
+    """
+    from sqlalchemy.dialects.postgresql import insert as pg_insert
+    from app.db import db
+    from app.models import Game, GameItem, Puzzle
+
+    game = Game.query.filter_by(game_key=game_key).first()
+    if game is None:
+        raise ValueError(f"game {game_key!r} not found")
+    spec = builder.spec
+    source = f"dataset:{spec.key}"
+    known, seed = _existing_case_ids(game.game_id, spec)
+    if seed and not replace:
+        raise ValueError(
+            f"{len(seed)} active {spec.key} puzzle(s) were imported by seed.py; loading would shadow their "
+            f"curated solutions and levels. Pass --replace to retire them (case ids are kept per hand)."
+        )
+    next_id = max(known.values(), default=0) + 1
+
+    def flush(puzzles: List[Dict], items: List[Dict]) -> None:
+        stmt = pg_insert(Puzzle.__table__).values(puzzles)
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=["game_id", "external_id"],
+            set_={
+                "content_json": stmt.excluded.content_json,
+                "solution_json": stmt.excluded.solution_json,
+                "difficulty": stmt.excluded.difficulty,
+                "title": stmt.excluded.title,
+                "is_active": True,
+            },
+        ))
+        stmt = pg_insert(GameItem.__table__).values(items)
+        db.session.execute(stmt.on_conflict_do_update(
+            constraint="uq_game_items_game_ext",
+            set_={
+                "content_json": stmt.excluded.content_json,
+                "solution_json": stmt.excluded.solution_json,
+                "difficulty": stmt.excluded.difficulty,
+                "title": stmt.excluded.title,
+                "content_sha1": stmt.excluded.content_sha1,
+                "source": stmt.excluded.source,
+                "is_active": True,
+            },
+        ))
+        db.session.commit()
+
+    puzzles, items = [], []
+    n = 0
+    for row in builder.rows():
+        k = hand_key(row["cards"])
+        case_id = known.get(k)
+        if case_id is None:
+            case_id = known[k] = next_id
+            next_id += 1
+        row = {**row, "case_id": case_id}
+        content = _content(spec, row)
+        ext = external_id_for(spec, case_id)
+        title = ",".join(str(c) for c in row["cards"])
+        level = row["level"]
+        puzzles.append({
+            "game_id": game.game_id, "external_id": ext, "title": title,
+            "difficulty": level, "content_json": content,
+            "solution_json": row["solutions"], "is_active": True,
+        })
+        items.append({
+            "game_id": game.game_id, "external_id": ext, "title": title,
+            "difficulty": level if level in _ITEM_DIFFICULTIES else None,
+            "content_json": content, "solution_json": row["solutions"], "is_active": True,
+            "source": source,
+            "content_sha1": hashlib.sha1(json.dumps(content, sort_keys=True).encode()).hexdigest(),
+        })
+        n += 1
+        if len(puzzles) >= LOAD_BATCH:
+            flush(puzzles, items)
+            puzzles, items = [], []
+    if puzzles:
+        flush(puzzles, items)
+    if seed:
+        (Puzzle.query.filter(Puzzle.id.in_(list(seed)))
+         .update({"is_active": False}, synchronize_session=False))
+        (GameItem.query.filter(GameItem.game_id == game.game_id, GameItem.external_id.in_(list(seed.values())))
+         .update({"is_active": False}, synchronize_session=False))
+        logger.info("dataset %s: retired %d seed row(s)", spec.key, len(seed))
+    if n or seed:
+        touch_game(game)
+        db.session.commit()
+    logger.info("dataset %s: upserted %d rows into game24_puzzles and game_items", spec.key, n)
+    return n
+
+
+def backfill_features(game_key: str = "game24", force: bool = False) -> int:
+    """
+    Add content_json["features"] to existing puzzle rows (and their game_items
+    twins) that predate it, e.g. the answers.json import. Returns rows updated.
+    """
+    from app.db import db
+    from app.models import Game, GameItem, Puzzle
+
+    game = Game.query.filter_by(game_key=game_key).first()
+    if game is None:
+        raise ValueError(f"game {game_key!r} not found")
+    rows = Puzzle.query.filter_by(game_id=game.game_id).order_by(Puzzle.id.asc()).all()
+    items = {i.external_id: i for i in GameItem.query.filter_by(game_id=game.game_id).all()}
+    n = 0
+    for r in rows:
+        cj = r.content_json or {}
+        if cj.get("features") and not force:
+            continue
+        cards = cj.get("cards") or []
+        if not cards:
+            continue
+        features, _sols = hand_features([int(c) for c in cards], int(cj.get("target", 24)))
+        r.content_json = {**cj, "features": features}
+        item = items.get(r.external_id)
+        if item is not None and item.content_json is not None:
+            item.content_json = {**item.content_json, "features": features}
+        n += 1
+        if n % LOAD_BATCH == 0:
+            db.session.commit()
+    if n:
+        touch_game(game)
+    db.session.commit()
+    logger.info("features backfilled for %d %s rows", n, game_key)
+    return n
+
+
+__all__ = [
+    "DatasetSpec", "DatasetBuilder", "classify_level",
+    "external_id_for", "bulk_load", "backfill_features",
+]
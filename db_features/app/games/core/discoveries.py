@@ -0,0 +1,139 @@
+# app/games/core/discoveries.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+import logging, re
+
+from .answer_check import canonical_forms, check_expression
+from .bounded_cache import BoundedCache
+from .expr_parser import parse_expression
+from .game_core import hand_key
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Newly discovered solutions (dataset enrichment)
+# ============================================================
+# A correct /api/check answer whose canonical form isn't among the hand's
+# stored solutions is recorded once as an app.events row:
+#   event_type = "game24_new_solution"
+#   data       = {case_id, cards, target, expression}
+# `flask game24-merge-discoveries` re-verifies the recorded expressions and
+# appends the ones still new to the puzzle rows' content_json["solutions"].
+# It only reads events after the last one it merged, whose id it keeps in
+# games.metadata[MERGED_THROUGH_KEY]. RECORDED remembers what this process
+# already wrote, so a class typing the same new answer costs one insert,
+# not one per student.
+
+DISCOVERY_EVENT = "game24_new_solution"
+MERGED_THROUGH_KEY = "discoveries_merged_through"   # last Event.id merge_discoveries has read
+RECORDED = BoundedCache("discoveries", 10_000)
+
+_TOKEN_RE = re.compile(r"\d+|\*\*|[-+*/()]")
+
+
+def spaced(text: str) -> str:
+    """'(1+2)*-(7+1)' -> '(1 + 2) * -(7 + 1)', the spacing stored solutions use."""
+    out: List[str] = []
+    prev = None
+    for tok in _TOKEN_RE.findall(text):
+        if tok in ("+", "-", "*", "/", "**") and (prev is not None and (prev[-1].isdigit() or prev == ")")):
+            out.append(f" {tok} ")
+        else:
+            out.append(tok)
+        prev = tok
+    return "".join(out)
+
+
+def record_discovery(case_id: int, cards: List[int], target: int, answer: str,
+                     form: Any, user_id: Optional[int] = None) -> bool:
+    """Write one event for a new solution; False if already recorded or the insert failed."""
+    from app.db import db
+    from app.models import Event
+
+    key = (int(case_id), form)
+    if RECORDED.get(key):
+        return False
+    expression = spaced(parse_expression(answer).text)
+    try:
+        db.session.add(Event(user_id=user_id, event_type=DISCOVERY_EVENT, data={
+            "case_id": int(case_id),
+            "cards": [int(c) for c in cards],
+            "target": int(target),
+            "expression": expression,
+        }))
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.warning("could not record new solution %r for case %s: %s", expression, case_id, e)
+        return False
+    # only once it is stored: a failed insert is retried by the next correct answer
+    RECORDED.put(key, True)
+    logger.info("new solution for case %s: %s", case_id, expression)
+    return True
+
+
+def merge_discoveries(game_key: str = "game24") -> int:
+    """
+    Append discoveries recorded since the last merge to the puzzle rows (and
+    their game_items twins) after re-checking them against the row's cards,
+    then move the games.metadata watermark past them. Returns solutions added.
+    """
+    from app.db import db
+    from app.models import Event, Game, GameItem, Puzzle
+    from .puzzle_store_game24 import touch_game
+
+    game = Game.query.filter_by(game_key=game_key).first()
+    if game is None:
+        raise ValueError(f"game {game_key!r} not found")
+    # (case_id, hand, target) -> expressions; case ids resolve as in the store loader
+    found: Dict[Tuple[int, int, int], List[str]] = {}
+    meta = dict(game.meta or {})
+    last = int(meta.get(MERGED_THROUGH_KEY) or 0)
+    through = last
+    for ev in (Event.query.filter(Event.event_type == DISCOVERY_EVENT, Event.id > last)
+               .order_by(Event.id.asc())):
+        through = ev.id
+        d = ev.data or {}
+        if d.get("case_id") is not None and d.get("expression") and d.get("cards"):
+            key = (int(d["case_id"]), hand_key(d["cards"]), int(d.get("target", 24)))
+            found.setdefault(key, []).append(d["expression"])
+    if through == last:
+        return 0
+    # committed with the solutions below, so a failed merge re-reads the same events
+    game.meta = {**meta, MERGED_THROUGH_KEY: int(through)}
+    if not found:
+        db.session.commit()
+        return 0
+
+    items = {i.external_id: i for i in GameItem.query.filter_by(game_id=game.game_id).all()}
+    added = 0
+    for r in Puzzle.query.filter_by(game_id=game.game_id).order_by(Puzzle.id.asc()):
+        cj = r.content_json or {}
+        cards = [int(c) for c in cj.get("cards") or []]
+        ext = str(r.external_id or "")
+        case_id = int(ext) if ext.isdigit() else cj.get("case_id")
+        target = int(cj.get("target", 24))
+        exprs = found.get((int(case_id), hand_key(cards), target)) if case_id is not None and cards else None
+        if not exprs:
+            continue
+        sols = list(cj.get("solutions") or [])
+        forms = set(canonical_forms(sols))
+        for expr in exprs:
+            res = check_expression(expr, cards, target)
+            if res.correct and res.canonical is not None and res.canonical not in forms:
+                forms.add(res.canonical)
+                sols.append(expr)
+                added += 1
+        if len(sols) != len(cj.get("solutions") or []):
+            r.content_json = {**cj, "solutions": sols}
+            item = items.get(r.external_id)
+            if item is not None and item.content_json is not None:
+                item.content_json = {**item.content_json, "solutions": sols}
+    if added:
+        touch_game(game)
+    db.session.commit()
+    logger.info("merged %d discovered solution(s) into %s", added, game_key)
+    return added
+
+
+__all__ = ["DISCOVERY_EVENT", "RECORDED", "spaced", "record_discovery", "merge_discoveries"]
@@ -1,68 +1,139 @@
 # app/games/core/evaluator.py
-import ast
-from typing import List, Dict
-
-# These match your original module 1:1  :contentReference[oaicite:1]{index=1}
-ALLOWED_NODES = (
-    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Num, ast.Constant,
-    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd,
-    ast.Load, ast.Name
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from .bounded_cache import BoundedCache
+from .expr_parser import (
+    EvalError, ExprSyntaxError, Instr, Value, apply_op, negate, parse_expression,
 )
+from .rational import Rat, norm, to_float
+
+# ============================================================
+# Shared safe evaluator: compiled, cached closures
+# ============================================================
+# Every place that evaluates an expression string (answer checks, solution
+# walkthroughs, hand features, the legacy safe_eval API) goes through the
+# expr_parser grammar and its apply_op arithmetic: exact (n, d) pairs, the
+# pow limits, intermediate values capped at MAX_VALUE_BITS. Nothing reaches
+# Python's compile/eval.
+#
+# compile_expression() parses once into a postfix program and folds it into
+# nested closures; the Compiled object is cached per expression text, so the
+# same stored solution traced for walkthroughs, profiled for features and
+# re-checked at merge time is parsed once. A closure run can record every
+# binary step (left, op, right, result) for the step-by-step views.
+# (answer_check parses user answers directly: they are cached as verdicts.)
+
+COMPILE_CACHE_SIZE = 20_000
+COMPILE_CACHE = BoundedCache("compiled_expr", COMPILE_CACHE_SIZE)
+MAX_DEPTH = 200     # closures nest one call per level; keeps runs far from the recursion limit
+
+# (left, op, right, result) per binary operation, in evaluation order
+Trace = List[Tuple[Value, str, Value, Value]]
+_Fn = Callable[[Optional[Trace]], Value]
+
+
+def _const(v: Rat) -> _Fn:
+    def run(trace: Optional[Trace]) -> Value:
+        return v
+    return run
+
+
+def _neg(f: _Fn) -> _Fn:
+    def run(trace: Optional[Trace]) -> Value:
+        return negate(f(trace))
+    return run
+
 
-# Your original allows A/T/J/Q/K names; numbers are literal digits in expr
-ALLOWED_NAMES: Dict[str, int] = { 'A':1, 'T':10, 'J':11, 'Q':12, 'K':13 }
+def _binary(op: str, f: _Fn, g: _Fn) -> _Fn:
+    def run(trace: Optional[Trace]) -> Value:
+        a = f(trace)
+        b = g(trace)
+        v = apply_op(op, a, b)
+        if trace is not None:
+            trace.append((a, op, b, v))
+        return v
+    return run
 
-def _extract_used_numbers(expr: str, allowed_names: Dict[str, int]) -> List[int]:
-    """Extract all numbers used in the expression (verbatim copy of your old logic)."""
-    numbers: List[int] = []
-    tokens = (expr.replace('(', ' ').replace(')', ' ')
-                  .replace('+', ' ').replace('-', ' ')
-                  .replace('*', ' ').replace('/', ' ')
-                  .split())
 
-    for token in tokens:
-        if token in allowed_names:
-            numbers.append(allowed_names[token])
-        elif token.isdigit():
-            numbers.append(int(token))
-        elif token in ['A', 'T', 'J', 'Q', 'K']:
-            numbers.append(allowed_names[token])
+def _fold(program: Sequence[Instr]) -> Tuple[_Fn, int]:
+    """Closure tree for a postfix program, plus its depth in binary operations."""
+    stack: List[Tuple[_Fn, int]] = []
+    for ins in program:
+        if isinstance(ins, tuple):
+            stack.append((_const(ins), 0))
+        elif ins == "neg":
+            f, d = stack.pop()
+            stack.append((_neg(f), d))
+        else:
+            (g, dg), (f, df) = stack.pop(), stack.pop()
+            stack.append((_binary(ins, f, g), max(df, dg) + 1))
+    return stack[0]
 
-    return numbers
 
-def _has_division_by_zero(expr: str) -> bool:
-    """Basic “/0” check (same as old)."""
-    return '/0' in expr or '/ 0' in expr
+@dataclass(frozen=True)
+class Compiled:
+    text: str                               # normalised form
+    literals: Tuple[Union[int, float], ...]
+    depth: int                              # nesting depth of binary operations
+    fn: _Fn
+
+    def run(self, trace: Optional[Trace] = None) -> Value:
+        """Exact pair (float after a non-integer exponent); EvalError if it can't be evaluated."""
+        v = self.fn(trace)
+        return norm(v) if isinstance(v, tuple) else v
+
+    def steps(self) -> Optional[Trace]:
+        """Binary operations with their operand / result values, or None on EvalError."""
+        trace: Trace = []
+        try:
+            self.run(trace)
+        except EvalError:
+            return None
+        return trace
+
+
+def compile_expression(text: str) -> Compiled:
+    """Compiled closure for `text`, cached per text (ExprSyntaxError if malformed)."""
+    hit = COMPILE_CACHE.get(text)
+    if hit is not None:
+        return hit
+    parsed = parse_expression(text, program=True)
+    fn, depth = _fold(parsed.program)
+    if depth > MAX_DEPTH:
+        raise ExprSyntaxError("expression too long")
+    out = Compiled(parsed.text, parsed.literals, depth, fn)
+    COMPILE_CACHE.put(text, out)
+    return out
+
+
+def evaluate(text: str) -> Value:
+    """Value of `text`; ExprSyntaxError if malformed, EvalError if it can't be evaluated."""
+    return compile_expression(text).run()
+
 
 def safe_eval(expr: str, input_values: List[int]) -> float:
     """
-    Evaluate the expression safely:
-      - allow only + - * / (and pow in AST list, though you can forbid by removing ast.Pow)
-      - allow rank letters A/T/J/Q/K via ALLOWED_NAMES
-      - require that ALL FOUR input numbers are used exactly once (matches your old check)
-      - basic division-by-zero guard
+    Value of a player's expression as a float, for the older game helpers:
+    every input number used exactly once (rank letters A T J Q K allowed),
+    ValueError otherwise or when it can't be evaluated.
     """
-    # Parse & validate AST
-    tree = ast.parse(expr, mode='eval')
-    for node in ast.walk(tree):
-        if not isinstance(node, ALLOWED_NODES):
-            raise ValueError(f"Illegal expression: {type(node).__name__}")
-        if isinstance(node, ast.Name) and node.id not in ALLOWED_NAMES:
-            raise ValueError(f"Unknown identifier: {node.id}")
-
-    # Compile & eval with a safe globals/locals
-    code = compile(tree, "<expr>", "eval")
-    result = float(eval(code, {"__builtins__": {}}, ALLOWED_NAMES))
-
-    # Use-all-numbers check
-    used_numbers = sorted(_extract_used_numbers(expr, ALLOWED_NAMES))
-    input_numbers = sorted(list(map(int, input_values or [])))
-    if used_numbers != input_numbers:
+    try:
+        c = compile_expression(expr)
+    except ExprSyntaxError as e:
+        raise ValueError(f"Illegal expression: {e}")
+    if any(isinstance(x, float) for x in c.literals) or \
+            sorted(c.literals) != sorted(int(v) for v in input_values or []):
         raise ValueError("Must use all 4 input numbers exactly once")
+    try:
+        v = c.run()
+    except EvalError as e:
+        raise ValueError(str(e).capitalize())
+    return to_float(v) if isinstance(v, tuple) else float(v)
 
-    # Division by zero guard
-    if _has_division_by_zero(expr):
-        raise ValueError("Division by zero is not allowed")
-
-    return result
 
+__all__ = [
+    "Compiled", "Trace", "COMPILE_CACHE", "EvalError", "ExprSyntaxError",
+    "compile_expression", "evaluate", "safe_eval",
+]
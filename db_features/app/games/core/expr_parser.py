@@ -0,0 +1,309 @@
+# app/games/core/expr_parser.py
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
+import math, re
+
+from . import canonical as canon
+from .op_sets import literals_match
+from .rational import (
+    Rat, rat, norm, add, sub, mul, div, neg, pow_int, eq, is_integer, to_float,
+)
+
+# ============================================================
+# Single-pass answer parser for /api/check
+# ============================================================
+# One compiled token regex feeds a Pratt parser that, in the same pass:
+#   - normalises glyphs (× ÷ − ...) and rank letters (A T J Q K)
+#   - collects the literals for the use-each-card check
+#   - evaluates on exact (n, d) pairs; only a non-integer exponent drops the
+#     value to float (irrational results), as the previous checker did
+# Grammar and limits follow Python semantics of the old ast-based checker:
+# ** / ^ bind tighter than unary minus and are right-associative,
+# |base| <= 1e6 and |exponent| <= 12. Evaluation errors (division by zero,
+# oversized powers) don't stop the parse, so literals are always complete and
+# callers can report the card check before the arithmetic error.
+# With canonical=True the same pass also builds the answer's normal form
+# (canonical.py) for matching against a hand's stored solutions; with
+# program=True it records a postfix program that evaluator.py compiles into
+# cached closures. apply_op is the one arithmetic core both use: exact pairs,
+# the pow limits above, and intermediate values capped at MAX_VALUE_BITS
+# (about 1e301, so any exact value still converts to a float for display).
+
+POW_MAX_BASE = 10 ** 6
+POW_MAX_EXP = 12
+MAX_VALUE_BITS = 1000
+MAX_NESTING = 100     # parentheses / unary signs / right-nested powers
+
+_RANKS = {"A": 1, "T": 10, "J": 11, "Q": 12, "K": 13}
+_GLYPHS = {
+    "^": "**", "×": "*", "∗": "*", "·": "*", "÷": "/", "／": "/",
+    "−": "-", "—": "-", "–": "-",
+}
+_TOKEN_RE = re.compile(r"""
+    \s*(?:
+        (?P<num>[0-9]+(?:\.[0-9]*)?|\.[0-9]+)
+      | (?P<rank>[ATJQKatjqk](?:\.[0-9]*)?)(?!\w)
+      | (?P<pow>[*×∗·]{2})
+      | (?P<op>[-+*/^()×∗·÷／−—–])
+    )
+""", re.X)
+_SPACE_RE = re.compile(r"\s*")
+
+# binding powers
+_BP = {"+": 10, "-": 10, "*": 20, "/": 20, "**": 40}
+_UNARY_BP = 30
+
+Value = Union[Rat, float, None]   # None: evaluation failed (see ParsedExpr.error)
+# postfix program: a Rat pushes a literal, "neg" negates, "+" "-" "*" "/" "**" combine
+Instr = Union[Rat, str]
+
+
+class ExprSyntaxError(ValueError):
+    """The answer isn't a well-formed arithmetic expression."""
+
+
+@dataclass(frozen=True)
+class ParsedExpr:
+    text: str                       # normalised form, e.g. "13*(2-1)**3"
+    literals: Tuple[Union[int, float], ...]
+    value: Value                    # exact pair, float (irrational), or None
+    error: Optional[str] = None     # evaluation error, if value is None
+    canonical: Optional[canon.Node] = None   # normal form, if asked for and exact
+    program: Optional[Tuple[Instr, ...]] = None   # postfix form, if asked for
+
+    @property
+    def exact(self) -> bool:
+        return isinstance(self.value, tuple)
+
+    def as_float(self) -> float:
+        if self.value is None:
+            raise ValueError(self.error or "no value")
+        return to_float(self.value) if self.exact else float(self.value)
+
+    def equals(self, target: int) -> bool:
+        if self.value is None:
+            return False
+        if self.exact:
+            return eq(self.value, (int(target), 1))
+        return abs(self.value - float(target)) < 1e-6
+
+    def uses_cards(self, values: Sequence[int], concat: bool = False) -> bool:
+        if any(isinstance(x, float) for x in self.literals):
+            return False
+        return literals_match(self.literals, values, concat=concat)
+
+
+class EvalError(ArithmeticError):
+    """Division by zero, an oversized power or value, or a complex result."""
+
+
+def _bounded(v: Rat) -> Rat:
+    if v[0].bit_length() > MAX_VALUE_BITS or v[1].bit_length() > MAX_VALUE_BITS:
+        v = norm(v)
+        if v[0].bit_length() > MAX_VALUE_BITS or v[1].bit_length() > MAX_VALUE_BITS:
+            raise EvalError("value too large")
+    return v
+
+
+def apply_op(op: str, a: Value, b: Value) -> Value:
+    """`a op b` for op in + - * / ** (EvalError if it can't be evaluated within the limits)."""
+    if isinstance(a, float) or isinstance(b, float):
+        v = _float_op(op, a, b)
+        if not math.isfinite(v):
+            raise EvalError("value too large")
+        return v
+    if op == "+":
+        return _bounded(add(a, b))
+    if op == "-":
+        return _bounded(sub(a, b))
+    if op == "*":
+        return _bounded(mul(a, b))
+    if op == "/":
+        q = div(a, b)
+        if q is None:
+            raise EvalError("division by zero")
+        return _bounded(q)
+    if abs(a[0]) > POW_MAX_BASE * a[1] or abs(b[0]) > POW_MAX_EXP * b[1]:
+        raise EvalError("pow too large")
+    if not is_integer(b):
+        return apply_op(op, to_float(a), to_float(b))
+    p = pow_int(norm(a), b[0] // b[1])
+    if p is None:
+        raise EvalError("division by zero")
+    return _bounded(p)
+
+
+def negate(v: Value) -> Value:
+    return -v if isinstance(v, float) else neg(v)
+
+
+def _float_op(op: str, a: Value, b: Value) -> float:
+    x = a if isinstance(a, float) else to_float(a)
+    y = b if isinstance(b, float) else to_float(b)
+    if op == "+":
+        return x + y
+    if op == "-":
+        return x - y
+    if op == "*":
+        return x * y
+    if op == "/":
+        if abs(y) < 1e-12:
+            raise EvalError("division by zero")
+        return x / y
+    if abs(x) > POW_MAX_BASE or abs(y) > POW_MAX_EXP:
+        raise EvalError("pow too large")
+    if x < 0 and y != int(y):
+        raise EvalError("complex result")
+    try:
+        return x ** y
+    except ZeroDivisionError:
+        raise EvalError("division by zero")
+    except OverflowError:
+        raise EvalError("value too large")
+
+
+class _Parser:
+    __slots__ = ("src", "pos", "kind", "tok", "out", "literals", "error", "canon", "node", "prog", "depth")
+
+    def __init__(self, src: str, canonical: bool = False, program: bool = False):
+        self.src = src
+        self.canon = canonical
+        self.prog: Optional[List[Instr]] = [] if program else None
+        self.depth = 0
+        self.node: Optional[canon.Node] = None   # normal form of the last parsed operand
+        self.pos = 0
+        self.out: List[str] = []
+        self.literals: List[Union[int, float]] = []
+        self.error: Optional[str] = None
+        self._advance()
+
+    def _advance(self) -> None:
+        m = _TOKEN_RE.match(self.src, self.pos)
+        if m is None:
+            end = _SPACE_RE.match(self.src, self.pos).end()
+            if end != len(self.src):
+                raise ExprSyntaxError(f"unexpected character at {end}: {self.src[end]!r}")
+            self.kind, self.tok, self.pos = "end", "", end
+            return
+        self.pos = m.end()
+        kind = m.lastgroup
+        tok = m.group(kind)
+        if kind == "pow":       # any two multiplication glyphs, as with str.replace before
+            kind, tok = "op", "**"
+        elif kind == "op":
+            tok = _GLYPHS.get(tok, tok)
+        self.kind, self.tok = kind, tok
+
+    def _fail(self, why: str) -> None:
+        if self.error is None:
+            self.error = why
+
+    def parse(self) -> Value:
+        v = self._expr(0)
+        if self.kind != "end":
+            raise ExprSyntaxError(f"unexpected {self.tok!r}")
+        return v
+
+    def _expr(self, rbp: int) -> Value:
+        self.depth += 1
+        if self.depth > MAX_NESTING:
+            raise ExprSyntaxError("expression nested too deeply")
+        left = self._prefix()
+        node = self.node
+        while self.kind == "op" and _BP.get(self.tok, 0) > rbp:
+            op = self.tok
+            self.out.append(op)
+            self._advance()
+            # ** is right-associative and its operand may carry a unary sign
+            right = self._expr(_BP[op] - 1 if op == "**" else _BP[op])
+            if left is not None and right is not None:
+                try:
+                    left = apply_op(op, left, right)
+                except EvalError as e:
+                    self._fail(str(e))
+                    left = None
+            else:
+                left = None
+            if self.prog is not None:
+                self.prog.append(op)
+            if self.canon:
+                node = canon.combine(op, node, self.node, left) if node and self.node else None
+        self.node = node
+        self.depth -= 1
+        return left
+
+    def _decimal(self, tok: str) -> Value:
+        v = rat(tok)
+        self.literals.append(int(tok.split(".")[0] or 0) if is_integer(v) else float(tok))
+        self.out.append(tok)
+        self.node = None    # decimals never match a card, so never a known solution
+        if self.prog is not None:
+            self.prog.append(v)
+        return v
+
+    def _prefix(self) -> Value:
+        kind, tok = self.kind, self.tok
+        if kind == "num":
+            if len(tok) > 1 and tok[0] == "0" and tok.isdigit() and tok.strip("0"):
+                raise ExprSyntaxError("leading zeros in integer literal")
+            self._advance()
+            if tok.isdigit():
+                n = int(tok)
+                self.literals.append(n)
+                self.out.append(str(n))
+                self.node = canon.atom(n) if self.canon else None
+                if self.prog is not None:
+                    self.prog.append((n, 1))
+                return (n, 1)
+            return self._decimal(tok)
+        if kind == "rank":
+            # "K" -> 13; a trailing decimal part reads like the digits would ("K." -> 13.)
+            n = _RANKS[tok[0].upper()]
+            self._advance()
+            if len(tok) > 1:
+                return self._decimal(f"{n}{tok[1:]}")
+            self.literals.append(n)
+            self.out.append(str(n))
+            self.node = canon.atom(n) if self.canon else None
+            if self.prog is not None:
+                self.prog.append((n, 1))
+            return (n, 1)
+        if kind == "op" and tok in ("-", "+"):
+            self.out.append(tok)
+            self._advance()
+            v = self._expr(_UNARY_BP)
+            if tok == "-" and self.prog is not None:
+                self.prog.append("neg")
+            if tok == "+" or v is None:
+                return v
+            if self.node:
+                self.node = canon.negate(self.node, v)
+            return negate(v)
+        if kind == "op" and tok == "(":
+            self.out.append("(")
+            self._advance()
+            v = self._expr(0)
+            if self.kind != "op" or self.tok != ")":
+                raise ExprSyntaxError("missing ')'")
+            self.out.append(")")
+            self._advance()
+            return v
+        raise ExprSyntaxError("unexpected end of expression" if kind == "end" else f"unexpected {tok!r}")
+
+
+def parse_expression(text: str, canonical: bool = False, program: bool = False) -> ParsedExpr:
+    """Normalise, collect literals and evaluate `text` in one pass (ExprSyntaxError if malformed)."""
+    p = _Parser(text or "", canonical, program)
+    value = p.parse()
+    if value is not None and isinstance(value, tuple):
+        value = norm(value)
+    node = p.node if canonical and isinstance(value, tuple) else None
+    return ParsedExpr(text="".join(p.out), literals=tuple(p.literals), value=value, error=p.error,
+                      canonical=node, program=tuple(p.prog) if program else None)
+
+
+__all__ = [
+    "ParsedExpr", "ExprSyntaxError", "EvalError", "Instr", "Value", "parse_expression",
+    "apply_op", "negate", "POW_MAX_BASE", "POW_MAX_EXP", "MAX_VALUE_BITS", "MAX_NESTING",
+]
@@ -0,0 +1,256 @@
+# app/games/core/feature_index.py
+from __future__ import annotations
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Mapping, Optional, Tuple
+import random
+
+from .game_core import score_expression_complexity
+from .hand_features import features_from_solutions
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .puzzle_store_game24 import Game24Store
+
+# ============================================================
+# Puzzle feature bitsets and the pool query API (/api/pool/query)
+# ============================================================
+# Teachers build custom / competition pools from constraints instead of
+# typing case ids: "20 solvable hands needing division, no repeated ranks,
+# medium". Every boolean feature is one bitset over store rows (a Python
+# int, bit r = row r, like the target bitmaps in target_index.py), and every
+# small-int feature is one bitset per value, so a query is a handful of
+# big-int ANDs / ORs over ~30 machine words, then a sample of the set bits.
+#
+#   level            easy | medium | hard (stored level)
+#   band             low | mid | high: complexity of the easiest solution
+#                    (<= SIMPLE_THRESHOLD, >= HARD_THRESHOLD, between); none
+#   n_solutions      stored features, else the number of stored solutions
+#   needs_division / needs_fraction / needs_exponent
+#                    stored features, else read off the stored solutions
+#   repeated_ranks   two cards of the same rank
+#   face_cards       a J, Q or K (11-13)
+#   solvable         per target: 24 from the stored solutions, others from
+#                    the solution table (built on first use, then cached)
+#
+# The index belongs to one store version (Game24Store.feature_index()).
+
+BANDS = ("none", "low", "mid", "high")
+BOOL_FEATURES = ("needs_division", "needs_fraction", "needs_exponent", "repeated_ranks", "face_cards")
+STRATA = ("band", "level", "none")
+MAX_SOLVABLE_TARGETS = 8
+
+_BYTE_BITS = tuple(tuple(j for j in range(8) if b >> j & 1) for b in range(256))
+_TRUE = {"1", "true", "yes", "on"}
+_FALSE = {"0", "false", "no", "off"}
+
+
+class QueryError(ValueError):
+    """A constraint the index can't parse or answer."""
+
+
+def bits_of(flags: Iterable[bool]) -> int:
+    """Bitset with bit r set where flags[r] is true."""
+    s = "".join("1" if f else "0" for f in flags)
+    return int(s[::-1], 2) if s else 0
+
+
+def rows_of(mask: int) -> List[int]:
+    """Set bit positions of mask, ascending."""
+    out: List[int] = []
+    for i, byte in enumerate(mask.to_bytes((mask.bit_length() + 7) // 8, "little")):
+        if byte:
+            base = 8 * i
+            out.extend(base + j for j in _BYTE_BITS[byte])
+    return out
+
+
+def _as_bool(name: str, v: Any) -> bool:
+    if isinstance(v, bool):
+        return v
+    if isinstance(v, (int, str)) and str(v).strip().lower() in _TRUE | _FALSE:
+        return str(v).strip().lower() in _TRUE
+    raise QueryError(f"{name} must be true or false")
+
+
+def _as_list(name: str, v: Any) -> List[Any]:
+    if isinstance(v, str):
+        return [x.strip() for x in v.split(",") if x.strip()]
+    if isinstance(v, (list, tuple)):
+        return list(v)
+    if isinstance(v, (int, bool)):
+        return [v]
+    raise QueryError(f"{name} must be a value or a list")
+
+
+def _as_int(name: str, v: Any) -> int:
+    try:
+        return int(v)
+    except (TypeError, ValueError):
+        raise QueryError(f"{name} must be an integer")
+
+
+class FeatureIndex:
+    def __init__(self, store: "Game24Store"):
+        from .puzzle_store_game24 import (
+            FLAG_FEATURES, FLAG_HAS_SOL, FLAG_NEEDS_DIVISION, FLAG_NEEDS_EXPONENT, FLAG_NEEDS_FRACTION,
+            HARD_THRESHOLD, NONE, SIMPLE_THRESHOLD,
+        )
+        self.store = store
+        self.version = store.version
+        n = self.n = len(store)
+        flags, cards = store.flags, store.cards
+
+        need: Dict[str, List[bool]] = {k: [False] * n for k in ("needs_division", "needs_fraction", "needs_exponent")}
+        n_sol: List[int] = []
+        band: List[str] = []
+        for r in range(n):
+            f = flags[r]
+            if f & FLAG_FEATURES:
+                need["needs_division"][r] = bool(f & FLAG_NEEDS_DIVISION)
+                need["needs_fraction"][r] = bool(f & FLAG_NEEDS_FRACTION)
+                need["needs_exponent"][r] = bool(f & FLAG_NEEDS_EXPONENT)
+                n_sol.append(store.n_sol[r])
+                easiest = None if store.min_cx[r] == NONE else store.min_cx[r]
+            else:
+                sols = store._solutions(r)
+                derived = features_from_solutions(sols)
+                for k in need:
+                    need[k][r] = derived[k]
+                n_sol.append(len(sols))
+                easiest = min((score_expression_complexity(s) for s in sols), default=None)
+            if not f & FLAG_HAS_SOL or easiest is None:
+                band.append("none")
+            else:
+                band.append("low" if easiest <= SIMPLE_THRESHOLD else
+                            "high" if easiest >= HARD_THRESHOLD else "mid")
+
+        hands = [cards[4 * r:4 * r + 4] for r in range(n)]
+        self.bools: Dict[str, int] = {k: bits_of(v) for k, v in need.items()}
+        self.bools["repeated_ranks"] = bits_of(len(set(h)) < len(h) for h in hands)
+        self.bools["face_cards"] = bits_of(any(c >= 11 for c in h) for h in hands)
+        self.level = self._by_value([(store._level_names[store.levels[r]] or "").lower() for r in range(n)])
+        self.level_names: Tuple[str, ...] = tuple(sorted(
+            {(name or "").lower() for name in store._level_names} - {""}))
+        self.band = self._by_value(band)
+        self.n_solutions = self._by_value(n_sol)
+        winners = set(store._id_rows)
+        self.all = bits_of(r in winners for r in range(n))   # one row per case_id
+        self._solvable: Dict[int, int] = {24: bits_of(bool(flags[r] & FLAG_HAS_SOL) for r in range(n))}
+
+    @staticmethod
+    def _by_value(values: List[Any]) -> Dict[Any, int]:
+        rows: Dict[Any, List[bool]] = {}
+        for r, v in enumerate(values):
+            rows.setdefault(v, [False] * len(values))[r] = True
+        return {v: bits_of(f) for v, f in rows.items()}
+
+    def solvable(self, target: int) -> int:
+        hit = self._solvable.get(target)
+        if hit is not None:
+            return hit
+        ids = self.store.solvable_case_ids(target)
+        if ids is None:
+            raise QueryError(f"solvability for target {target} needs the solution table "
+                             f"(flask game24-build-solution-table)")
+        ids_col = self.store.ids
+        mask = bits_of(ids_col[r] in ids for r in range(self.n))
+        self._solvable[target] = mask
+        return mask
+
+    # -------- queries --------
+    def mask(self, constraints: Mapping[str, Any]) -> int:
+        """Rows matching every constraint (unknown keys are an error)."""
+        m = self.all
+        for key, v in constraints.items():
+            if v is None:
+                continue
+            if key in BOOL_FEATURES:
+                bits = self.bools[key]
+                m &= bits if _as_bool(key, v) else ~bits
+            elif key == "level":
+                m &= self._any_of(self.level, [str(x).strip().lower() for x in _as_list(key, v)], key,
+                                  self.level_names)
+            elif key == "band":
+                m &= self._any_of(self.band, [str(x).strip().lower() for x in _as_list(key, v)], key, BANDS)
+            elif key == "n_solutions":
+                m &= self._n_solutions(v)
+            elif key in ("solvable", "unsolvable"):
+                targets = [_as_int(key, t) for t in _as_list(key, v)]
+                if len(targets) > MAX_SOLVABLE_TARGETS:
+                    raise QueryError(f"at most {MAX_SOLVABLE_TARGETS} targets per query")
+                for t in targets:
+                    m &= self.solvable(t) if key == "solvable" else ~self.solvable(t)
+            else:
+                raise QueryError(f"unknown constraint {key!r}")
+        return m & self.all
+
+    def _any_of(self, table: Dict[Any, int], values: List[str], name: str,
+                allowed: Optional[Tuple[str, ...]] = None) -> int:
+        out = 0
+        for v in values:
+            if allowed is not None and v not in allowed:
+                raise QueryError(f"{name} must be one of {', '.join(allowed)}")
+            out |= table.get(v, 0)
+        return out
+
+    def _n_solutions(self, v: Any) -> int:
+        if isinstance(v, Mapping):
+            lo = _as_int("n_solutions.min", v.get("min", 0))
+            hi = _as_int("n_solutions.max", v["max"]) if v.get("max") is not None else None
+        else:
+            lo = hi = _as_int("n_solutions", v)
+        out = 0
+        for k, bits in self.n_solutions.items():
+            if k >= lo and (hi is None or k <= hi):
+                out |= bits
+        return out
+
+    def query(
+        self,
+        constraints: Mapping[str, Any],
+        count: Optional[int] = None,
+        stratify: str = "band",
+        rng: random.Random = random,
+    ) -> Dict[str, Any]:
+        """
+        {"case_ids", "matched", "strata"}: up to `count` matching case ids
+        (all of them when count is None), spread evenly over the `stratify`
+        feature's values, in random order.
+        """
+        if stratify not in STRATA:
+            raise QueryError(f"stratify must be one of {', '.join(STRATA)}")
+        m = self.mask(constraints)
+        matched = m.bit_count()
+        table = {"band": self.band, "level": self.level}.get(stratify) or {"all": self.all}
+        strata = {k: rows_of(m & bits) for k, bits in sorted(table.items(), key=lambda kv: str(kv[0]))}
+        strata = {k: rows for k, rows in strata.items() if rows}
+        want = matched if count is None else max(0, min(int(count), matched))
+        take = _allocate({k: len(rows) for k, rows in strata.items()}, want)
+        picked: List[int] = []
+        for k, rows in strata.items():
+            picked.extend(rng.sample(rows, take[k]))
+        rng.shuffle(picked)
+        ids = self.store.ids
+        return {
+            "case_ids": [ids[r] for r in picked],
+            "matched": matched,
+            "strata": {str(k): take[k] for k in strata},
+        }
+
+
+def _allocate(sizes: Dict[Any, int], want: int) -> Dict[Any, int]:
+    """Equal shares of `want` over the strata, capped at each stratum's size."""
+    take = {k: 0 for k in sizes}
+    open_ = [k for k in sizes if sizes[k]]
+    left = want
+    while left and open_:
+        share, extra = divmod(left, len(open_))
+        for i, k in enumerate(open_):
+            add = min(share + (i < extra), sizes[k] - take[k])
+            take[k] += add
+            left -= add
+        open_ = [k for k in open_ if take[k] < sizes[k]]
+    return take
+
+
+__all__ = [
+    "BANDS", "BOOL_FEATURES", "STRATA", "FeatureIndex", "QueryError", "bits_of", "rows_of",
+]
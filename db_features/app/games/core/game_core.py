@@ -12,8 +12,14 @@ from sqlalchemy import text, bindparam
 from sqlalchemy.dialects.postgresql import JSONB
 import json, secrets
 import time, hashlib, base64, secrets, json, logging
-from fractions import Fraction
-from functools import lru_cache
+
+from .bounded_cache import BoundedCache
+from .step_budget import tick
+from .op_sets import (
+    DEFAULT_OP_SET, OP_SETS, allows_concat, allows_pow, concat_groupings, normalize_op_set, pow_rat,
+)
+from .rational import norm as rat_norm, eq as rat_eq
+from .subset_solver import ATOM, MUL, ADD, solve_subset, enumerate_subset_solutions
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +34,59 @@ def values_key(vals: List[int]) -> str:
     """
     return "-".join(f"{int(x):02d}" for x in sorted(map(int, vals or [])))
 
+# Packed hand keys: the in-process form of values_key. Sorted ranks 0..31 go
+# in 5-bit fields under a leading 1 bit (so hand length is part of the key):
+# [4, 8, 1, 8] -> 0b1_00001_00100_01000_01000. Ints hash and compare without
+# building a string, and keys of equal-length hands sort like the hands.
+# Anything else (negative or large values) gets a negative key with zigzag
+# fields as wide as its widest value. values_key() stays the string form for
+# JSON, files and logs; hand_key_str() / parse_hand_key() convert.
+HAND_BITS = 5
+_HAND_MASK = (1 << HAND_BITS) - 1
+
+def hand_key(vals) -> int:
+    """Packed int key of a hand (any order; ValueError for non-integers)."""
+    vs = sorted(map(int, vals or ()))
+    key = 1
+    for v in vs:
+        if v >> HAND_BITS:
+            return _wide_hand_key(vs)
+        key = key << HAND_BITS | v
+    return key
+
+def _wide_hand_key(vs: List[int]) -> int:
+    zz = [v << 1 if v >= 0 else (-v << 1) - 1 for v in vs]
+    width = max(z.bit_length() for z in zz)   # < 2**16 for anything int() accepts
+    key = 1
+    for z in zz:
+        key = key << width | z
+    return -(key << 16 | width)
+
+def hand_values(key: int) -> List[int]:
+    """Sorted values of a hand_key()."""
+    width, mask = HAND_BITS, _HAND_MASK
+    wide = key < 0
+    if wide:
+        key = -key
+        width, key = key & 0xFFFF, key >> 16
+        mask = (1 << width) - 1
+    out = []
+    while key > 1:
+        out.append(key & mask)
+        key >>= width
+    out.reverse()
+    if wide:
+        out = [z >> 1 if not z & 1 else -((z + 1) >> 1) for z in out]
+    return out
+
+def hand_key_str(key: int) -> str:
+    """values_key() form of a packed key."""
+    return values_key(hand_values(key))
+
+def parse_hand_key(text: str) -> int:
+    """Packed key from a values_key string, zero-padded ("01-04-08-08") or not ("1-4-8-8")."""
+    return hand_key(int(x) for x in str(text).split("-") if x)
+
 def normalize_level(level: str) -> str:
     """
     Normalizes UI level -> canonical level (supports 'all' + 'nosol' too).
@@ -110,6 +169,7 @@ def default_state() -> Dict[str, Any]:
             "answer_correct": 0,
             "answer_wrong": 0,
             "deal_swaps": 0,
+            "hints": 0,               # hint rungs served by /api/hint
 
             # optional per-level tallies (used by some summaries)
             "by_level": {},  # level -> {played, solved}
@@ -147,6 +207,7 @@ def stats_payload(state: Dict[str, Any]) -> Dict[str, Any]:
         "answer_correct": s.get("answer_correct", 0),
         "answer_wrong": s.get("answer_wrong", 0),
         "deal_swaps": s.get("deal_swaps", 0),
+        "hints": s.get("hints", 0),
     }
 
 def ensure_played_once2(state: Dict[str, Any]) -> None:
@@ -415,6 +476,12 @@ def bump_help(state: Dict[str, Any], all: bool = False) -> None:
     else:
         st["help_single"] = int(st.get("help_single", 0)) + 1
 
+def bump_hint(state: Dict[str, Any], level: int) -> None:
+    st = state.setdefault("stats", {})
+    st["hints"] = int(st.get("hints", 0)) + 1
+    by = st.setdefault("hints_by_level", {})
+    by[str(level)] = int(by.get(str(level), 0)) + 1
+
 def bump_attempt(state: Dict[str, Any], correct: bool) -> None:
     st = state.setdefault("stats", {})
     st["answer_attempts"] = int(st.get("answer_attempts", 0)) + 1
@@ -643,78 +710,259 @@ def _persist_plays(db, state: Dict, game_id: int, sess_id: int) -> None:
 # game10 and 36 helpers
 # ============================================================
 
-_OPS = [
-    ("+", lambda a,b: a+b),
-    ("-", lambda a,b: a-b),
-    ("*", lambda a,b: a*b),
-    ("/", lambda a,b: a/b if b != 0 else None),
-]
+# hands this large go to the subset-DP engine (see subset_solver.py)
+SUBSET_SOLVER_MIN_CARDS = 5
+
+# Numeric-only memo for the recursive search: (sorted values, target) -> reachable?
+# Expressions are rebuilt afterwards by replaying merges that keep the target
+# reachable, so no strings are cached and custom targets can't grow memory forever.
+# Values are (numerator, denominator) int pairs (see rational.py); they are
+# reduced only when they become part of a memo key.
+# One memo per operator set (op_sets.py); "solver" is the basic + - * / set.
+SOLVER_CACHE_SIZE = 50_000
+SOLVER_CACHE_BYTES = 32 * 1024 * 1024
+SOLVER_CACHES: Dict[str, BoundedCache] = {
+    name: BoundedCache("solver" if name == DEFAULT_OP_SET else f"solver:{name}",
+                       SOLVER_CACHE_SIZE, SOLVER_CACHE_BYTES)
+    for name in OP_SETS
+}
+SOLVER_CACHE = SOLVER_CACHES[DEFAULT_OP_SET]
+
+def configure_solver_cache(max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+    """Apply GAME24_SOLVER_CACHE_SIZE / GAME24_SOLVER_CACHE_BYTES (called from create_app)."""
+    for cache in SOLVER_CACHES.values():
+        cache.resize(max_entries=max_entries, max_bytes=max_bytes)
+
+def clear_solver_cache() -> None:
+    for cache in SOLVER_CACHES.values():
+        cache.clear()
+
+def _merges(nums, pow_ok=False):
+    """
+    (i, j, sym, value): every distinct way to merge two entries of nums.
+    i is the left operand, j the right; duplicate value pairs are tried once.
+    Arithmetic is inlined on (n, d) pairs and left unreduced; with pow_ok,
+    bounded integer powers (op_sets.pow_rat) are tried in both directions.
+    """
+    n = len(nums)
+    seen = set()
+    for x in range(n):
+        for y in range(x+1, n):
+            i, j = x, y
+            (an, ad), (bn, bd) = nums[x], nums[y]
+            if an * bd > bn * ad:
+                i, j, an, ad, bn, bd = y, x, bn, bd, an, ad
+            pair = (nums[i], nums[j])
+            if pair in seen:
+                continue
+            seen.add(pair)
+            den = ad * bd
+            yield i, j, "+", (an * bd + bn * ad, den)
+            yield i, j, "*", (an * bn, den)
+            yield i, j, "-", (an * bd - bn * ad, den)
+            yield j, i, "-", (bn * ad - an * bd, den)
+            if bn:
+                yield i, j, "/", ((an * bd, ad * bn) if bn > 0 else (-an * bd, -ad * bn))
+            if an:
+                yield j, i, "/", ((bn * ad, bd * an) if an > 0 else (-bn * ad, -bd * an))
+            if pow_ok:
+                p = pow_rat(nums[i], nums[j])
+                if p is not None:
+                    yield i, j, "^", p
+                p = pow_rat(nums[j], nums[i])
+                if p is not None:
+                    yield j, i, "^", p
+
+def _rest(seq, i, j):
+    return tuple(seq[k] for k in range(len(seq)) if k != i and k != j)
+
+def _can_reach(nums, target, op_set=DEFAULT_OP_SET) -> bool:
+    """nums: sorted, reduced pairs; target: reduced pair. The only memoised level."""
+    n = len(nums)
+    if n == 1:
+        return nums[0] == target
+    pow_ok = allows_pow(op_set)
+    tn, td = target
+    if n == 2:
+        # last merge: compare by cross-multiplication, no reduction needed
+        return any(v[0] * td == tn * v[1] for _i, _j, _sym, v in _merges(nums, pow_ok))
+    cache = SOLVER_CACHES[op_set]
+    key = (nums, target)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit
+    tick(n * n)
+    found = False
+    for i, j, _sym, val in _merges(nums, pow_ok):
+        if _can_reach(tuple(sorted(_rest(nums, i, j) + (rat_norm(val),))), target, op_set):
+            found = True
+            break
+    cache.put(key, found)
+    return found
+
+def _hands_for(values, op_set):
+    """The hand itself, plus every concatenation grouping when the set allows it."""
+    if allows_concat(op_set):
+        return list(concat_groupings(values))
+    return [tuple(int(x) for x in values)]
 
-def solve_one(values, target):
+def solve_one(values, target, op_set=DEFAULT_OP_SET):
     """Return one infix solution string or None."""
-    nums = tuple(Fraction(x) for x in values)
-    exps = tuple(str(int(x)) for x in values)
-    return _search_one(nums, exps, Fraction(int(target)))
+    op_set = normalize_op_set(op_set)
+    if op_set == DEFAULT_OP_SET and len(values) >= SUBSET_SOLVER_MIN_CARDS:
+        return solve_subset(values, int(target))
+    # concatenated hands are searched with the plain arithmetic memo
+    search_set = DEFAULT_OP_SET if allows_concat(op_set) else op_set
+    for hand in _hands_for(values, op_set):
+        nums = tuple((int(x), 1) for x in hand)
+        exps = tuple(str(int(x)) for x in hand)
+        expr = _search_one(nums, exps, (int(target), 1), search_set)
+        if expr is not None:
+            return expr
+    return None
 
-@lru_cache(maxsize=None)
-def _search_one(nums, exps, target):
+def _search_one(nums, exps, target, op_set=DEFAULT_OP_SET):
+    """Rebuild one expression by following merges that keep the target reachable."""
     n = len(nums)
     if n == 1:
-        return exps[0] if nums[0] == target else None
-    for i in range(n):
-        for j in range(i+1, n):
-            a,b = nums[i], nums[j]
-            ea,eb = exps[i], exps[j]
-            restn = [nums[k] for k in range(n) if k not in (i,j)]
-            reste = [exps[k] for k in range(n) if k not in (i,j)]
-            for sym,fn in _OPS:
-                if sym in ("+","*") and a > b:
-                    a1,b1,ea1,eb1 = b,a,eb,ea
-                else:
-                    a1,b1,ea1,eb1 = a,b,ea,eb
-                try:
-                    res = fn(a1,b1)
-                except ZeroDivisionError:
-                    res = None
-                if res is None:
-                    continue
-                out = _search_one(tuple(restn+[res]), tuple(reste+[f"({ea1}{sym}{eb1})"]), target)
-                if out: return out
+        return exps[0] if rat_eq(nums[0], target) else None
+    for i, j, sym, val in _merges(nums, allows_pow(op_set)):
+        restn = _rest(nums, i, j) + (rat_norm(val),)
+        if _can_reach(tuple(sorted(restn)), target, op_set):
+            reste = _rest(exps, i, j) + (f"({exps[i]}{sym}{exps[j]})",)
+            return _search_one(restn, reste, target, op_set)
     return None
 
-def enumerate_solutions(values, target, limit=50):
-    """Return up to `limit` unique infix solutions."""
-    target = Fraction(int(target))
-    sols, seen = [], set()
-    def dfs(nums, exps):
-        if len(sols) >= limit: return
-        n = len(nums)
-        if n == 1:
-            if nums[0] == target:
-                s = exps[0]
-                if s not in seen:
-                    seen.add(s); sols.append(s)
+# -------- canonical enumeration --------
+# Each partial expression carries a normal form (its key) so equivalent trees
+# are pruned while searching instead of filtered afterwards:
+#   atoms          ("#", v)
+#   + / - chains   ("+", positive terms, negative terms)   both sorted, flattened
+#   * / / chains   ("*", numerator factors, denominator factors)
+# so a+(b+c), (c+a)+b and a-(-b-c) share one key; "- 0" folds into "+ 0" and
+# "/ 1" into "* 1"; and for targets >= 0 only non-negative differences are
+# formed (any solution has a sign-free form, so x-(a-b) never needs a<b).
+# Powers are opaque nodes ("^", base, exponent); with ^ enabled the sign rule
+# is off, since a negative exponent is not interchangeable with its absolute value.
+
+_ZERO_KEY = ("#", 0)
+_ONE_KEY = ("#", 1)
+
+def _chain_terms(key, op):
+    """(positive, negative) operands of `key` as part of an `op` chain."""
+    return (key[1], key[2]) if key[0] == op else ((key,), ())
+
+def _chain(op, pos, neg, invert=False):
+    """Join two flattened chains; `invert` swaps the second operand's sides (- and /)."""
+    (pa, na), (pb, nb) = pos, neg
+    if invert:
+        pb, nb = nb, pb
+    p, n = pa + pb, na + nb
+    unit = _ZERO_KEY if op == "+" else _ONE_KEY
+    if unit in n:
+        p += tuple(k for k in n if k == unit)
+        n = tuple(k for k in n if k != unit)
+    return (op, tuple(sorted(p)), tuple(sorted(n)))
+
+def _combine(a, b, nonneg, pow_ok=False):
+    """Distinct (value, key) results of merging nodes a and b."""
+    (va, ka), (vb, kb) = a, b
+    ta, tb = _chain_terms(ka, "+"), _chain_terms(kb, "+")
+    fa, fb = _chain_terms(ka, "*"), _chain_terms(kb, "*")
+    (an, ad), (bn, bd) = va, vb
+    cmp = an * bd - bn * ad
+    out = [
+        (rat_norm((an * bd + bn * ad, ad * bd)), _chain("+", ta, tb)),
+        (rat_norm((an * bn, ad * bd)), _chain("*", fa, fb)),
+    ]
+    if cmp >= 0 or not nonneg:
+        out.append((rat_norm((an * bd - bn * ad, ad * bd)), _chain("+", ta, tb, invert=vb[0] != 0)))
+    if cmp < 0 or (cmp > 0 and not nonneg):
+        out.append((rat_norm((bn * ad - an * bd, ad * bd)), _chain("+", tb, ta, invert=va[0] != 0)))
+    if bn:
+        q = (an * bd, ad * bn) if bn > 0 else (-an * bd, -ad * bn)
+        out.append((rat_norm(q), _chain("*", fa, fb, invert=vb != (1, 1))))
+    if an and cmp != 0:
+        q = (bn * ad, bd * an) if an > 0 else (-bn * ad, -bd * an)
+        out.append((rat_norm(q), _chain("*", fb, fa, invert=va != (1, 1))))
+    if pow_ok:
+        # x ^ 1 is x * 1 again; x ^ 0 and 1 ^ x stay (they are how a card is "spent")
+        p = pow_rat(va, vb) if vb != (1, 1) else None
+        if p is not None:
+            out.append((p, ("^", ka, kb)))
+        p = pow_rat(vb, va) if va != (1, 1) and ka != kb else None
+        if p is not None:
+            out.append((p, ("^", kb, ka)))
+    return out
+
+def _render_key(key) -> Tuple[str, int]:
+    """Minimal-parentheses infix for a normal form (terms and factors are pre-sorted)."""
+    if key[0] == "#":
+        return str(key[1]), ATOM
+    if key[0] == "^":
+        (eb, pb), (ee, pe) = _render_key(key[1]), _render_key(key[2])
+        base = eb if pb >= ATOM else f"({eb})"
+        exp = ee if pe >= ATOM else f"({ee})"
+        # binds tighter than * and /, but never left unparenthesised as a base
+        return f"{base} ^ {exp}", MUL
+    op, pos, neg = key
+    parts = [_render_key(k) for k in pos]
+    if op == "+":
+        # terms of a flattened sum are never sums themselves
+        s = " + ".join(e for e, _p in parts)
+        for k in neg:
+            e, _p = _render_key(k)
+            s = f"{s} - {e}" if s else f"-{e}"
+        return s, ADD
+    s = " * ".join(e if p >= MUL else f"({e})" for e, p in parts)
+    for k in neg:
+        e, p = _render_key(k)
+        s += f" / {e}" if p >= ATOM else f" / ({e})"
+    return s, MUL
+
+def enumerate_solutions(values, target, limit=50, op_set=DEFAULT_OP_SET):
+    """Return up to `limit` solutions, one per equivalence class of expression trees."""
+    op_set = normalize_op_set(op_set)
+    if op_set == DEFAULT_OP_SET and len(values) >= SUBSET_SOLVER_MIN_CARDS:
+        return enumerate_subset_solutions(values, int(target), limit=limit)
+    search_set = DEFAULT_OP_SET if allows_concat(op_set) else op_set
+    pow_ok = allows_pow(search_set)
+    target = (int(target), 1)
+    nonneg = target[0] >= 0 and not pow_ok
+    sols, seen_out, seen_states = [], set(), set()
+
+    def dfs(nodes):
+        if len(nodes) == 1:
+            val, key = nodes[0]
+            if val == target and key not in seen_out:
+                seen_out.add(key)
+                sols.append(_render_key(key)[0])
             return
-        for i in range(n):
-            for j in range(i+1, n):
-                a,b = nums[i], nums[j]
-                ea,eb = exps[i], exps[j]
-                restn = [nums[k] for k in range(n) if k not in (i,j)]
-                reste = [exps[k] for k in range(n) if k not in (i,j)]
-                for sym,fn in _OPS:
-                    if sym in ("+","*") and a > b:
-                        a1,b1,ea1,eb1 = b,a,eb,ea
-                    else:
-                        a1,b1,ea1,eb1 = a,b,ea,eb
-                    try:
-                        res = fn(a1,b1)
-                    except ZeroDivisionError:
-                        res = None
-                    if res is None:
+        tried = set()
+        for x in range(len(nodes)):
+            for y in range(x + 1, len(nodes)):
+                pair = (nodes[x][1], nodes[y][1])
+                if pair in tried:
+                    continue
+                tried.add(pair)
+                rest = nodes[:x] + nodes[x+1:y] + nodes[y+1:]
+                tick()
+                for node in _combine(nodes[x], nodes[y], nonneg, pow_ok):
+                    child = tuple(sorted(rest + (node,), key=lambda nd: nd[1]))
+                    state = tuple(nd[1] for nd in child)
+                    if state in seen_states:
                         continue
-                    dfs(tuple(restn+[res]), tuple(reste+[f"({ea1}{sym}{eb1})"]))
-                    if len(sols) >= limit: return
-    dfs(tuple(Fraction(x) for x in values), tuple(str(int(x)) for x in values))
+                    seen_states.add(state)
+                    if not _can_reach(tuple(sorted(nd[0] for nd in child)), target, search_set):
+                        continue
+                    dfs(child)
+                    if len(sols) >= limit:
+                        return
+
+    for hand in _hands_for(values, op_set):
+        dfs(tuple(sorted((((int(x), 1), ("#", int(x))) for x in hand), key=lambda nd: nd[1])))
+        if len(sols) >= limit:
+            break
     return sols
 
 # ============================================================
@@ -731,7 +979,8 @@ __all__ = [
     "card_images", "card_image_url_from_assets", "rank_code",
 
     # values / expr helpers
-    "values_key", "normalize_level", "normalize_rank_expr", "score_expression_complexity",
+    "values_key", "HAND_BITS", "hand_key", "hand_values", "hand_key_str", "parse_hand_key",
+    "normalize_level", "normalize_rank_expr", "score_expression_complexity",
 
     # timers
     "start_timer", "add_elapsed", "competition_time_left",
@@ -741,7 +990,7 @@ __all__ = [
 
     # stats bumpers
     "ensure_played_once", "bump_played_once", "bump_solved", "bump_revealed",
-    "bump_skipped", "bump_help", "bump_attempt", "bump_deal_swap",
+    "bump_skipped", "bump_help", "bump_hint", "bump_attempt", "bump_deal_swap",
 
     #others
     "finalize_open_hand", "persist_session", "reset_runtime_state",
@@ -0,0 +1,66 @@
+# app/games/core/hand_features.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+
+from .evaluator import ExprSyntaxError, compile_expression
+from .game_core import enumerate_solutions, score_expression_complexity
+from .rational import is_integer
+
+# ============================================================
+# Structured per-hand features (content_json["features"])
+# ============================================================
+# Computed once per hand from its full canonical solution list at dataset
+# build / backfill time, so the store reads flags instead of re-scoring
+# solution strings on every load:
+#   n_solutions      distinct solutions (canonical enumeration, capped)
+#   needs_fraction   every solution passes through a non-integer value
+#   needs_division   every solution divides
+#   needs_exponent   every solution uses ^
+#   min_depth        shallowest expression tree (4 cards: 2 or 3)
+#   min_complexity / max_complexity   score_expression_complexity range
+
+FEATURES_VERSION = 1
+FEATURE_SOLUTION_LIMIT = 500
+
+
+def expression_profile(expr: str) -> Optional[Tuple[int, bool, bool, bool]]:
+    """(depth, has_fraction, has_division, has_exponent) or None if unparsable."""
+    try:
+        c = compile_expression(expr)
+    except ExprSyntaxError:
+        return None
+    trace = c.steps()
+    if trace is None:
+        return None
+    frac = div = pow_ = False
+    for _a, op, _b, v in trace:
+        div = div or op == "/"
+        pow_ = pow_ or op == "**"
+        frac = frac or not (isinstance(v, tuple) and is_integer(v))
+    return c.depth, frac, div, pow_
+
+
+def features_from_solutions(solutions: List[str]) -> Dict[str, Any]:
+    profiles = [p for p in (expression_profile(s) for s in solutions) if p is not None]
+    scores = [score_expression_complexity(s) for s in solutions]
+    return {
+        "v": FEATURES_VERSION,
+        "n_solutions": len(solutions),
+        "needs_fraction": bool(profiles) and all(p[1] for p in profiles),
+        "needs_division": bool(profiles) and all(p[2] for p in profiles),
+        "needs_exponent": bool(profiles) and all(p[3] for p in profiles),
+        "min_depth": min((p[0] for p in profiles), default=None),
+        "min_complexity": min(scores, default=None),
+        "max_complexity": max(scores, default=None),
+    }
+
+
+def hand_features(values: List[int], target: int = 24) -> Tuple[Dict[str, Any], List[str]]:
+    """(features, full canonical solution list) for one hand."""
+    sols = enumerate_solutions(list(values), int(target), limit=FEATURE_SOLUTION_LIMIT)
+    return features_from_solutions(sols), sols
+
+
+__all__ = [
+    "FEATURES_VERSION", "expression_profile", "features_from_solutions", "hand_features",
+]
@@ -0,0 +1,63 @@
+# app/games/core/hints.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional
+
+from .bounded_cache import BoundedCache
+from .game_core import hand_key
+from .walkthrough import expression_steps, format_step
+
+# ============================================================
+# Progressive hint ladders
+# ============================================================
+# A solution's evaluation steps (walkthrough.py) are turned into three rungs:
+#   1 pair      which two cards to combine first
+#   2 step      the first operation with its result ("8 / 3 = 8/3")
+#   3 solution  the full answer
+# Ladders are cached per (hand, target, operator set), so every later hint
+# request for the same hand is a dict lookup.
+
+HINT_LEVELS = ("pair", "step", "solution")
+MAX_HINT_LEVEL = len(HINT_LEVELS)
+
+HINT_CACHE_SIZE = 20_000
+HINT_CACHE = BoundedCache("hints", HINT_CACHE_SIZE)
+
+
+def build_ladder(solution: str) -> Optional[List[Dict[str, Any]]]:
+    steps = expression_steps(solution)
+    if not steps:
+        return None
+    a, op, b, v = steps[0]
+    return [
+        {"level": 1, "kind": "pair", "cards": [a, b],
+         "text": f"Start by combining {a} and {b}."},
+        {"level": 2, "kind": "step", "step": format_step(a, op, b, v),
+         "text": f"First step: {format_step(a, op, b, v)}."},
+        {"level": 3, "kind": "solution", "solution": solution,
+         "text": solution},
+    ]
+
+
+def hint_ladder(
+    values: List[int],
+    target: int,
+    op_set: str,
+    solution_source: Callable[[], Optional[str]],
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Cached ladder for the hand; `solution_source` is only called on a miss and
+    returns one solution (or None when the hand has none).
+    """
+    key = (hand_key(values), int(target), op_set)
+    hit = HINT_CACHE.get(key)
+    if hit is not None:
+        return hit or None
+    sol = solution_source()
+    ladder = build_ladder(sol) if sol else None
+    HINT_CACHE.put(key, ladder or [])   # [] caches "no hint available"
+    return ladder
+
+
+__all__ = [
+    "HINT_LEVELS", "MAX_HINT_LEVEL", "HINT_CACHE", "build_ladder", "hint_ladder",
+]
@@ -0,0 +1,124 @@
+# app/games/core/op_sets.py
+from __future__ import annotations
+from itertools import permutations
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from .rational import Rat
+
+# ============================================================
+# Operator sets per game mode
+# ============================================================
+#   basic   + - * /            (book solutions, solution table, subset DP)
+#   pow     + - * / ^          integer exponents only, bounded like the checker
+#   concat  + - * / and card concatenation (1 and 2 may be played as 12 or 21)
+# The recursive solver keeps one memo per set, so turning on ^ for one mode
+# never evicts or pollutes the basic-mode entries.
+
+OP_SETS: Dict[str, FrozenSet[str]] = {
+    "basic": frozenset("+-*/"),
+    "pow": frozenset("+-*/^"),
+    "concat": frozenset("+-*/") | {"||"},
+}
+DEFAULT_OP_SET = "basic"
+
+# same limits as the answer checker (|base| <= 1e6, |exponent| <= 12)
+POW_MAX_EXPONENT = 12
+POW_MAX_MAGNITUDE = 10 ** 6
+_POW_MAX_BITS = POW_MAX_MAGNITUDE.bit_length()
+
+# concatenated numbers stay small enough to be plausible "cards"
+CONCAT_MAX = 9999
+
+
+def normalize_op_set(name: Optional[str]) -> str:
+    name = (name or "").strip().lower()
+    return name if name in OP_SETS else DEFAULT_OP_SET
+
+
+def allows_pow(op_set: str) -> bool:
+    return "^" in OP_SETS.get(op_set, ())
+
+
+def allows_concat(op_set: str) -> bool:
+    return "||" in OP_SETS.get(op_set, ())
+
+
+def pow_rat(a: Rat, b: Rat) -> Optional[Rat]:
+    """
+    a ** b for reduced pairs when b is an integer within POW_MAX_EXPONENT and the
+    result stays within POW_MAX_MAGNITUDE; None otherwise (incl. 0 ** negative).
+    """
+    if b[1] != 1 or abs(b[0]) > POW_MAX_EXPONENT:
+        return None
+    n, d = a
+    e = b[0]
+    if e < 0:
+        if n == 0:
+            return None
+        n, d, e = (d, n, -e) if n > 0 else (-d, -n, -e)
+    # cheap bound before computing: bits(x ** e) <= bits(x) * e
+    if max(abs(n), d).bit_length() * e > _POW_MAX_BITS + e:
+        return None
+    n, d = n ** e, d ** e
+    if abs(n) > POW_MAX_MAGNITUDE or d > POW_MAX_MAGNITUDE:
+        return None
+    return (n, d)
+
+
+def _concat_value(cards: Sequence[int]) -> Optional[int]:
+    if any(c < 0 for c in cards):
+        return None
+    v = int("".join(str(c) for c in cards))
+    return v if v <= CONCAT_MAX else None
+
+
+def concat_groupings(values: Sequence[int]) -> Iterator[Tuple[int, ...]]:
+    """
+    Every distinct multiset of numbers obtained by concatenating groups of cards
+    (in any order within a group); the ungrouped hand comes first.
+    """
+    vals = tuple(sorted(int(v) for v in values))
+    seen = set()
+
+    def rec(rest: Tuple[int, ...], acc: Tuple[int, ...]):
+        if not rest:
+            key = tuple(sorted(acc))
+            if key not in seen:
+                seen.add(key)
+                yield key
+            return
+        head, tail = rest[0], rest[1:]
+        # the group containing `head`: head alone, or head plus a subset of tail
+        for mask in range(1 << len(tail)):
+            group = [head] + [tail[i] for i in range(len(tail)) if mask >> i & 1]
+            others = tuple(tail[i] for i in range(len(tail)) if not mask >> i & 1)
+            if len(group) == 1:
+                yield from rec(others, acc + (head,))
+                continue
+            for order in _orders(group):
+                v = _concat_value(order)
+                if v is not None:
+                    yield from rec(others, acc + (v,))
+
+    yield from rec(vals, ())
+
+
+def _orders(group: List[int]) -> Iterator[Tuple[int, ...]]:
+    yield from sorted(set(permutations(group)))
+
+
+def literals_match(literals: Sequence[int], values: Sequence[int], concat: bool = False) -> bool:
+    """True if the expression's literals use each card exactly once (optionally concatenated)."""
+    lits = sorted(int(x) for x in literals)
+    if lits == sorted(int(v) for v in values):
+        return True
+    if not concat:
+        return False
+    return any(list(g) == lits for g in concat_groupings(values))
+
+
+__all__ = [
+    "OP_SETS", "DEFAULT_OP_SET", "POW_MAX_EXPONENT", "POW_MAX_MAGNITUDE", "CONCAT_MAX",
+    "normalize_op_set", "allows_pow", "allows_concat", "pow_rat",
+    "concat_groupings", "literals_match",
+]
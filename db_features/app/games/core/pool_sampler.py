@@ -0,0 +1,84 @@
+# app/games/core/pool_sampler.py
+from __future__ import annotations
+from typing import Any, Callable, Dict, Optional, Tuple
+import random
+
+# ============================================================
+# Per-session pool sampler (lazy Fisher-Yates)
+# ============================================================
+# Dealing used to rebuild a filtered copy of the whole pool on every pick
+# (eligibility, then the last 50 recent keys), up to 60 times per request
+# for off-24 targets. A sampler walks one random permutation of the pool
+# instead: each draw is one step of Fisher-Yates, so it costs O(1) and
+# never repeats a row until the whole pool has been dealt. The permutation
+# is never materialised: positions moved by a swap are kept in a sparse dict,
+# and consumed positions are dropped from it. The state is a small plain
+# dict that lives in the session:
+#
+#   {"v": store version, "n": pool size, "c": cursor, "s": {position: index}}
+#
+# and it resets when the store reloads or the pool changes size. Rows that
+# fail `eligible` are consumed for the rest of the pass, so one sampler must
+# only ever see one eligibility rule (callers key samplers by pool and rule).
+# Rows that are merely `recent` are passed over without being consumed.
+
+SamplerState = Dict[str, Any]
+
+RECENT_TRIES = 8   # redraws before a recent row is dealt anyway
+
+
+def new_state(n: int, version: int) -> SamplerState:
+    return {"v": version, "n": int(n), "c": 0, "s": {}}
+
+
+def sampler_for(samplers: Dict[str, SamplerState], key: str, n: int, version: int) -> SamplerState:
+    """The session's sampler for `key`, reset if it was made for another store version or pool size."""
+    st = samplers.get(key)
+    if st is None or st.get("v") != version or st.get("n") != n:
+        st = samplers[key] = new_state(n, version)
+    return st
+
+
+def draw(
+    st: SamplerState,
+    eligible: Optional[Callable[[int], bool]] = None,
+    recent: Optional[Callable[[int], bool]] = None,
+    rng: random.Random = random,
+) -> Tuple[Optional[int], bool]:
+    """
+    (pool index, wrapped): the next row of the permutation. wrapped is True
+    when the previous pass was used up and a new one started (every row has
+    been dealt); (None, True) when a whole pass has nothing eligible.
+    """
+    n = st["n"]
+    wrapped = False
+    while True:
+        if st["c"] >= n:
+            if wrapped or not n:
+                return None, True
+            st["c"], st["s"] = 0, {}
+            wrapped = True
+        c, s = st["c"], st["s"]
+        j = rng.randrange(c, n)
+        if recent is not None:
+            for _ in range(RECENT_TRIES):
+                if not recent(s.get(j, j)):
+                    break
+                j = rng.randrange(c, n)
+        i = s.get(j, j)
+        # swap positions c and j, then drop c: positions below the cursor are never read again
+        if j != c:
+            s[j] = s.pop(c, c)
+        else:
+            s.pop(c, None)
+        st["c"] = c + 1
+        if eligible is None or eligible(i):
+            return i, wrapped
+
+
+def remaining(st: SamplerState) -> int:
+    """Rows left in the current pass."""
+    return st["n"] - st["c"]
+
+
+__all__ = ["SamplerState", "RECENT_TRIES", "new_state", "sampler_for", "draw", "remaining"]
@@ -4,6 +4,7 @@ from typing import Dict, Any, List, Tuple, Optional
 import json, random, ast, re, logging
 from app.models import Game, Puzzle
 from app.db import db
+from app.games.core.game_core import hand_key
 from . import game_utils as gutils
 
 logger = logging.getLogger(__name__)
@@ -14,15 +15,12 @@ _initialized = False
 # Public caches (kept for compatibility with gutils expectations)
 # ----------------------------
 PUZZLES_BY_ID: Dict[int, Dict[str, Any]] = {}
-PUZZLES_BY_KEY: Dict[str, Dict[str, Any]] = {}
-POOLS_ADV: Dict[str, List[Tuple[Dict[str, Any], List[int], str]]] = {}
+PUZZLES_BY_KEY: Dict[int, Dict[str, Any]] = {}
+POOLS_ADV: Dict[str, List[Tuple[Dict[str, Any], List[int], int]]] = {}
 
 _RANK_TOKEN_RE = re.compile(r'(?<![A-Za-z0-9_.])([AaJjQqKkTt])(?![A-Za-z0-9_.])')
 _RANK_TOKEN_MAP = {"A":"1","J":"11","Q":"12","K":"13","T":"10"}
 
-def _values_key(cards) -> str:
-    return "-".join(map(str, sorted(map(int, cards or []))))
-
 # ---------- Complexity scoring (same spirit as routes) ----------
 class _DepthVisitor(ast.NodeVisitor):
     def __init__(self): self.max_depth = 0
@@ -91,7 +89,7 @@ def _build_index(puzzles: List[Dict[str, Any]]):
     idx = []
     for p in puzzles:
         vals = list(map(int, p.get('cards') or []))
-        idx.append((p, vals, _values_key(vals)))
+        idx.append((p, vals, hand_key(vals)))
     return idx
 
 def _preprocess_pool(puzzles: List[Dict[str, Any]]):
@@ -149,7 +147,7 @@ def _load_from_db() -> List[Dict[str, Any]]:
             level = cj.get("level") or None
             if case_id is None and cards:
                 # fabricate stable id from hash of key if needed
-                case_id = abs(hash(_values_key(cards))) % 10_000_000
+                case_id = abs(hash(hand_key(cards))) % 10_000_000
             puzzles.append({
                 "case_id": int(case_id),
                 "cards": cards,
@@ -184,7 +182,7 @@ def _load_from_json() -> List[Dict[str, Any]]:
 def _rebuild_caches(puzzles: List[Dict[str, Any]]):
     global PUZZLES_BY_ID, PUZZLES_BY_KEY, POOLS_ADV
     PUZZLES_BY_ID = {int(p.get("case_id")): p for p in puzzles if "case_id" in p}
-    PUZZLES_BY_KEY = {_values_key(p.get("cards") or []): p for p in puzzles}
+    PUZZLES_BY_KEY = {hand_key(p.get("cards") or []): p for p in puzzles}
     POOLS_ADV = _preprocess_pool(puzzles)
     # keep gutils in sync (legacy callers)
     gutils.PUZZLES_BY_ID = PUZZLES_BY_ID
@@ -211,5 +209,5 @@ def get_puzzle_by_id(case_id: int) -> Optional[Dict[str, Any]]:
     return PUZZLES_BY_ID.get(int(case_id))
 
 def get_puzzle_by_values(values: List[int]) -> Optional[Dict[str, Any]]:
-    return PUZZLES_BY_KEY.get(_values_key(values))
+    return PUZZLES_BY_KEY.get(hand_key(values))
 
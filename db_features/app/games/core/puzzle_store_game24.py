@@ -1,74 +1,332 @@
 # app/games/core/puzzle_store_game24.py
 from __future__ import annotations
+from array import array
+from bisect import bisect_left
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, Any, List, Tuple, Optional, Callable
-import json, random, logging
+from typing import Dict, Any, Iterable, List, Tuple, Optional, Callable
+import hashlib, itertools, json, os, random, logging, threading, time
 
 from flask import current_app
 from app.db import db
 from app.models import Game, Puzzle
 
-from .game_core import values_key, normalize_level, score_expression_complexity
+from .answer_check import canonical_forms
+from .feature_index import FeatureIndex
+from .game_core import hand_key, normalize_level, score_expression_complexity
+from .pool_sampler import SamplerState, draw, remaining, sampler_for
+from .solution_table import SolutionTable, DEFAULT_FILENAME as SOLUTION_TABLE_FILENAME
+from .store_snapshot import DEFAULT_FILENAME as SNAPSHOT_FILENAME, load_snapshot, save_snapshot
+from .target_index import reachable_target_bits, targets_from_bits, window
+from .walkthrough import trace_all
 
 logger = logging.getLogger(__name__)
 
 SIMPLE_THRESHOLD = 11
 HARD_THRESHOLD   = 18
 
+_VERSIONS = itertools.count(1)   # Game24Store.version: bumped on every (re)build
+REFRESH_MAX_ROWS = 2000          # refreshed(): above this many new rows, load from scratch instead
+
+# content_json["dataset"] of the classic set (ranks 1-13, 4 cards, target 24);
+# rows without the key are the original answers.json import
+DEFAULT_DATASET = "r1-13_c4_t24"
+
+# answers.json placed at: app/games/game24/static/answers.json
+ANSWERS_JSON = Path(__file__).resolve().parents[2] / "game24" / "static" / "answers.json"
+
 @dataclass(frozen=True)
 class G24Puzzle:
+    """One row as the loaders read it; _build_caches packs these into columns."""
     case_id: int
     cards: List[int]
     solutions: List[str]
     level: Optional[str]
+    features: Optional[Dict[str, Any]] = None   # content_json["features"] (hand_features.py)
+    db_id: int = 0                              # Puzzle.id (0 from answers.json)
+
+
+# ============================================================
+# Column layout
+# ============================================================
+# A few thousand puzzles as frozen dataclasses, per-puzzle lists, two dicts
+# of them and four pools of (puzzle, cards, key) triples come to many small
+# objects per puzzle, in every worker. The store keeps typed arrays instead,
+# one entry per row (N rows, S stored solutions):
+#
+#   cards       uint8  N*4    hand in stored order, row r at [4r, 4r+4)
+#   ids         int32  N      case_id; _id_sorted / _id_rows index it for bisect
+#   hands       int64  N      hand_key of the cards; _hand_sorted / _hand_rows likewise
+#   db_ids      int64  N      Puzzle.id the row was read from (0 from answers.json)
+#   levels      uint8  N      code into _level_names
+#   flags       uint8  N      FLAG_* bits (pool membership, boolean features)
+#   n_sol / min_depth / min_cx / max_cx   uint16  N   features, NONE if absent
+#   _row_sol    uint32 N+1    row r owns solutions [_row_sol[r], _row_sol[r+1])
+#   _sol_text   one str, solution s at _sol_off[s]:_sol_off[s+1]
+#   _wt_text    one str, walkthrough lines of solution s joined by newlines
+#   _forms      int64  per row, sorted digests of the canonical solution forms
+#   pools       int32  row indices per pool
+#   _db_seen    int64  every active Puzzle.id the rows were chosen from (other
+#                      datasets included), sorted; refreshed() diffs against it
+#
+# Payloads are built from the columns on demand; the public API
+# (get_by_id / get_by_values / random_pick / ...) returns the same dicts as
+# before. benchmarks/bench_store_layout.py compares the two layouts.
+#
+# The same columns are what `flask game24-rebuild-store` writes to the
+# binary snapshot (store_snapshot.py) that workers boot from. Bump
+# STORE_LAYOUT whenever a column, flag or threshold changes meaning, so
+# older snapshots read as stale.
+
+STORE_LAYOUT = 2
+_SNAPSHOT_ARRAYS = ("cards", "ids", "hands", "db_ids", "_db_seen", "levels", "flags", "feat_v", "n_sol", "min_depth",
+                    "min_cx", "max_cx", "_id_sorted", "_id_rows", "_hand_sorted", "_hand_rows",
+                    "_row_sol", "_sol_off", "_wt_off", "_forms", "_form_off")
+_SNAPSHOT_TEXTS = ("_sol_text", "_wt_text")
+
+FLAG_HAS_SOL        = 1 << 0
+FLAG_SIMPLE         = 1 << 1    # a solution scores <= SIMPLE_THRESHOLD
+FLAG_HARD           = 1 << 2    # a solution scores >= HARD_THRESHOLD
+FLAG_FEATURES       = 1 << 3    # content_json["features"] present (columns below valid)
+FLAG_NEEDS_FRACTION = 1 << 4
+FLAG_NEEDS_DIVISION = 1 << 5
+FLAG_NEEDS_EXPONENT = 1 << 6
+
+NONE = 0xFFFF    # "absent" in the uint16 feature columns
+
+# the key set features_from_solutions() writes; other shapes are kept as dicts
+_FEATURE_FIELDS = ("v", "n_solutions", "needs_fraction", "needs_division", "needs_exponent",
+                   "min_depth", "min_complexity", "max_complexity")
+_FEATURE_BITS = (("needs_fraction", FLAG_NEEDS_FRACTION), ("needs_division", FLAG_NEEDS_DIVISION),
+                 ("needs_exponent", FLAG_NEEDS_EXPONENT))
+
+
+def _small(v: Any) -> Optional[int]:
+    """v as a uint16 column value (NONE for None), or None if it doesn't fit."""
+    if v is None:
+        return NONE
+    if isinstance(v, int) and not isinstance(v, bool) and 0 <= v < NONE:
+        return v
+    return None
+
+
+def form_digest(form: Any) -> int:
+    """Stable 64-bit digest of a canonical form (same across processes)."""
+    return int.from_bytes(hashlib.blake2b(repr(form).encode(), digest_size=8).digest(),
+                          "little", signed=True)
+
+
+def _sorted_index(col: array, typecode: str) -> Tuple[array, array]:
+    """(sorted distinct values, row of each) over a column; later rows win on duplicates, as a dict would."""
+    keys, rows = array(typecode), array("i")
+    for r in sorted(range(len(col)), key=lambda r: (col[r], -r)):
+        if keys and keys[-1] == col[r]:
+            continue
+        keys.append(col[r]); rows.append(r)
+    return keys, rows
+
+
+def _lookup(keys: array, rows: array, key: int) -> Optional[int]:
+    i = bisect_left(keys, key)
+    return rows[i] if i < len(keys) and keys[i] == key else None
+
+
+class _Columns:
+    """Column buffers for one store version, filled row by row from puzzles or from an older version."""
+    def __init__(self) -> None:
+        self.cards, self.ids, self.hands, self.db_ids = array("B"), array("i"), array("q"), array("q")
+        self.levels, self.flags, self.feat_v = array("B"), array("B"), array("B")
+        self.n_sol, self.min_depth, self.min_cx, self.max_cx = array("H"), array("H"), array("H"), array("H")
+        self.row_sol, self.sol_off, self.wt_off = array("I", [0]), array("I", [0]), array("I", [0])
+        self.forms, self.form_off = array("q"), array("I", [0])
+        self.sols_text: List[str] = []
+        self.wt_text: List[str] = []
+        self.level_names: List[Optional[str]] = [None, "easy", "medium", "hard"]
+        self.odd_features: Dict[int, Dict[str, Any]] = {}
+        self._level_code = {name: i for i, name in enumerate(self.level_names)}
+        self._sol_len = self._wt_len = 0
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _level(self, name: Optional[str]) -> int:
+        code = self._level_code.get(name)
+        if code is None:
+            code = self._level_code[name] = len(self.level_names)
+            self.level_names.append(name)
+        return code
+
+    def _solution(self, text: str, walkthrough: str) -> None:
+        self.sols_text.append(text)
+        self._sol_len += len(text)
+        self.sol_off.append(self._sol_len)
+        self.wt_text.append(walkthrough)
+        self._wt_len += len(walkthrough)
+        self.wt_off.append(self._wt_len)
+
+    def add(self, p: G24Puzzle, simple: bool, hard: bool) -> None:
+        """Append a loader row: trace walkthroughs, hash canonical forms, pack features."""
+        r = len(self)
+        self.cards.extend(p.cards)
+        self.ids.append(p.case_id)
+        self.hands.append(hand_key(p.cards))
+        self.db_ids.append(p.db_id)
+        self.levels.append(self._level(p.level))
+
+        sols = [str(s) for s in p.solutions or ()]
+        for s, w in zip(sols, trace_all(sols)):
+            self._solution(s, "\n".join(w))
+        self.row_sol.append(len(self.sol_off) - 1)
+        self.forms.extend(sorted(form_digest(f) for f in canonical_forms(sols)))
+        self.form_off.append(len(self.forms))
+
+        bits = (FLAG_HAS_SOL * bool(sols)) | (FLAG_SIMPLE * simple) | (FLAG_HARD * hard)
+        cols = Game24Store._feature_columns(p.features)
+        if cols is None:
+            if p.features:
+                self.odd_features[r] = dict(p.features)
+            cols = (0, 0, NONE, NONE, NONE, NONE)
+        else:
+            bits |= FLAG_FEATURES | cols[0]
+        self.flags.append(bits)
+        self.feat_v.append(cols[1]); self.n_sol.append(cols[2]); self.min_depth.append(cols[3])
+        self.min_cx.append(cols[4]); self.max_cx.append(cols[5])
+
+    def copy(self, src: "Game24Store", r: int) -> None:
+        """Append row r of an existing store version as is (nothing is re-derived)."""
+        row = len(self)
+        self.cards.extend(src.cards[4 * r:4 * r + 4])
+        self.ids.append(src.ids[r])
+        self.hands.append(src.hands[r])
+        self.db_ids.append(src.db_ids[r])
+        self.levels.append(self._level(src._level_names[src.levels[r]]))
+        for i in range(src._row_sol[r], src._row_sol[r + 1]):
+            self._solution(src._sol_text[src._sol_off[i]:src._sol_off[i + 1]],
+                           src._wt_text[src._wt_off[i]:src._wt_off[i + 1]])
+        self.row_sol.append(len(self.sol_off) - 1)
+        self.forms.extend(src._forms[src._form_off[r]:src._form_off[r + 1]])
+        self.form_off.append(len(self.forms))
+        self.flags.append(src.flags[r])
+        self.feat_v.append(src.feat_v[r]); self.n_sol.append(src.n_sol[r]); self.min_depth.append(src.min_depth[r])
+        self.min_cx.append(src.min_cx[r]); self.max_cx.append(src.max_cx[r])
+        odd = src._odd_features.get(r)
+        if odd is not None:
+            self.odd_features[row] = odd
+
 
 class Game24Store:
     """
-    Encapsulated, reloadable puzzle store for Game24.
-    Lives inside current_app.extensions['game24_store'].
+    Encapsulated puzzle store for Game24, one immutable version per load.
+    The published version lives in current_app.extensions['game24_store'];
+    reloads build a new version next to it and swap the reference
+    (reload_store / schedule_reload), so a request never sees a half-built
+    store. Only lazy caches (feature index, solvable ids) fill in later.
     """
     def __init__(self, cap: Optional[int] = None):
         self.cap = cap
-        self.by_id: Dict[int, G24Puzzle] = {}
-        self.by_key: Dict[str, G24Puzzle] = {}
-        self.pools: Dict[str, List[Tuple[G24Puzzle, List[int], str]]] = {
-            "nosol": [], "easy_like": [], "medium": [], "hard_like": [],
-        }
-        self.loaded_from = None   # 'db' or 'json'
+        self.loaded_from = None   # 'db', 'json' or 'snapshot'
+        self.load_ms: Optional[float] = None
+        self.watermark: Optional[Dict[str, Any]] = None   # the DB state the columns were read at
+        self.solution_table: Optional[SolutionTable] = None
+        self._solvable_ids: Dict[int, frozenset] = {}
+        self._build_caches([])
+
+    def __len__(self) -> int:
+        return len(self.ids)
 
     # -------- public API --------
     def load(self, force: bool = False) -> None:
-        if self.by_id and not force:
+        """
+        Fill the store: from the binary snapshot when it matches the DB's
+        current watermark (not with force=True, which always re-reads the
+        source), else from the DB, falling back to answers.json.
+        """
+        if len(self) and not force:
             return
-        puzzles = self._load_from_db()
-        self.loaded_from = "db" if puzzles else None
-        if not puzzles:
-            puzzles = self._load_from_json()
-            self.loaded_from = "json"
-        self._build_caches(puzzles)
+        t0 = time.perf_counter()
+        # taken before reading rows: a change racing the load makes the snapshot stale, not wrong
+        self.watermark = self._watermark()
+        if force or not self._load_snapshot():
+            puzzles, seen = self._load_from_db()
+            self.loaded_from = "db" if puzzles else None
+            if not puzzles:
+                puzzles, seen = self._load_from_json(), []
+                self.loaded_from = "json"
+            self._build_caches(puzzles, seen)
+        self._load_solution_table()
+        self.load_ms = (time.perf_counter() - t0) * 1000
+        logger.info("Game24 store ready from %s in %.0f ms (%d rows)",
+                    self.loaded_from or "-", self.load_ms, len(self))
+
+    def refreshed(self, full: bool = False) -> "Game24Store":
+        """
+        The store for the DB as it is now, without touching self: self when
+        the watermark hasn't moved, else a new version. Rows inserted or
+        (de)activated since this version are fetched on their own and merged
+        with this version's columns; in-place edits (games.update_dt moved),
+        answers.json stores and full=True load from scratch (snapshot first,
+        unless full).
+        """
+        wm = self._watermark()
+        if not full and len(self) and (wm is None or wm == self.watermark):
+            return self
+        new = type(self)(cap=self.cap)
+        if not full and self._can_patch(wm) and new._patch(self, wm):
+            return new
+        new.load(force=full)
+        return new
+
+    def write_snapshot(self, path: Optional[Path] = None) -> Optional[int]:
+        """Save the columns for the next boot (see store_snapshot.py). Returns bytes written, or None."""
+        path = path or snapshot_path()
+        if path is None or not len(self) or self.watermark is None:
+            return None
+        arrays = {name: getattr(self, name) for name in _SNAPSHOT_ARRAYS}
+        arrays.update((f"pool:{name}", pool) for name, pool in self.pools.items())
+        meta = {
+            "source": "db" if len(self._db_seen) else "json",
+            "level_names": self._level_names,
+            "odd_features": {str(r): f for r, f in self._odd_features.items()},
+        }
+        return save_snapshot(path, arrays, {name: getattr(self, name) for name in _SNAPSHOT_TEXTS},
+                             meta, self.watermark)
 
     def pool_report(self) -> Dict[str, int]:
         return {k: len(v) for k, v in self.pools.items()}
 
+    def count_with_solutions(self) -> int:
+        return sum(1 for f in self.flags if f & FLAG_HAS_SOL)
+
     def get_by_id(self, case_id: int) -> Optional[Dict[str, Any]]:
-        p = self.by_id.get(int(case_id))
-        return self._to_payload(p) if p else None
+        r = self._row(case_id)
+        return self._to_payload(r) if r is not None else None
 
     def get_by_values(self, values: List[int]) -> Optional[Dict[str, Any]]:
-        p = self.by_key.get(values_key(values))
-        return self._to_payload(p) if p else None
+        r = self._hand_row(hand_key(values))
+        return self._to_payload(r) if r is not None else None
+
+    def cards_for(self, case_id: int) -> Optional[List[int]]:
+        """The stored hand of case_id, without building a payload."""
+        r = self._row(case_id)
+        return self._cards(r) if r is not None else None
 
     def random_pick(
         self,
         level: str,
-        recent_keys: List[str],
-        eligible: Optional[Callable[[int], bool]] = None
+        recent_keys: List[int],
+        eligible: Optional[Callable[[int], bool]] = None,
+        samplers: Optional[Dict[str, SamplerState]] = None,
+        scope: str = "any",
     ) -> Tuple[Optional[Dict[str, Any]], bool]:
         """
         Return (puzzle_payload, pool_done).
         - Avoids immediate repeats via recent_keys.
         - If 'eligible' is provided, only returns puzzles with eligible(case_id) == True.
+        - With the session's `samplers` dict, deals from a per-(pool, scope)
+          permutation (pool_sampler.py): no repeats until the pool is used
+          up, pool_done on its last unseen puzzle. `scope` names the eligibility
+          rule (e.g. the target), since ineligible rows are skipped for a pass.
         """
         lvl = normalize_level(level)
         pool_name = (
@@ -77,53 +335,307 @@ class Game24Store:
             "easy_like" if lvl == "easy"                else
             "medium"
         )
-        pool = self.pools.get(pool_name) or self.pools["medium"]
+        if not self.pools.get(pool_name):
+            pool_name = "medium"
+        pool = self.pools[pool_name]
         if not pool:
             return None, False
+        if samplers is not None:
+            return self._sampled_pick(pool_name, recent_keys, eligible, samplers, scope)
 
         # 1) Apply eligibility first (if provided)
         base_candidates = pool
         if eligible is not None:
-            base_candidates = [t for t in pool if eligible(int(t[0].case_id))]
+            ids = self.ids
+            base_candidates = [r for r in pool if eligible(ids[r])]
 
         # If nothing is eligible, the pool for this session/level is exhausted
         if not base_candidates:
             return None, True
 
-        # 2) Avoid very recent repeats using your existing values_key scheme
+        # 2) Avoid very recent repeats (recent_keys are hand_key ints): a few
+        #    rejection draws usually land, since recent is small next to the pool
+        hands = self.hands
         recent = set(recent_keys[-50:] or [])
-        candidates = [t for t in base_candidates if t[2] not in recent]
+        for _ in range(8):
+            r = random.choice(base_candidates)
+            if hands[r] not in recent:
+                return self._to_payload(r), False
+        candidates = [r for r in base_candidates if hands[r] not in recent]
 
         # 3) If avoiding repeats empties the set, allow a repeat but signal "done"
         if not candidates:
-            choice = random.choice(base_candidates)
-            return self._to_payload(choice[0]), True
+            return self._to_payload(random.choice(base_candidates)), True
 
         # 4) Pick uniformly from remaining candidates
-        choice = random.choice(candidates)
-        return self._to_payload(choice[0]), False
+        return self._to_payload(random.choice(candidates)), False
+
+    def _sampled_pick(
+        self,
+        pool_name: str,
+        recent_keys: List[int],
+        eligible: Optional[Callable[[int], bool]],
+        samplers: Dict[str, SamplerState],
+        scope: str,
+    ) -> Tuple[Optional[Dict[str, Any]], bool]:
+        pool, ids, hands = self.pools[pool_name], self.ids, self.hands
+        st = sampler_for(samplers, f"{pool_name}:{scope}", len(pool), self.version)
+        recent = set(recent_keys[-50:] or [])
+        i, _wrapped = draw(
+            st,
+            eligible=(lambda i: eligible(ids[pool[i]])) if eligible is not None else None,
+            recent=(lambda i: hands[pool[i]] in recent) if recent else None,
+        )
+        if i is None:
+            return None, True
+        # pool_done on the last unseen row; the next pick starts a new pass
+        return self._to_payload(pool[i]), remaining(st) == 0
+
+    def feature_index(self) -> FeatureIndex:
+        """Feature bitsets for pool queries (feature_index.py), built on first use per store version."""
+        idx = self._feature_index
+        if idx is None or idx.version != self.version:
+            idx = self._feature_index = FeatureIndex(self)
+        return idx
+
+    def is_known_solution(self, case_id: int, values: List[int], form) -> Optional[bool]:
+        """
+        Whether a correct answer's canonical form is one of the stored solutions
+        of case_id; None if the case is unknown or isn't the hand `values`.
+        """
+        r = self._row(case_id)
+        if r is None or self.hands[r] != hand_key(values):
+            return None
+        lo, hi = self._form_off[r], self._form_off[r + 1]
+        d = form_digest(form)
+        i = bisect_left(self._forms, d, lo, hi)
+        return i < hi and self._forms[i] == d
+
+    # -------- precomputed solvability (any target in the table range) --------
+    def solvable_for(self, values: List[int], target: int) -> Optional[bool]:
+        """True/False from the solution table, or None if the table can't answer."""
+        if self.solution_table is None:
+            return None
+        return self.solution_table.is_solvable(values, target)
+
+    def solution_for(self, values: List[int], target: int) -> Optional[str]:
+        if self.solution_table is None:
+            return None
+        return self.solution_table.solution(values, target)
+
+    def reachable_target_bits(self, values: List[int], t_min: int, t_max: int) -> int:
+        """Bitset over [t_min, t_max] (bit 0 = t_min) of integer targets the hand can make."""
+        table = self.solution_table
+        if table is not None and table.covers(t_min) and table.covers(t_max):
+            row = table.hands.get(hand_key(values))
+            if row is not None:
+                return window(table.t_min, row[0], t_min, t_max)
+        return reachable_target_bits(values, t_min, t_max)
+
+    def reachable_targets(self, values: List[int], t_min: int, t_max: int) -> List[int]:
+        return targets_from_bits(self.reachable_target_bits(values, t_min, t_max), t_min)
+
+    def solvable_case_ids(self, target: int) -> Optional[frozenset]:
+        """case_ids solvable for target (cached per target), or None if unknown."""
+        target = int(target)
+        ids = self._solvable_ids.get(target)
+        if ids is not None:
+            return ids
+        if self.solution_table is None:
+            return None
+        keys = self.solution_table.solvable_keys(target)
+        if keys is None:
+            return None
+        ids = frozenset(self.ids[r] for r in range(len(self)) if self.hands[r] in keys)
+        self._solvable_ids[target] = ids
+        return ids
 
     # -------- internals --------
-    def _to_payload(self, p: G24Puzzle) -> Dict[str, Any]:
+    def _load_solution_table(self) -> None:
+        self._solvable_ids = {}
+        path = solution_table_path()
+        self.solution_table = SolutionTable.load(path) if path else None
+        if self.solution_table is not None:
+            logger.info("Game24 solution table loaded: hands=%d targets=%d..%d",
+                        len(self.solution_table), self.solution_table.t_min, self.solution_table.t_max)
+
+    def _row(self, case_id: int) -> Optional[int]:
+        return _lookup(self._id_sorted, self._id_rows, int(case_id))
+
+    def _hand_row(self, key: int) -> Optional[int]:
+        return _lookup(self._hand_sorted, self._hand_rows, key)
+
+    def _cards(self, r: int) -> List[int]:
+        return list(self.cards[4 * r:4 * r + 4])
+
+    def _solutions(self, r: int) -> List[str]:
+        off, text = self._sol_off, self._sol_text
+        return [text[off[s]:off[s + 1]] for s in range(self._row_sol[r], self._row_sol[r + 1])]
+
+    def _walkthroughs(self, r: int) -> List[List[str]]:
+        off, text = self._wt_off, self._wt_text
+        out = []
+        for s in range(self._row_sol[r], self._row_sol[r + 1]):
+            seg = text[off[s]:off[s + 1]]
+            out.append(seg.split("\n") if seg else [])
+        return out
+
+    def _features(self, r: int) -> Optional[Dict[str, Any]]:
+        f = self.flags[r]
+        if not f & FLAG_FEATURES:
+            odd = self._odd_features.get(r)
+            return dict(odd) if odd else None
+        col = lambda a: None if a[r] == NONE else a[r]
         return {
-            "case_id": p.case_id,
-            "cards": list(p.cards),
-            "solutions": list(p.solutions),
-            "level": p.level,
+            "v": self.feat_v[r],
+            "n_solutions": self.n_sol[r],
+            "needs_fraction": bool(f & FLAG_NEEDS_FRACTION),
+            "needs_division": bool(f & FLAG_NEEDS_DIVISION),
+            "needs_exponent": bool(f & FLAG_NEEDS_EXPONENT),
+            "min_depth": col(self.min_depth),
+            "min_complexity": col(self.min_cx),
+            "max_complexity": col(self.max_cx),
         }
 
-    def _load_from_db(self) -> List[G24Puzzle]:
+    def _to_payload(self, r: int) -> Dict[str, Any]:
+        return {
+            "case_id": self.ids[r],
+            "cards": self._cards(r),
+            "solutions": self._solutions(r),
+            "level": self._level_names[self.levels[r]],
+            "features": self._features(r),
+            "walkthroughs": self._walkthroughs(r),
+        }
+
+    def _watermark(self) -> Optional[Dict[str, Any]]:
+        """
+        A cheap fingerprint of what _load_from_db would read: a digest of the
+        active Puzzle.ids (one integer column, so any (de)activation moves
+        it) plus games.update_dt, which the bulk writers (dataset load,
+        feature backfill, discovery merge) bump when they change rows in
+        place. None if the DB can't be asked.
+        """
+        dataset = current_app.config.get("GAME24_DATASET") or DEFAULT_DATASET
+        try:
+            game = Game.query.filter_by(game_key="game24").first()
+            ids: List[int] = []
+            updated = None
+            if game:
+                ids = self._active_ids()
+                updated = game.update_dt.isoformat() if game.update_dt else None
+        except Exception as e:
+            db.session.rollback()
+            logger.warning("Game24 store watermark unavailable: %s", e)
+            return None
+        wm: Dict[str, Any] = {
+            "layout": STORE_LAYOUT, "dataset": dataset, "game_updated": updated,
+            "active": len(ids), "max_id": ids[-1] if ids else 0, "ids": _ids_digest(ids),
+        }
+        if not wm["active"]:
+            st = ANSWERS_JSON.stat() if ANSWERS_JSON.exists() else None
+            wm["answers_json"] = [st.st_size, st.st_mtime_ns] if st else None
+        return wm
+
+    def _load_snapshot(self, path: Optional[Path] = None) -> bool:
+        """Install the snapshot's columns if it was taken at the current watermark."""
+        path = path or snapshot_path()
+        if path is None or self.watermark is None:
+            return False
+        snap = load_snapshot(path, self.watermark)
+        if snap is None:
+            return False
+        arrays, texts, meta = snap
+        missing = [k for k in _SNAPSHOT_ARRAYS if k not in arrays] + [k for k in _SNAPSHOT_TEXTS if k not in texts]
+        if missing or "level_names" not in meta:
+            logger.warning("store snapshot %s lacks %s; reading the DB", path, missing or "level_names")
+            return False
+        self.version = next(_VERSIONS)
+        self._feature_index = None
+        self._solvable_ids = {}
+        for name in _SNAPSHOT_ARRAYS:
+            setattr(self, name, arrays[name])
+        for name in _SNAPSHOT_TEXTS:
+            setattr(self, name, texts[name])
+        self._level_names = meta["level_names"]
+        self._odd_features = {int(r): f for r, f in (meta.get("odd_features") or {}).items()}
+        self.pools = {k[len("pool:"):]: v for k, v in arrays.items() if k.startswith("pool:")}
+        self.loaded_from = "snapshot"
+        logger.info("Game24 store loaded (snapshot of %s data): pools=%s",
+                    meta.get("source") or "-", self.pool_report())
+        return True
+
+    def _can_patch(self, wm: Optional[Dict[str, Any]]) -> bool:
+        """Whether the change from self.watermark to wm is only inserts / (de)activations of DB rows (the id digest)."""
+        old = self.watermark
+        return (wm is not None and old is not None and len(self._db_seen) > 0 and wm["active"] > 0
+                and all(wm.get(k) == old.get(k) for k in ("layout", "dataset", "game_updated")))
+
+    def _patch(self, old: "Game24Store", wm: Dict[str, Any]) -> bool:
+        """
+        Fill this (empty) store from `old` plus the rows that became active
+        since, minus the rows that stopped being active. False, leaving self
+        empty, when too much changed for that to beat a full load.
+        """
+        t0 = time.perf_counter()
+        active = self._active_ids()
+        if not active:
+            return False
+        seen, now = set(old._db_seen), set(active)
+        added, gone = sorted(now - seen), seen - now
+        if len(added) > max(REFRESH_MAX_ROWS, len(old) // 2):
+            return False
+        fresh = self._load_from_db(only=added)[0] if added else []
+        simple, hard = self._complexity_flags(fresh, [bool(p.solutions) for p in fresh])
+
+        # both sides are in Puzzle.id order, as a full load reads them (later rows win per case_id)
+        cols = _Columns()
+        i = 0
+        for r in range(len(old)):
+            d = old.db_ids[r]
+            if d in gone:
+                continue
+            while i < len(fresh) and fresh[i].db_id < d:
+                cols.add(fresh[i], simple[i], hard[i])
+                i += 1
+            cols.copy(old, r)
+        for j in range(i, len(fresh)):
+            cols.add(fresh[j], simple[j], hard[j])
+
+        self.watermark = wm
+        self.loaded_from = "db"
+        self._install(cols, active)
+        self.solution_table = old.solution_table
+        self.load_ms = (time.perf_counter() - t0) * 1000
+        logger.info("Game24 store refreshed to version %d in %.0f ms: +%d -%d DB row(s), %d rows",
+                    self.version, self.load_ms, len(added), len(gone), len(self))
+        return True
+
+    def _active_ids(self) -> List[int]:
+        """Every active Puzzle.id of the game, ascending (one integer column, no content)."""
         game = Game.query.filter_by(game_key="game24").first()
-        if not game:
+        if game is None:
             return []
-        rows = (Puzzle.query
-                .filter_by(game_id=game.game_id, is_active=True)
-                .order_by(Puzzle.id.asc())
-                .all())
+        return [i for (i,) in (db.session.query(Puzzle.id)
+                               .filter(Puzzle.game_id == game.game_id, Puzzle.is_active.is_(True))
+                               .order_by(Puzzle.id.asc()))]
+
+    def _load_from_db(self, only: Optional[List[int]] = None) -> Tuple[List[G24Puzzle], List[int]]:
+        """(puzzles of the configured dataset, every active Puzzle.id read); `only` limits the ids."""
+        game = Game.query.filter_by(game_key="game24").first()
+        if not game:
+            return [], []
+        query = Puzzle.query.filter_by(game_id=game.game_id, is_active=True)
+        if only is not None:
+            query = query.filter(Puzzle.id.in_(only))
+        rows = query.order_by(Puzzle.id.asc()).all()
+        # several generated datasets can share the table; play one (4 cards, target 24)
+        dataset = current_app.config.get("GAME24_DATASET") or DEFAULT_DATASET
         out: List[G24Puzzle] = []
         for r in rows:
             try:
                 cj = r.content_json or {}
+                if (cj.get("dataset") or DEFAULT_DATASET) != dataset or int(cj.get("target", 24)) != 24:
+                    continue
                 cards = list(map(int, cj.get("cards") or []))
                 if len(cards) != 4:
                     continue
@@ -133,14 +645,14 @@ class Game24Store:
                 )
                 sols = cj.get("solutions") or cj.get("solution") or []
                 lvl  = (cj.get("level") or "").strip().lower() or None
-                out.append(G24Puzzle(case_id=case_id, cards=cards, solutions=sols, level=lvl))
+                out.append(G24Puzzle(case_id=case_id, cards=cards, solutions=sols, level=lvl,
+                                     features=cj.get("features") or None, db_id=int(r.id)))
             except Exception as e:
                 logger.warning("skip puzzle id=%s ext=%s: %s", r.id, r.external_id, e)
-        return out
+        return out, [int(r.id) for r in rows]
 
     def _load_from_json(self) -> List[G24Puzzle]:
-        # answers.json placed at: app/games/game24/static/answers.json
-        base = Path(__file__).resolve().parents[2] / "game24" / "static" / "answers.json"
+        base = ANSWERS_JSON
         if not base.exists():
             logger.warning("answers.json missing at %s", base)
             return []
@@ -161,49 +673,103 @@ class Game24Store:
                 case_id = int(row.get("case_id"))
                 sols    = row.get("solutions") or []
                 lvl     = (row.get("level") or "").strip().lower() or None
-                out.append(G24Puzzle(case_id=case_id, cards=cards, solutions=sols, level=lvl))
+                out.append(G24Puzzle(case_id=case_id, cards=cards, solutions=sols, level=lvl,
+                                     features=row.get("features") or None))
             return out
         except Exception as e:
             logger.exception("load answers.json failed: %s", e)
             return []
 
-    def _build_caches(self, puzzles: List[G24Puzzle]) -> None:
-        self.by_id  = {p.case_id: p for p in puzzles}
-        self.by_key = {values_key(p.cards): p for p in puzzles}
-
-        nosol, easy, med, hard = [], [], [], []
-        med_with_simple, med_with_hard = [], []
-        for p in puzzles:
-            has_sol = bool(p.solutions)
-            vals_key = values_key(p.cards)
-            triplet  = (p, p.cards, vals_key)
-            lvl = (p.level or "").lower()
-            if not has_sol:
-                nosol.append(triplet)
-            if lvl == "easy" and has_sol:
-                easy.append(triplet)
-            if lvl == "medium":
-                med.append(triplet)
-                if has_sol and self._has_simple(p): med_with_simple.append(triplet)
-                if has_sol and self._has_hard(p):   med_with_hard.append(triplet)
-            if lvl == "hard":
-                hard.append(triplet)
-
-        easy_like = easy + med_with_simple
-        hard_like = hard + med_with_hard
-
-        self.pools = {
+    def _build_caches(self, puzzles: List[G24Puzzle], db_seen: Iterable[int] = ()) -> None:
+        cols = _Columns()
+        simple, hard = self._complexity_flags(puzzles, [bool(p.solutions) for p in puzzles])
+        for p, s, h in zip(puzzles, simple, hard):
+            cols.add(p, s, h)
+        self._install(cols, db_seen)
+
+    def _install(self, cols: _Columns, db_seen: Iterable[int] = ()) -> None:
+        """Take over a finished _Columns as this store's rows (a new version)."""
+        self.version = next(_VERSIONS)
+        self._feature_index: Optional[FeatureIndex] = None
+        self._solvable_ids = {}
+        n = len(cols)
+        self.cards, self.ids, self.hands, self.db_ids = cols.cards, cols.ids, cols.hands, cols.db_ids
+        self.levels, self.flags = cols.levels, cols.flags
+        self.feat_v, self.n_sol, self.min_depth = cols.feat_v, cols.n_sol, cols.min_depth
+        self.min_cx, self.max_cx = cols.min_cx, cols.max_cx
+        self._db_seen = array("q", sorted(db_seen))
+        self._level_names = level_names = cols.level_names
+        self._odd_features = cols.odd_features
+        self._id_sorted, self._id_rows = _sorted_index(cols.ids, "i")
+        self._hand_sorted, self._hand_rows = _sorted_index(cols.hands, "q")
+        self._row_sol, self._sol_off, self._sol_text = cols.row_sol, cols.sol_off, "".join(cols.sols_text)
+        self._wt_off, self._wt_text = cols.wt_off, "".join(cols.wt_text)
+        self._forms, self._form_off = cols.forms, cols.form_off
+        levels, flags = cols.levels, cols.flags
+
+        # each pool is a filter over the level / flag columns
+        def select(pred) -> array:
+            return array("i", (r for r in range(n) if pred(level_names[levels[r]], flags[r])))
+
+        nosol = select(lambda lv, f: not f & FLAG_HAS_SOL)
+        easy  = select(lambda lv, f: lv == "easy" and f & FLAG_HAS_SOL)
+        med   = select(lambda lv, f: lv == "medium")
+        hard  = select(lambda lv, f: lv == "hard")
+        easy_like = easy + select(lambda lv, f: lv == "medium" and f & FLAG_SIMPLE)
+        hard_like = hard + select(lambda lv, f: lv == "medium" and f & FLAG_HARD)
+
+        self.pools: Dict[str, array] = {
             "nosol": nosol,
             "easy_like": easy_like,
             "medium": med,
             "hard_like": hard_like,
         }
 
+        if not n:
+            return
         logger.info("Game24 store loaded (%s): nosol=%d easy=%d medium=%d hard=%d",
                     self.loaded_from or "-", len(nosol), len(easy), len(med), len(hard))
         logger.info("Game24 derived pools: easy_like=%d hard_like=%d",
                     len(easy_like), len(hard_like))
 
+    @staticmethod
+    def _feature_columns(f: Optional[Dict[str, Any]]) -> Optional[Tuple[int, ...]]:
+        """(flag bits, v, n_solutions, min_depth, min_cx, max_cx), or None if f isn't the standard shape."""
+        if not f or set(f) != set(_FEATURE_FIELDS):
+            return None
+        cols = [_small(f[k]) for k in ("n_solutions", "min_depth", "min_complexity", "max_complexity")]
+        v = f["v"]
+        if None in cols or not isinstance(v, int) or not 0 <= v < 256:
+            return None
+        bits = 0
+        for k, bit in _FEATURE_BITS:
+            if not isinstance(f[k], bool):
+                return None
+            bits |= bit * f[k]
+        return (bits, v, *cols)
+
+    def _complexity_flags(self, puzzles: List[G24Puzzle], has_sol: List[bool]) -> Tuple[List[bool], List[bool]]:
+        """
+        (has a simple solution, has a hard solution) per puzzle: read from the
+        stored features, re-scoring solution strings only for rows without them.
+        """
+        simple, hard = [], []
+        rescored = 0
+        for p, ok in zip(puzzles, has_sol):
+            f = p.features
+            if not ok:
+                simple.append(False); hard.append(False)
+            elif f and f.get("min_complexity") is not None:
+                simple.append(f["min_complexity"] <= SIMPLE_THRESHOLD)
+                hard.append(f["max_complexity"] >= HARD_THRESHOLD)
+            else:
+                simple.append(self._has_simple(p)); hard.append(self._has_hard(p))
+                rescored += 1
+        if rescored:
+            logger.info("Game24 store: %d puzzle(s) without features, scored solution strings "
+                        "(run flask game24-backfill-features)", rescored)
+        return simple, hard
+
     def _has_simple(self, p: G24Puzzle) -> bool:
         if not p.solutions: return False
         return min(score_expression_complexity(s) for s in p.solutions) <= SIMPLE_THRESHOLD
@@ -213,20 +779,202 @@ class Game24Store:
         return max(score_expression_complexity(s) for s in p.solutions) >= HARD_THRESHOLD
 
 
+def _ids_digest(ids: List[int]) -> str:
+    """blake2b of the ascending id list: the active set itself, not an aggregate that swaps can cancel."""
+    return hashlib.blake2b(array("q", ids).tobytes(), digest_size=16).hexdigest()
+
+
+def touch_game(game: Game) -> None:
+    """Mark the game's puzzle rows as changed in place (part of the store watermark); caller commits."""
+    game.update_dt = datetime.now(timezone.utc)
+
+
+def set_puzzles_active(case_ids: Iterable[int], active: bool) -> int:
+    """
+    (De)activate the puzzle rows of the configured dataset with these
+    case_ids (resolved as _load_from_db does). Returns rows changed. The
+    store watermark digests the active ids, so any change moves it and the
+    next reload patches the rows in (games.update_dt is left alone: that
+    would force a full load); other workers pick it up at their next
+    version check.
+    """
+    game = Game.query.filter_by(game_key="game24").first()
+    if game is None:
+        raise ValueError("game 'game24' not found")
+    dataset = current_app.config.get("GAME24_DATASET") or DEFAULT_DATASET
+    want = {int(c) for c in case_ids}
+    n = 0
+    for r in Puzzle.query.filter_by(game_id=game.game_id, is_active=not active):
+        cj = r.content_json or {}
+        if (cj.get("dataset") or DEFAULT_DATASET) != dataset:
+            continue
+        ext = str(r.external_id or "")
+        case_id = int(ext) if ext.isdigit() else cj.get("case_id")
+        if case_id is not None and int(case_id) in want:
+            r.is_active = active
+            n += 1
+    db.session.commit()
+    logger.info("%s %d game24 puzzle row(s) for case_ids %s",
+                "activated" if active else "deactivated", n, sorted(want))
+    return n
+
+
 # --------- accessors (store lives on current_app) ----------
-def get_store(load: bool = True) -> Game24Store:
+def solution_table_path() -> Optional[Path]:
+    """GAME24_SOLUTION_TABLE config, else <instance>/game24_solution_table.json.gz."""
+    try:
+        cfg = current_app.config.get("GAME24_SOLUTION_TABLE")
+        return Path(cfg) if cfg else Path(current_app.instance_path) / SOLUTION_TABLE_FILENAME
+    except RuntimeError:
+        return None
+
+def snapshot_path() -> Optional[Path]:
+    """GAME24_STORE_SNAPSHOT config, else <instance>/game24_store.snapshot; None if set to False."""
+    try:
+        cfg = current_app.config.get("GAME24_STORE_SNAPSHOT")
+        if cfg is False:
+            return None
+        return Path(cfg) if cfg else Path(current_app.instance_path) / SNAPSHOT_FILENAME
+    except RuntimeError:
+        return None
+
+def _extensions() -> Dict[str, Any]:
     ext = getattr(current_app, "extensions", None)
     if ext is None:
         current_app.extensions = {}
         ext = current_app.extensions
+    return ext
+
+def _reload_lock(ext: Dict[str, Any]) -> threading.Lock:
+    return ext.setdefault("game24_store_lock", threading.Lock())
+
+def get_store(load: bool = True) -> Game24Store:
+    """The published store version, loaded on first use (once, however many requests ask at the same time)."""
+    ext = _extensions()
     store: Game24Store | None = ext.get("game24_store")
-    if store is None:
-        store = Game24Store(cap=None)
-        ext["game24_store"] = store
-    if load:
-        store.load(force=False)
+    if store is not None and (len(store) or not load):
+        return store
+    if not load:
+        return ext.setdefault("game24_store", Game24Store(cap=None))
+    with _reload_lock(ext):
+        store = ext.get("game24_store")
+        if store is None or not len(store):
+            store = Game24Store(cap=None)
+            store.load()
+            ext["game24_store"] = store
     return store
 
-def warmup_store(force: bool = False) -> None:
-    get_store(load=False).load(force=force)
+def reload_store(full: bool = False) -> Game24Store:
+    """
+    Build the next store version next to the published one (incrementally
+    when possible, see Game24Store.refreshed) and swap it in. The swap is
+    one reference assignment, so readers get the old version or the new
+    one, never a mix. One reload runs at a time; callers queued behind it
+    find the watermark unchanged and return at the cost of one query.
+    """
+    ext = _extensions()
+    with _reload_lock(ext):
+        cur: Game24Store | None = ext.get("game24_store")
+        if cur is None:
+            new = Game24Store(cap=None)
+            new.load(force=full)
+        else:
+            new = cur.refreshed(full=full)
+        if new is not cur:
+            ext["game24_store"] = new
+    return new
+
+def schedule_reload(full: bool = False) -> None:
+    """
+    reload_store() on a daemon thread, so the request that noticed a change
+    doesn't pay for the rebuild. While one runs, further calls only ask it
+    for one more pass.
+    """
+    app = current_app._get_current_object()
+    ext = _extensions()
+    with ext.setdefault("game24_reload_guard", threading.Lock()):
+        state = ext.setdefault("game24_reload_state", {"pending": False, "full": False, "thread": None})
+        state["pending"] = True
+        state["full"] = state["full"] or full
+        t = state["thread"]
+        if t is not None and t.is_alive():
+            return
+        t = state["thread"] = threading.Thread(
+            target=_reload_worker, args=(app, ext, state), name="game24-store-reload", daemon=True)
+    t.start()
 
+def _reload_worker(app, ext: Dict[str, Any], state: Dict[str, Any]) -> None:
+    while True:
+        with ext["game24_reload_guard"]:
+            if not state["pending"]:
+                state["thread"] = None
+                return
+            full, state["pending"], state["full"] = state["full"], False, False
+        try:
+            with app.app_context():
+                reload_store(full=full)
+        except Exception:
+            logger.exception("Game24 background store reload failed")
+
+# --------- cross-worker invalidation ----------
+# Every worker holds its own store, so a CLI rebuild or a deactivated
+# puzzle only reaches the others through a shared store version, checked
+# at most every GAME24_STORE_CHECK_SECONDS from the request hook:
+#   - by default the version is the DB watermark itself (the active id
+#     digest, so a (de)activation is seen even when set_puzzles_active
+#     leaves games.update_dt alone); the check just schedules a background
+#     reload, which re-reads the watermark and returns at once (no new
+#     version) when nothing moved;
+#   - with GAME24_STORE_VERSION_FILE set, writers touch that file after
+#     committing (touch_store_version) and workers only stat() it, reloading
+#     when it changed. No DB traffic until something changes.
+
+def touch_store_version() -> bool:
+    """Announce a committed puzzle change to other workers (file mode). Returns whether a file was written."""
+    cfg = current_app.config.get("GAME24_STORE_VERSION_FILE")
+    if not cfg:
+        return False
+    path = Path(cfg)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(f"{time.time_ns()} {os.getpid()}\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return True
+
+def _version_token(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+def check_store_version() -> None:
+    """Per-request hook: cheap unless the check interval has passed (see above)."""
+    every = float(current_app.config.get("GAME24_STORE_CHECK_SECONDS") or 0)
+    if every <= 0:
+        return
+    cfg = current_app.config.get("GAME24_STORE_VERSION_FILE")
+    ext = _extensions()
+    now = time.monotonic()
+    state = ext.get("game24_store_check")
+    if state is None:
+        state = ext.setdefault("game24_store_check",
+                               {"at": now, "token": _version_token(Path(cfg)) if cfg else None})
+    if now - state["at"] < every:
+        return
+    state["at"] = now
+    if not cfg:
+        schedule_reload()
+        return
+    token = _version_token(Path(cfg))
+    if token != state["token"]:
+        state["token"] = token
+        logger.info("Game24 store version file %s changed; reloading", cfg)
+        schedule_reload()
+
+def warmup_store(force: bool = False) -> None:
+    """Load the store if it isn't; force=True publishes a full rebuild from the source."""
+    if force:
+        reload_store(full=True)
+    else:
+        get_store(load=True)
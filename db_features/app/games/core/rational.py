@@ -0,0 +1,88 @@
+# app/games/core/rational.py
+from __future__ import annotations
+from fractions import Fraction
+from math import gcd
+from typing import Optional, Tuple
+
+# ============================================================
+# Exact rationals as plain (numerator, denominator) int pairs
+# ============================================================
+# fractions.Fraction normalises (gcd) and allocates an object on every
+# operation, which dominates a 4-card search. Here a value is a tuple (n, d)
+# with d > 0 that is NOT kept in lowest terms: arithmetic is a few int
+# multiplications, equality is cross-multiplication, and norm() is called
+# only where a canonical form is needed (memo keys, display).
+
+Rat = Tuple[int, int]
+
+ZERO: Rat = (0, 1)
+ONE: Rat = (1, 1)
+
+
+def rat(x) -> Rat:
+    """int / Fraction / numeric string -> (n, d) in lowest terms."""
+    if isinstance(x, int):
+        return (x, 1)
+    f = x if isinstance(x, Fraction) else Fraction(str(x))
+    return (f.numerator, f.denominator)
+
+
+def norm(a: Rat) -> Rat:
+    n, d = a
+    g = gcd(n, d)
+    return (n // g, d // g) if g > 1 else a
+
+
+def add(a: Rat, b: Rat) -> Rat:
+    return (a[0] * b[1] + b[0] * a[1], a[1] * b[1])
+
+
+def sub(a: Rat, b: Rat) -> Rat:
+    return (a[0] * b[1] - b[0] * a[1], a[1] * b[1])
+
+
+def mul(a: Rat, b: Rat) -> Rat:
+    return (a[0] * b[0], a[1] * b[1])
+
+
+def div(a: Rat, b: Rat) -> Optional[Rat]:
+    """a / b, or None when b == 0. Keeps the denominator positive."""
+    if b[0] == 0:
+        return None
+    if b[0] < 0:
+        return (-a[0] * b[1], -a[1] * b[0])
+    return (a[0] * b[1], a[1] * b[0])
+
+
+def neg(a: Rat) -> Rat:
+    return (-a[0], a[1])
+
+
+def pow_int(a: Rat, e: int) -> Optional[Rat]:
+    """a ** e for integer e; None for 0 ** negative."""
+    if e >= 0:
+        return (a[0] ** e, a[1] ** e)
+    if a[0] == 0:
+        return None
+    n, d = a[1] ** -e, a[0] ** -e
+    return (-n, -d) if d < 0 else (n, d)
+
+
+def eq(a: Rat, b: Rat) -> bool:
+    return a[0] * b[1] == b[0] * a[1]
+
+
+def le(a: Rat, b: Rat) -> bool:
+    return a[0] * b[1] <= b[0] * a[1]
+
+
+def is_integer(a: Rat) -> bool:
+    return a[0] % a[1] == 0
+
+
+def to_float(a: Rat) -> float:
+    return a[0] / a[1]
+
+
+def to_fraction(a: Rat) -> Fraction:
+    return Fraction(a[0], a[1])
@@ -0,0 +1,194 @@
+# app/games/core/solution_table.py
+from __future__ import annotations
+from fractions import Fraction
+from itertools import combinations_with_replacement
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import gzip, json, logging, time
+
+from .game_core import hand_key, hand_key_str, parse_hand_key
+from .subset_solver import ATOM, render_binop
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Precomputed (hand, target) -> solvable bit + one canonical solution
+# ============================================================
+# Covers every 4-card hand over ranks 1..13 (1820 hands) for a contiguous
+# integer target range. Built offline (`flask game24-build-solution-table`),
+# written as gzipped JSON, and loaded into Game24Store so target != 24 picks,
+# "no solution" checks and single-solution help become dict lookups.
+
+TABLE_FORMAT = 1
+DEFAULT_TARGET_MIN = -100
+DEFAULT_TARGET_MAX = 200
+DEFAULT_RANKS = (1, 13)
+DEFAULT_FILENAME = "game24_solution_table.json.gz"
+
+
+def all_hands(ranks: Tuple[int, int] = DEFAULT_RANKS, k: int = 4) -> List[Tuple[int, ...]]:
+    """Every sorted k-card multiset over the inclusive rank range."""
+    lo, hi = int(ranks[0]), int(ranks[1])
+    return list(combinations_with_replacement(range(lo, hi + 1), k))
+
+
+def _better(new: Tuple[str, int], old: Tuple[str, int]) -> bool:
+    """Deterministic preference: shorter rendering first, then lexical."""
+    return (len(new[0]), new[0]) < (len(old[0]), old[0])
+
+
+def reachable_with_expressions(values: Iterable[int]) -> Dict[Fraction, Tuple[str, int]]:
+    """
+    Every exact value reachable by combining ALL of `values` with + - * /,
+    mapped to one canonical (expression, precedence). Bitmask DP over subsets.
+    """
+    vals = [int(v) for v in values]
+    n = len(vals)
+    memo: Dict[int, Dict[Fraction, Tuple[str, int]]] = {}
+    for i, v in enumerate(vals):
+        memo[1 << i] = {Fraction(v): (str(v), ATOM)}
+
+    for mask in range(1, 1 << n):
+        if mask in memo:
+            continue
+        out: Dict[Fraction, Tuple[str, int]] = {}
+
+        def put(val: Fraction, cand: Tuple[str, int]) -> None:
+            old = out.get(val)
+            if old is None or _better(cand, old):
+                out[val] = cand
+
+        sub = (mask - 1) & mask
+        while sub:
+            other = mask ^ sub
+            if sub < other:
+                for va, ea in memo[sub].items():
+                    for vb, eb in memo[other].items():
+                        put(va + vb, render_binop(ea, eb, "+") if va <= vb else render_binop(eb, ea, "+"))
+                        put(va * vb, render_binop(ea, eb, "*") if va <= vb else render_binop(eb, ea, "*"))
+                        put(va - vb, render_binop(ea, eb, "-"))
+                        put(vb - va, render_binop(eb, ea, "-"))
+                        if vb != 0:
+                            put(va / vb, render_binop(ea, eb, "/"))
+                        if va != 0:
+                            put(vb / va, render_binop(eb, ea, "/"))
+            sub = (sub - 1) & mask
+        memo[mask] = out
+    return memo[(1 << n) - 1]
+
+
+class SolutionTable:
+    """
+    hand key (hand_key) -> (bitmap over [t_min, t_max], solutions for set bits).
+    Solutions per hand are kept as one newline-joined string in bit order to keep
+    the per-worker footprint small; lookup is a popcount + split.
+    """
+    def __init__(self, t_min: int, t_max: int, ranks: Tuple[int, int] = DEFAULT_RANKS):
+        self.t_min = int(t_min)
+        self.t_max = int(t_max)
+        self.ranks = (int(ranks[0]), int(ranks[1]))
+        self.hands: Dict[int, Tuple[int, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.hands)
+
+    def covers(self, target: int) -> bool:
+        return self.t_min <= int(target) <= self.t_max
+
+    def is_solvable(self, values: List[int], target: int) -> Optional[bool]:
+        """True/False when the table knows the answer, None when it does not."""
+        if not self.covers(target):
+            return None
+        row = self.hands.get(hand_key(values))
+        if row is None:
+            return None
+        return bool((row[0] >> (int(target) - self.t_min)) & 1)
+
+    def solution(self, values: List[int], target: int) -> Optional[str]:
+        if not self.covers(target):
+            return None
+        row = self.hands.get(hand_key(values))
+        if row is None:
+            return None
+        bits, sols = row
+        bit = int(target) - self.t_min
+        if not (bits >> bit) & 1:
+            return None
+        idx = bin(bits & ((1 << bit) - 1)).count("1")
+        return sols.split("\n")[idx]
+
+    def solvable_keys(self, target: int) -> Optional[frozenset]:
+        if not self.covers(target):
+            return None
+        bit = int(target) - self.t_min
+        return frozenset(k for k, (bits, _) in self.hands.items() if (bits >> bit) & 1)
+
+    # -------- build / persist --------
+    def add_hand(self, values: Iterable[int]) -> None:
+        vals = sorted(int(v) for v in values)
+        reach = reachable_with_expressions(vals)
+        hits = sorted(
+            (int(val), expr) for val, (expr, _prec) in reach.items()
+            if val.denominator == 1 and self.t_min <= val <= self.t_max
+        )
+        bits = 0
+        for t, _expr in hits:
+            bits |= 1 << (t - self.t_min)
+        self.hands[hand_key(vals)] = (bits, "\n".join(expr for _t, expr in hits))
+
+    def to_json(self) -> Dict:
+        return {
+            "format": TABLE_FORMAT,
+            "t_min": self.t_min,
+            "t_max": self.t_max,
+            "ranks": list(self.ranks),
+            "hands": {hand_key_str(k): [format(bits, "x"), sols] for k, (bits, sols) in self.hands.items()},
+        }
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "SolutionTable":
+        if int(data.get("format", 0)) != TABLE_FORMAT:
+            raise ValueError(f"unsupported solution table format: {data.get('format')}")
+        table = cls(data["t_min"], data["t_max"], tuple(data.get("ranks") or DEFAULT_RANKS))
+        table.hands = {parse_hand_key(k): (int(bits, 16), sols) for k, (bits, sols) in data["hands"].items()}
+        return table
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, separators=(",", ":"))
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["SolutionTable"]:
+        path = Path(path)
+        if not path.exists():
+            logger.info("solution table not found at %s", path)
+            return None
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return cls.from_json(json.load(f))
+        except Exception:
+            logger.exception("load solution table failed: %s", path)
+            return None
+
+
+def build_table(
+    t_min: int = DEFAULT_TARGET_MIN,
+    t_max: int = DEFAULT_TARGET_MAX,
+    ranks: Tuple[int, int] = DEFAULT_RANKS,
+    progress=None,
+) -> SolutionTable:
+    """Solve every 4-card hand once and record all integer targets in range."""
+    if t_min > t_max:
+        raise ValueError("t_min must be <= t_max")
+    table = SolutionTable(t_min, t_max, ranks)
+    hands = all_hands(ranks)
+    started = time.time()
+    for i, hand in enumerate(hands, start=1):
+        table.add_hand(hand)
+        if progress and i % 200 == 0:
+            progress(i, len(hands))
+    logger.info("solution table built: hands=%d targets=%d..%d in %.1fs",
+                len(hands), t_min, t_max, time.time() - started)
+    return table
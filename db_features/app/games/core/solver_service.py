@@ -0,0 +1,274 @@
+# app/games/core/solver_service.py
+from __future__ import annotations
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+import atexit, logging, multiprocessing, time
+
+from flask import current_app
+
+from .game_core import enumerate_solutions, hand_key, solve_one
+from .op_sets import DEFAULT_OP_SET, normalize_op_set
+from .step_budget import BudgetExceeded, step_budget
+from .target_index import reachable_target_bits
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Admission control in front of solve_one / enumerate_solutions
+# ============================================================
+# Request-supplied hands go through here instead of straight into the solver:
+#   1) validate   - card count, value and target magnitude limits
+#   2) estimate   - expected search steps from the card count; hands whose
+#                   estimate can't fit the step budget are refused up front
+#                   (per operator set: ^ and concatenation widen the search)
+#   3) run        - cheap hands (<= GAME24_SOLVER_INLINE_CARDS) inline, so
+#                   4-card requests never queue behind heavy ones; the rest
+#                   in a small process pool with a bounded number of pending
+#                   jobs, identical in-flight (kind, hand, target) requests
+#                   sharing one future
+# Every run is under a cooperative step budget + deadline (step_budget.py);
+# the caller additionally stops waiting after the hard timeout. Offloaded
+# jobs carry the deadline of the request that submitted them (wall clock,
+# so it means the same in the worker process): a job that waited in the
+# queue past it is dropped without running. A pool whose worker died
+# (e.g. OOM-killed) is discarded and rebuilt on the next submit.
+
+# measured worst-case steps for an unsolvable target (ranks 1..13, + - * /)
+_CARD_COST = {1: 1, 2: 6, 3: 40, 4: 350, 5: 6_000, 6: 110_000, 7: 720_000}
+_COST_GROWTH = 15  # per extra card beyond the table
+# pow/concat run the recursive search (no subset DP), so 5+ cards cost far more
+_OP_SET_COST = {"basic": 1, "pow": 3, "concat": 4}
+_RECURSIVE_GROWTH = 40  # per card beyond 4 without the subset DP
+
+
+class SolverRejected(ValueError):
+    """Input outside the configured limits (maps to HTTP 400)."""
+
+
+class SolverBusy(RuntimeError):
+    """Too many heavy solves pending (maps to HTTP 503)."""
+
+
+class SolverTimeout(RuntimeError):
+    """Step budget or hard timeout hit (maps to HTTP 503)."""
+
+
+def estimate_cost(n_cards: int, op_set: str = DEFAULT_OP_SET) -> int:
+    n = int(n_cards)
+    if op_set != DEFAULT_OP_SET and n > 4:
+        return _CARD_COST[4] * _OP_SET_COST.get(op_set, 1) * _RECURSIVE_GROWTH ** (n - 4)
+    if n in _CARD_COST:
+        cost = _CARD_COST[n]
+    else:
+        top = max(_CARD_COST)
+        cost = _CARD_COST[top] * _COST_GROWTH ** max(0, n - top)
+    return cost * _OP_SET_COST.get(op_set, 1)
+
+
+def _run_job(kind: str, values: List[int], target: int, limit: int, op_set: str,
+             max_steps: Optional[int], deadline: Optional[float]) -> Any:
+    """
+    Executed inline or in a pool worker; deadline is a time.time() value
+    (None: no limit). For kind "targets", target / limit are the window's min / max.
+    """
+    timeout = None
+    if deadline is not None:
+        timeout = deadline - time.time()
+        if timeout <= 0:
+            raise BudgetExceeded("timeout", 0)
+    with step_budget(max_steps, timeout):
+        if kind == "one":
+            return solve_one(values, target, op_set)
+        if kind == "targets":
+            return reachable_target_bits(values, target, limit)
+        return enumerate_solutions(values, target, limit=limit, op_set=op_set)
+
+
+class SolverService:
+    """Lives in current_app.extensions['game24_solver']."""
+    def __init__(
+        self,
+        max_cards: int = 6,
+        max_value: int = 100,
+        max_target: int = 100_000,
+        inline_cards: int = 4,
+        step_budget: int = 250_000,
+        timeout: float = 5.0,
+        workers: int = 2,
+        max_pending: int = 8,
+    ):
+        self.max_cards = int(max_cards)
+        self.max_value = int(max_value)
+        self.max_target = int(max_target)
+        self.inline_cards = int(inline_cards)
+        self.step_budget = int(step_budget) if step_budget else None
+        self.timeout = float(timeout) if timeout else None
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[Tuple, Future] = {}
+        self._lock = Lock()
+        self.counters = {
+            "inline": 0, "offloaded": 0, "coalesced": 0,
+            "rejected": 0, "busy": 0, "timeouts": 0, "pool_restarts": 0,
+        }
+
+    @classmethod
+    def from_config(cls, config) -> "SolverService":
+        return cls(
+            max_cards=config.get("GAME24_SOLVER_MAX_CARDS", 6),
+            max_value=config.get("GAME24_SOLVER_MAX_VALUE", 100),
+            max_target=config.get("GAME24_SOLVER_MAX_TARGET", 100_000),
+            inline_cards=config.get("GAME24_SOLVER_INLINE_CARDS", 4),
+            step_budget=config.get("GAME24_SOLVER_STEP_BUDGET", 250_000),
+            timeout=config.get("GAME24_SOLVER_TIMEOUT", 5.0),
+            workers=config.get("GAME24_SOLVER_WORKERS", 2),
+            max_pending=config.get("GAME24_SOLVER_MAX_PENDING", 8),
+        )
+
+    # -------- admission --------
+    def validate(self, values: Any, target: Any, op_set: str = DEFAULT_OP_SET) -> Tuple[List[int], int]:
+        """Normalised (values, target) or SolverRejected."""
+        try:
+            if not isinstance(values, (list, tuple)) or any(isinstance(v, bool) for v in values):
+                raise TypeError
+            vals = [int(v) for v in values]
+            if any(v != float(raw) for v, raw in zip(vals, values)):
+                raise TypeError
+            t = int(target)
+        except (TypeError, ValueError):
+            self._count("rejected")
+            raise SolverRejected("values must be a list of integers and target an integer")
+        if not 1 <= len(vals) <= self.max_cards:
+            self._count("rejected")
+            raise SolverRejected(f"between 1 and {self.max_cards} cards are supported")
+        if any(abs(v) > self.max_value for v in vals):
+            self._count("rejected")
+            raise SolverRejected(f"card values must be within ±{self.max_value}")
+        if abs(t) > self.max_target:
+            self._count("rejected")
+            raise SolverRejected(f"target must be within ±{self.max_target}")
+        if self.step_budget is not None and estimate_cost(len(vals), op_set) > self.step_budget:
+            self._count("rejected")
+            raise SolverRejected(f"{len(vals)} cards is too expensive to solve on demand")
+        return vals, t
+
+    # -------- public API --------
+    def solve_one(self, values: Any, target: Any, op_set: str = DEFAULT_OP_SET) -> Optional[str]:
+        op_set = normalize_op_set(op_set)
+        vals, t = self.validate(values, target, op_set)
+        return self._run("one", vals, t, 1, op_set)
+
+    def enumerate_solutions(self, values: Any, target: Any, limit: int = 50,
+                            op_set: str = DEFAULT_OP_SET) -> List[str]:
+        op_set = normalize_op_set(op_set)
+        vals, t = self.validate(values, target, op_set)
+        return self._run("all", vals, t, int(limit), op_set)
+
+    def reachable_target_bits(self, values: Any, t_min: Any, t_max: Any) -> int:
+        """Bitset over [t_min, t_max] of the hand's integer targets (target_index.py), under the same limits."""
+        vals, lo = self.validate(values, t_min)
+        _vals, hi = self.validate(vals, t_max)
+        return self._run("targets", vals, lo, hi, DEFAULT_OP_SET)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "pending": len(self._inflight), "workers": self.workers}
+
+    def shutdown(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    # -------- internals --------
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] += 1
+
+    def _deadline(self) -> Optional[float]:
+        return time.time() + self.timeout if self.timeout else None
+
+    def _run(self, kind: str, vals: List[int], t: int, limit: int, op_set: str) -> Any:
+        if len(vals) <= self.inline_cards:
+            self._count("inline")
+            try:
+                return _run_job(kind, vals, t, limit, op_set, self.step_budget, self._deadline())
+            except BudgetExceeded as e:
+                self._count("timeouts")
+                raise SolverTimeout(str(e))
+
+        fut = self._submit((kind, hand_key(vals), t, limit, op_set), vals)
+        try:
+            return fut.result(timeout=self.timeout)
+        except FutureTimeout:
+            # still queued: drop it; already running: the worker stops at the submit-time deadline
+            fut.cancel()
+            self._count("timeouts")
+            raise SolverTimeout("solver timed out")
+        except BudgetExceeded as e:
+            self._count("timeouts")
+            raise SolverTimeout(str(e))
+        except BrokenProcessPool:
+            self._drop_pool()
+            raise SolverBusy("solver worker crashed, try again shortly")
+
+    def _drop_pool(self) -> None:
+        """Discard a broken pool (once, however many callers saw it break); the next submit starts a new one."""
+        with self._lock:
+            pool = self._pool
+            if pool is None or not getattr(pool, "_broken", True):
+                return
+            self._pool = None
+            self.counters["pool_restarts"] += 1
+        logger.warning("solver process pool broken; starting a new one on the next offloaded solve")
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, key: Tuple, vals: List[int]) -> Future:
+        kind, _hand, t, limit, op_set = key
+        with self._lock:
+            fut = self._inflight.get(key)
+            if fut is not None:
+                self.counters["coalesced"] += 1
+                return fut
+            if len(self._inflight) >= self.max_pending:
+                self.counters["busy"] += 1
+                raise SolverBusy("solver is busy, try again shortly")
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                )
+            try:
+                fut = self._pool.submit(_run_job, kind, vals, t, limit, op_set, self.step_budget, self._deadline())
+            except BrokenProcessPool:
+                self._pool = None
+                self.counters["pool_restarts"] += 1
+                self.counters["busy"] += 1
+                logger.warning("solver process pool broken; starting a new one on the next offloaded solve")
+                raise SolverBusy("solver is restarting, try again shortly")
+            self._inflight[key] = fut
+            self.counters["offloaded"] += 1
+        fut.add_done_callback(lambda _f, k=key: self._done(k))
+        return fut
+
+    def _done(self, key: Tuple) -> None:
+        with self._lock:
+            self._inflight.pop(key, None)
+
+
+def get_solver_service() -> SolverService:
+    ext = current_app.extensions
+    svc: SolverService | None = ext.get("game24_solver")
+    if svc is None:
+        svc = SolverService.from_config(current_app.config)
+        ext["game24_solver"] = svc
+        atexit.register(svc.shutdown)
+    return svc
+
+
+__all__ = [
+    "SolverService", "SolverRejected", "SolverBusy", "SolverTimeout",
+    "estimate_cost", "get_solver_service",
+]
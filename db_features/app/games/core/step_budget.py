@@ -0,0 +1,64 @@
+# app/games/core/step_budget.py
+from __future__ import annotations
+from contextlib import contextmanager
+from threading import local
+from typing import Iterator, Optional
+import time
+
+# ============================================================
+# Cooperative step budget for solver searches
+# ============================================================
+# The solvers call tick(n) at their expensive loops. Outside a step_budget()
+# block that is a no-op; inside one, the steps are counted against the active
+# budget (per thread, so inline solves and pool workers don't interfere) and
+# BudgetExceeded is raised once the step count or the deadline is passed.
+
+_CLOCK_EVERY = 1024  # steps between deadline checks
+
+_active = local()
+
+
+class BudgetExceeded(RuntimeError):
+    # args are (reason, steps) so the exception pickles back from pool workers
+    def __init__(self, reason: str, steps: int):
+        super().__init__(reason, steps)
+        self.reason = reason
+        self.steps = steps
+
+    def __str__(self) -> str:
+        return f"solver budget exceeded ({self.reason}) after {self.steps} steps"
+
+
+class StepBudget:
+    def __init__(self, max_steps: Optional[int] = None, timeout: Optional[float] = None):
+        self.max_steps = int(max_steps) if max_steps else None
+        self.deadline = time.monotonic() + float(timeout) if timeout else None
+        self.steps = 0
+        self._next_clock = _CLOCK_EVERY
+
+    def spend(self, n: int = 1) -> None:
+        self.steps += n
+        if self.max_steps is not None and self.steps > self.max_steps:
+            raise BudgetExceeded("steps", self.steps)
+        if self.deadline is not None and self.steps >= self._next_clock:
+            self._next_clock = self.steps + _CLOCK_EVERY
+            if time.monotonic() > self.deadline:
+                raise BudgetExceeded("timeout", self.steps)
+
+
+def tick(n: int = 1) -> None:
+    budget = getattr(_active, "budget", None)
+    if budget is not None:
+        budget.spend(n)
+
+
+@contextmanager
+def step_budget(max_steps: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[StepBudget]:
+    """Run the enclosed solver calls under a step/time budget (nests: inner wins)."""
+    outer = getattr(_active, "budget", None)
+    budget = StepBudget(max_steps, timeout)
+    _active.budget = budget
+    try:
+        yield budget
+    finally:
+        _active.budget = outer
@@ -0,0 +1,148 @@
+# app/games/core/store_snapshot.py
+from __future__ import annotations
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+import hashlib, json, logging, mmap, os, struct, sys
+
+logger = logging.getLogger(__name__)
+
+# ============================================================
+# Binary Game24Store snapshot (boot without the DB)
+# ============================================================
+# `flask game24-rebuild-store` builds the store from the DB once and writes
+# its columns here; workers map the file on boot and copy the arrays out
+# instead of reading every puzzle row, tracing walkthroughs and hashing
+# canonical forms again. Layout:
+#
+#   MAGIC (8 bytes) | header length (uint32 LE) | header JSON | payload
+#
+# The header lists every array column (name, typecode, itemsize, offset,
+# length) and text column (name, offset, length) inside the payload, plus
+# free-form `meta` (level names, odd features ...), the DB `watermark` the
+# columns were read at, and a blake2b checksum of the payload. A snapshot
+# is only used when its format, byte order, item sizes, checksum and
+# watermark all match; anything else means "stale", and the caller reads
+# the DB as before.
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_FILENAME = "game24_store.snapshot"
+MAGIC = b"G24SNAP\0"
+_HEAD = struct.Struct("<I")
+
+
+def _checksum(payload) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def save_snapshot(
+    path: Path,
+    arrays: Dict[str, array],
+    texts: Dict[str, str],
+    meta: Dict[str, Any],
+    watermark: Dict[str, Any],
+) -> int:
+    """Write the columns atomically (temp file + rename). Returns bytes written."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    chunks = []
+    cols, strs = [], []
+    off = 0
+    for name, col in arrays.items():
+        raw = col.tobytes()
+        cols.append([name, col.typecode, col.itemsize, off, len(raw)])
+        chunks.append(raw)
+        off += len(raw)
+    for name, text in texts.items():
+        raw = text.encode("utf-8")
+        strs.append([name, off, len(raw)])
+        chunks.append(raw)
+        off += len(raw)
+    payload = b"".join(chunks)
+    header = json.dumps({
+        "format": SNAPSHOT_FORMAT,
+        "byteorder": sys.byteorder,
+        "watermark": watermark,
+        "checksum": _checksum(payload),
+        "arrays": cols,
+        "texts": strs,
+        "meta": meta,
+    }, separators=(",", ":"), sort_keys=True).encode("utf-8")
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEAD.pack(len(header)))
+        f.write(header)
+        f.write(payload)
+    os.replace(tmp, path)
+    return len(MAGIC) + _HEAD.size + len(header) + len(payload)
+
+
+def read_header(path: Path) -> Optional[Dict[str, Any]]:
+    """The snapshot's header, or None if the file is missing or not a snapshot."""
+    try:
+        with open(path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                return None
+            (n,) = _HEAD.unpack(f.read(_HEAD.size))
+            return json.loads(f.read(n).decode("utf-8"))
+    except (OSError, ValueError, struct.error):
+        return None
+
+
+def load_snapshot(
+    path: Path,
+    watermark: Optional[Dict[str, Any]],
+) -> Optional[Tuple[Dict[str, array], Dict[str, str], Dict[str, Any]]]:
+    """
+    (arrays, texts, meta) from the snapshot at `path`, or None when it is
+    missing, damaged, written by another format / platform, or taken at a
+    different watermark (pass None to skip the watermark check).
+    """
+    path = Path(path)
+    if not path.exists():
+        logger.info("store snapshot not found at %s", path)
+        return None
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm[:len(MAGIC)] != MAGIC:
+                logger.warning("store snapshot %s: bad magic", path)
+                return None
+            (n,) = _HEAD.unpack_from(mm, len(MAGIC))
+            start = len(MAGIC) + _HEAD.size
+            head = json.loads(mm[start:start + n].decode("utf-8"))
+            base = start + n
+            if head.get("format") != SNAPSHOT_FORMAT or head.get("byteorder") != sys.byteorder:
+                logger.info("store snapshot %s: format %s/%s, want %s/%s", path,
+                            head.get("format"), head.get("byteorder"), SNAPSHOT_FORMAT, sys.byteorder)
+                return None
+            if watermark is not None and head.get("watermark") != watermark:
+                logger.info("store snapshot %s is stale: %s != %s", path, head.get("watermark"), watermark)
+                return None
+            with memoryview(mm) as view:
+                payload = view[base:]
+                try:
+                    if _checksum(payload) != head.get("checksum"):
+                        logger.warning("store snapshot %s: checksum mismatch", path)
+                        return None
+                    arrays: Dict[str, array] = {}
+                    for name, typecode, itemsize, off, size in head["arrays"]:
+                        col = array(typecode)
+                        if col.itemsize != itemsize:
+                            logger.info("store snapshot %s: %s itemsize %d, want %d",
+                                        path, typecode, itemsize, col.itemsize)
+                            return None
+                        col.frombytes(payload[off:off + size])
+                        arrays[name] = col
+                    texts = {name: str(payload[off:off + size], "utf-8") for name, off, size in head["texts"]}
+                finally:
+                    payload.release()
+            return arrays, texts, head.get("meta") or {}
+    except Exception:
+        logger.exception("load store snapshot failed: %s", path)
+        return None
+
+
+__all__ = [
+    "SNAPSHOT_FORMAT", "DEFAULT_FILENAME", "save_snapshot", "read_header", "load_snapshot",
+]
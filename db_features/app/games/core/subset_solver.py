@@ -0,0 +1,217 @@
+# app/games/core/subset_solver.py
+from __future__ import annotations
+from fractions import Fraction
+from typing import FrozenSet, Iterable, Iterator, List, Optional, Tuple
+import sys
+
+from .bounded_cache import BoundedCache
+from .step_budget import tick
+
+# ============================================================
+# Subset-DP reachable-value solver (5- and 6-card hands)
+# ============================================================
+# The pairwise recursive search in game_core re-walks every merge order and
+# rebuilds tuples at each level, which explodes past 4 cards. Here every
+# sub-multiset is solved once: its set of reachable exact values is memoised
+# on the sorted tuple (so duplicate cards share work), the top level is a
+# meet-in-the-middle lookup, and an expression is rebuilt only when asked.
+
+Key = Tuple[Fraction, ...]
+
+# Reachable sets of 5-6 large cards run to hundreds of thousands of Fractions,
+# so the memo is bounded by bytes as well as entries (like the solver memo in
+# game_core) and shows up in cache_stats() as "subset_reachable".
+REACHABLE_CACHE_SIZE = 8192
+REACHABLE_CACHE_BYTES = 32 * 1024 * 1024
+
+# operator precedence for minimal-parentheses rendering
+ATOM, MUL, ADD = 3, 2, 1
+
+
+def _wrap(expr: str, prec: int, need: int) -> str:
+    return f"({expr})" if prec < need else expr
+
+
+def render_binop(a: Tuple[str, int], b: Tuple[str, int], sym: str) -> Tuple[str, int]:
+    """Combine two rendered operands (expr, precedence) with minimal parentheses."""
+    ea, pa = a
+    eb, pb = b
+    if sym == "+":
+        return f"{ea} + {eb}", ADD
+    if sym == "-":
+        return f"{ea} - {_wrap(eb, pb, MUL)}", ADD
+    if sym == "*":
+        return f"{_wrap(ea, pa, MUL)} * {_wrap(eb, pb, MUL)}", MUL
+    return f"{_wrap(ea, pa, MUL)} / {_wrap(eb, pb, ATOM)}", MUL
+
+
+def _key(values: Iterable) -> Key:
+    return tuple(sorted(Fraction(v) for v in values))
+
+
+def _splits(key: Key) -> Iterator[Tuple[Key, Key]]:
+    """Each unordered split of a multiset into two non-empty parts, once."""
+    n = len(key)
+    seen = set()
+    # key[0] always stays left; a set bit moves key[i] to the right part
+    for mask in range(1, 1 << (n - 1)):
+        left = [key[0]]
+        right = []
+        for i in range(1, n):
+            (right if (mask >> (i - 1)) & 1 else left).append(key[i])
+        pair = (tuple(left), tuple(right))
+        if pair in seen:
+            continue
+        # duplicates of key[0] can produce the mirrored split as well
+        seen.add(pair)
+        seen.add((pair[1], pair[0]))
+        yield pair
+
+
+def _reachable_size(obj) -> int:
+    """Bytes held by a memo key or value: the container plus each Fraction and its two ints."""
+    return sys.getsizeof(obj) + sum(
+        sys.getsizeof(f) + sys.getsizeof(f.numerator) + sys.getsizeof(f.denominator) for f in obj
+    )
+
+
+REACHABLE_CACHE = BoundedCache("subset_reachable", REACHABLE_CACHE_SIZE, REACHABLE_CACHE_BYTES,
+                               sizeof=_reachable_size)
+
+
+def configure_reachable_cache(max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+    """Apply GAME24_REACHABLE_CACHE_SIZE / GAME24_REACHABLE_CACHE_BYTES (called from create_app)."""
+    REACHABLE_CACHE.resize(max_entries=max_entries, max_bytes=max_bytes)
+
+
+def _reachable(key: Key) -> FrozenSet[Fraction]:
+    if len(key) == 1:
+        return frozenset(key)
+    hit = REACHABLE_CACHE.get(key)
+    if hit is not None:
+        return hit
+    out = set()
+    for left, right in _splits(key):
+        la, rb = _reachable(left), _reachable(right)
+        tick(len(la) * len(rb))
+        for a in la:
+            for b in rb:
+                out.add(a + b)
+                out.add(a * b)
+                out.add(a - b)
+                out.add(b - a)
+                if b != 0:
+                    out.add(a / b)
+                if a != 0:
+                    out.add(b / a)
+    result = frozenset(out)
+    REACHABLE_CACHE.put(key, result)
+    return result
+
+
+def _partners(a: Fraction, target: Fraction) -> Iterator[Tuple[str, Optional[Fraction], bool]]:
+    """
+    (sym, b, swapped) such that `a sym b` (or `b sym a` if swapped) == target.
+    b is None when any right-hand value works (0 * b == 0).
+    """
+    yield "+", target - a, False
+    yield "-", a - target, False
+    yield "-", a + target, True
+    if a != 0:
+        yield "*", target / a, False
+        if target != 0:
+            yield "/", a / target, False
+        yield "/", target * a, True
+    elif target == 0:
+        yield "*", None, False
+
+
+def _matches(key: Key, target: Fraction) -> Iterator[Tuple[Key, Fraction, Key, Fraction, str, bool]]:
+    """Every (left, a, right, b, sym, swapped) producing target at the top of `key`."""
+    # balanced splits first: their sub-results are far smaller than an (n-1)-card set
+    for left, right in sorted(_splits(key), key=lambda p: max(len(p[0]), len(p[1]))):
+        la, rb = _reachable(left), _reachable(right)
+        tick(len(la))
+        for a in la:
+            for sym, b, swapped in _partners(a, target):
+                if b is None:
+                    b = min(rb)
+                elif b not in rb:
+                    continue
+                yield left, a, right, b, sym, swapped
+
+
+def _build(key: Key, value: Fraction) -> Optional[Tuple[str, int]]:
+    if len(key) == 1:
+        return (_fmt(key[0]), ATOM) if key[0] == value else None
+    for left, a, right, b, sym, swapped in _matches(key, value):
+        ea = _build(left, a)
+        eb = _build(right, b)
+        if ea is None or eb is None:
+            continue
+        if sym in ("+", "*") and a > b:
+            ea, eb = eb, ea
+        return render_binop(eb, ea, sym) if swapped else render_binop(ea, eb, sym)
+    return None
+
+
+def _fmt(v: Fraction) -> str:
+    return str(v.numerator) if v.denominator == 1 else f"({v.numerator}/{v.denominator})"
+
+
+# -------- public API --------
+def reachable_values(values: Iterable) -> FrozenSet[Fraction]:
+    """Every exact value reachable using ALL of `values` once with + - * /."""
+    return _reachable(_key(values))
+
+
+def can_reach(values: Iterable, target) -> bool:
+    key = _key(values)
+    t = Fraction(target)
+    if len(key) == 1:
+        return key[0] == t
+    return next(_matches(key, t), None) is not None
+
+
+def solve_subset(values: Iterable, target) -> Optional[str]:
+    """Return one infix solution string or None (any number of cards)."""
+    key = _key(values)
+    out = _build(key, Fraction(target))
+    return out[0] if out else None
+
+
+def enumerate_subset_solutions(values: Iterable, target, limit: int = 50) -> List[str]:
+    """
+    Up to `limit` solutions that differ in their top-level split/operation.
+    Sub-expressions are rebuilt once each, so this stays cheap for 6 cards.
+    """
+    key = _key(values)
+    t = Fraction(target)
+    if len(key) == 1:
+        return [_fmt(key[0])] if key[0] == t else []
+    sols: List[str] = []
+    seen = set()
+    for left, a, right, b, sym, swapped in _matches(key, t):
+        ea = _build(left, a)
+        eb = _build(right, b)
+        if ea is None or eb is None:
+            continue
+        if sym in ("+", "*") and a > b:
+            ea, eb = eb, ea
+        expr = (render_binop(eb, ea, sym) if swapped else render_binop(ea, eb, sym))[0]
+        if expr not in seen:
+            seen.add(expr)
+            sols.append(expr)
+            if len(sols) >= limit:
+                break
+    return sols
+
+
+def clear_cache() -> None:
+    REACHABLE_CACHE.clear()
+
+
+__all__ = [
+    "reachable_values", "can_reach", "solve_subset", "enumerate_subset_solutions",
+    "render_binop", "clear_cache", "configure_reachable_cache", "REACHABLE_CACHE",
+]
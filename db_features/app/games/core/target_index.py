@@ -0,0 +1,61 @@
+# app/games/core/target_index.py
+from __future__ import annotations
+from typing import Iterable, List
+
+from .bounded_cache import BoundedCache
+from .game_core import hand_key
+from .subset_solver import reachable_values
+
+# ============================================================
+# Per-hand reachable integer targets as a bitset
+# ============================================================
+# One subset-DP pass (subset_solver.reachable_values) yields every exact value
+# a hand can make; the integers among them are packed into a Python int
+# bitset (bit i <=> INDEX_MIN + i) and cached per hand, so "which targets can
+# this hand make?" over any range inside the index is a shift and a mask.
+# The bitset covers the fixed window INDEX_MIN..INDEX_MAX, not the hand's
+# whole span: 5-6 large cards reach values in the billions, and a bitset
+# that wide costs megabytes per hand. Windows outside the index are built
+# for the request alone and not cached.
+
+INDEX_MIN, INDEX_MAX = -10_000, 10_000
+TARGET_INDEX_SIZE = 20_000
+TARGET_INDEX_BYTES = 16 * 1024 * 1024   # a full index entry is ~2.5 KiB
+TARGET_INDEX = BoundedCache("target_index", TARGET_INDEX_SIZE, TARGET_INDEX_BYTES)
+
+
+def _bits(values: List[int], t_min: int, t_max: int) -> int:
+    """Bitset over [t_min, t_max] of the integers the hand can make, built in one pass."""
+    buf = bytearray((t_max - t_min + 8) // 8)
+    for v in reachable_values(values):
+        if v.denominator == 1 and t_min <= v <= t_max:
+            i = int(v) - t_min
+            buf[i >> 3] |= 1 << (i & 7)
+    return int.from_bytes(buf, "little")
+
+
+def reachable_target_bits(values: Iterable[int], t_min: int, t_max: int) -> int:
+    """Bitset over [t_min, t_max] (bit 0 = t_min) of integer targets the hand can make."""
+    vals = sorted(int(v) for v in values)
+    if not (INDEX_MIN <= t_min and t_max <= INDEX_MAX):
+        return _bits(vals, t_min, t_max)
+    key = hand_key(vals)
+    bits = TARGET_INDEX.get(key)
+    if bits is None:
+        bits = _bits(vals, INDEX_MIN, INDEX_MAX)
+        TARGET_INDEX.put(key, bits)
+    return window(INDEX_MIN, bits, t_min, t_max)
+
+
+def window(offset: int, bits: int, t_min: int, t_max: int) -> int:
+    """Re-base a bitset onto [t_min, t_max] (bit 0 = t_min)."""
+    shift = t_min - offset
+    bits = bits >> shift if shift >= 0 else bits << -shift
+    return bits & ((1 << (t_max - t_min + 1)) - 1)
+
+
+def targets_from_bits(bits: int, t_min: int) -> List[int]:
+    return [t_min + i for i, c in enumerate(reversed(format(bits, "b"))) if c == "1"] if bits else []
+
+
+__all__ = ["reachable_target_bits", "window", "targets_from_bits", "TARGET_INDEX", "INDEX_MIN", "INDEX_MAX"]
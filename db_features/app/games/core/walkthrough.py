@@ -0,0 +1,84 @@
+# app/games/core/walkthrough.py
+from __future__ import annotations
+from fractions import Fraction
+from typing import Any, List, Optional, Sequence, Tuple
+import sys
+
+from .bounded_cache import BoundedCache
+from .evaluator import ExprSyntaxError, compile_expression
+from .rational import to_fraction
+
+# ============================================================
+# Step-by-step walkthroughs ("11 + 1 = 12", "1 + 1 = 2", "12 * 2 = 24")
+# ============================================================
+# One trace line per binary operation, in evaluation order (innermost first,
+# left to right). The Game24 store traces every stored solution at build time;
+# lines are interned because the same small steps ("1 + 1 = 2") recur across
+# thousands of hands. Solver-generated solutions go through a bounded cache.
+# format_step is the shared line format (count_by_2s help uses it too).
+# Steps come from the shared evaluator's traced closure run (evaluator.py).
+
+WALKTHROUGH_CACHE_SIZE = 20_000
+WALKTHROUGH_CACHE = BoundedCache("walkthroughs", WALKTHROUGH_CACHE_SIZE)
+
+# (left, op, right, result), all as display strings
+Step = Tuple[str, str, str, str]
+Walkthrough = Tuple[str, ...]
+
+
+def format_value(v: Fraction) -> str:
+    return str(v.numerator) if v.denominator == 1 else f"{v.numerator}/{v.denominator}"
+
+
+def _operand(v: Fraction) -> str:
+    """Fractions and negatives are bracketed inside a step ("8 / (1/3)")."""
+    text = format_value(v)
+    return f"({text})" if v.denominator != 1 or v < 0 else text
+
+
+def format_step(left: Any, op: str, right: Any, result: Any) -> str:
+    return f"{left} {op} {right} = {result}"
+
+
+def expression_steps(expr: str) -> Optional[List[Step]]:
+    """
+    Binary operations of `expr` in evaluation order, or None if it can't be
+    parsed or evaluated exactly (irrational powers have no exact steps).
+    """
+    try:
+        trace = compile_expression(expr).steps()
+    except ExprSyntaxError:
+        return None
+    if trace is None or any(not isinstance(x, tuple) for step in trace for x in (step[0], step[3])):
+        return None
+    steps: List[Step] = []
+    for a, op, b, v in trace:
+        a, b, v = to_fraction(a), to_fraction(b), to_fraction(v)
+        steps.append((_operand(a), "^" if op == "**" else op, _operand(b), format_value(v)))
+    return steps
+
+
+def trace(expr: str) -> Walkthrough:
+    """Walkthrough lines for one solution; () if it can't be traced."""
+    steps = expression_steps(expr)
+    return tuple(sys.intern(format_step(*s)) for s in steps) if steps else ()
+
+
+def trace_all(solutions: Sequence[str]) -> Tuple[Walkthrough, ...]:
+    return tuple(trace(s) for s in solutions)
+
+
+def cached_trace(expr: str) -> Walkthrough:
+    """trace() for solutions that aren't precomputed (solver output)."""
+    hit = WALKTHROUGH_CACHE.get(expr)
+    if hit is not None:
+        return hit
+    out = trace(expr)
+    WALKTHROUGH_CACHE.put(expr, out)
+    return out
+
+
+__all__ = [
+    "Step", "Walkthrough", "format_value", "format_step", "expression_steps",
+    "trace", "trace_all", "cached_trace", "WALKTHROUGH_CACHE",
+]
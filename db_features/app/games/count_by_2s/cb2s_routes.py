@@ -11,6 +11,7 @@ from app.models import Game, Session as GameSession
 
 # use the correct module name here:
 from ..core.puzzle_store_cb2s import init_store, pool_report as store_pool_report, random_next, expected_final
+from ..core.walkthrough import format_step
 
 bp = Blueprint(
     "count_by_2s",
@@ -240,9 +241,9 @@ def api_help():
         final = expected_final(values)
         a, b, c, d = values
         solutions = [
-            f"{_code(a)} + {b} = {a+b}",
-            f"{a+b} + {c} = {a+b+c}",
-            f"{a+b+c} + {d} = {final}",
+            format_step(_code(a), "+", b, a + b),
+            format_step(a + b, "+", c, a + b + c),
+            format_step(a + b + c, "+", d, final),
             f"Final: {final}",
         ]
         has_solution = True
@@ -2,12 +2,12 @@
 # Target-aware version (24 / 10 / 36). Keeps existing features (summary, CSV, exit).
 from __future__ import annotations
 
-import ast
 import csv
 import io
 import json
 import logging
 import math
+import random
 import time
 import uuid
 from typing import Any, Dict, List, Optional, Tuple
@@ -21,6 +21,7 @@ from flask import (
     redirect,
     render_template,
     request,
+    stream_with_context,
     url_for,
 )
 from flask_login import current_user, login_required
@@ -39,8 +40,7 @@ from app.games.core.game_core import (
     stats_payload,
     # values / expr / assets
     card_images,
-    normalize_rank_expr,
-    values_key,
+    hand_key,
     # timers / pools
     _mark_case_status,
     _pool,
@@ -52,6 +52,7 @@ from app.games.core.game_core import (
     bump_attempt,
     bump_deal_swap,
     bump_help,
+    bump_hint,
     bump_played_once,
     bump_revealed,
     bump_skipped,
@@ -69,7 +70,20 @@ from app.games.core.game_core import (
 
 # ---- Game24 puzzle store (book solutions for target=24) ----
 from app.games.core.puzzle_store_game24 import Game24Store
-from app.games.core.puzzle_store_game24 import get_store, warmup_store
+from app.games.core.puzzle_store_game24 import check_store_version, get_store, reload_store, warmup_store
+from app.games.core.bounded_cache import cache_stats
+from app.games.core.hints import MAX_HINT_LEVEL, hint_ladder
+from app.games.core.walkthrough import cached_trace
+from app.games.core.step_budget import BudgetExceeded, step_budget
+from app.games.core.target_index import targets_from_bits
+from app.games.core.op_sets import DEFAULT_OP_SET, normalize_op_set
+from app.games.core.solver_service import (
+    SolverBusy, SolverRejected, SolverTimeout, get_solver_service,
+)
+from app.games.core.answer_check import check_expression
+from app.games.core.batch_check import BatchGrader, iter_items, iter_ndjson
+from app.games.core.discoveries import record_discovery
+from app.games.core.feature_index import QueryError
 
 logger = logging.getLogger(__name__)
 bp = Blueprint(
@@ -120,6 +134,13 @@ def _get_target(state: Dict[str, Any], data: Optional[dict] = None) -> int:
             pass
     return int(state.get("target", 24))
 
+def _get_op_set(state: Dict[str, Any], data: Optional[dict] = None) -> str:
+    """Resolve the operator set ("basic", "pow", "concat") from JSON body, query args or state."""
+    raw = (data or {}).get("ops") or request.args.get("ops")
+    if raw:
+        state["op_set"] = normalize_op_set(raw)
+    return normalize_op_set(state.get("op_set"))
+
 def _begin_hand(state: Dict[str, Any], case_id: int, level: Optional[str]) -> None:
     """
     Finalize any existing hand (unsolved_exit if no outcome), then start a new one.
@@ -137,6 +158,7 @@ def _begin_hand(state: Dict[str, Any], case_id: int, level: Optional[str]) -> No
         "attempts": 0,
         "incorrect_attempts": 0,
         "helped": False,
+        "hint_level": 0,        # highest /api/hint rung shown (3 = full solution)
         "skipped": False,
         "solved": False,
         "started_at_ms": now_ms(),
@@ -169,115 +191,44 @@ def _clear_pool(state):
     state["competition_ends_at"] = None
 
 
-# -----------------------------------------------------------------------------
-# Safe arithmetic evaluation for /api/check
-# -----------------------------------------------------------------------------
-_ALLOWED_NODES = {
-    ast.Expression,
-    ast.BinOp,
-    ast.UnaryOp,
-    ast.Add,
-    ast.Sub,
-    ast.Mult,
-    ast.Div,
-    ast.Pow,
-    ast.USub,
-    ast.UAdd,
-    ast.Load,
-    ast.Constant,
-    ast.Tuple,
-    ast.List,
-}
-
-def _safe_eval_number(expr: str) -> float:
-    node = ast.parse(expr, mode="eval")
-
-    def _rec(n):
-        if type(n) not in _ALLOWED_NODES:
-            raise ValueError(f"disallowed: {type(n).__name__}")
-        if isinstance(n, ast.Expression):
-            return _rec(n.body)
-        if isinstance(n, ast.Constant):
-            if isinstance(n.value, (int, float)):
-                return float(n.value)
-            raise ValueError("constant must be number")
-        if isinstance(n, ast.UnaryOp):
-            v = _rec(n.operand)
-            if isinstance(n.op, ast.UAdd):
-                return v
-            if isinstance(n.op, ast.USub):
-                return -v
-            raise ValueError("bad unary op")
-        if isinstance(n, ast.BinOp):
-            a = _rec(n.left)
-            b = _rec(n.right)
-            if isinstance(n.op, ast.Add):
-                return a + b
-            if isinstance(n.op, ast.Sub):
-                return a - b
-            if isinstance(n.op, ast.Mult):
-                return a * b
-            if isinstance(n.op, ast.Div):
-                if abs(b) < 1e-12:
-                    raise ZeroDivisionError("division by zero")
-                return a / b
-            if isinstance(n.op, ast.Pow):
-                if abs(a) > 1e6 or abs(b) > 12:
-                    raise ValueError("pow too large")
-                return a ** b
-            raise ValueError("bad binop")
-        raise ValueError("bad node")
-
-    return _rec(node)
-
-def _normalize_expr(expr: str) -> str:
-    s = (expr or "")
-    s = s.replace("^", "**").replace("×", "*").replace("∗", "*").replace("·", "*")
-    s = s.replace("÷", "/").replace("／", "/")
-    s = s.replace("−", "-").replace("—", "-").replace("–", "-")
-    s = normalize_rank_expr(s)
-    return s
-
-def _expr_uses_exact_values(expr: str, values: List[int]) -> bool:
-    try:
-        node = ast.parse(expr, mode="eval")
-    except Exception:
-        return False
-    lits: List[int] = []
-
-    class LitVisitor(ast.NodeVisitor):
-        def visit_Constant(self, n: ast.Constant):
-            if isinstance(n.value, (int, float)):
-                v = int(n.value)
-                lits.append(v)
-
-    LitVisitor().visit(node)
-    try:
-        return sorted(lits) == sorted([int(x) for x in values])
-    except Exception:
-        return False
-
 # -----------------------------------------------------------------------------
 # Book/stored solutions (24 only) & "no solution" checks
 # -----------------------------------------------------------------------------
 def _solutions_for_24(values: List[int]) -> Tuple[List[str], bool]:
+    """Book solutions by values; hands the store doesn't hold (e.g. 5-6 cards) go to the solver."""
     store = get_store()
-    try:
-        sols = store.solve(values)
-    except AttributeError:
-        try:
-            sols = store.get_solutions(values)
-        except AttributeError:
-            sols = []
-    sols = sols or []
+    puz = store.get_by_values(values)
+    if puz is not None:
+        sols = puz.get("solutions") or []
+    else:
+        sols = get_solver_service().enumerate_solutions(values, 24, limit=50)
     return sols, (len(sols) > 0)
 
-def _no_solution_correct(values: List[int], case_id: Optional[int], target: int) -> Tuple[bool, str]:
+def _distinct_solutions(values: List[int], target: int, book: List[str]) -> List[str]:
+    """
+    "Show all" list: one solution per equivalence class from the canonical search.
+    Book lists repeat trivially equivalent variants (e.g. 12 * (1 + 1) vs 12 / (1 / (1 + 1))).
     """
-    Return (is_correct, method), respecting the selected target.
+    return get_solver_service().enumerate_solutions(values, target, limit=50) or book
+
+def _walkthroughs(sols: List[str], puz: Optional[Dict[str, Any]] = None) -> List[List[str]]:
+    """Walkthroughs parallel to `sols`: precomputed for stored solutions, traced (cached) otherwise."""
+    known = dict(zip(puz.get("solutions") or [], puz.get("walkthroughs") or [])) if puz else {}
+    return [known[s] if s in known else list(cached_trace(s)) for s in sols]
+
+def _no_solution_correct(
+    values: List[int], case_id: Optional[int], target: int, op_set: str = DEFAULT_OP_SET,
+) -> Tuple[bool, str]:
+    """
+    Return (is_correct, method), respecting the selected target and operator set.
     - For target=24: use your book/store (fast and authoritative).
     - For other targets: try to find ONE solution via solver. If none → correct.
+    - Book and table only know + - * /; other operator sets always use the solver.
     """
+    values, target = get_solver_service().validate(values, target, op_set)
+    if op_set != DEFAULT_OP_SET:
+        expr = get_solver_service().solve_one(values, int(target), op_set)
+        return (expr is None, "solver")
     if int(target) == 24:
         # Prefer case_id lookup when possible for speed/accuracy
         store = get_store()
@@ -293,27 +244,44 @@ def _no_solution_correct(values: List[int], case_id: Optional[int], target: int)
         sols, has = _solutions_for_24(values)
         return (not has, "values")
     else:
-        expr = solve_one(values, int(target))
+        known = get_store().solvable_for(values, int(target))
+        if known is not None:
+            return (not known, "table")
+        expr = get_solver_service().solve_one(values, int(target))
         return (expr is None, "solver")
 
 def _pick_random_for_target(store, level, state, target: int, max_tries: int = 60):
     """
     Randomly pick a puzzle; if target != 24 and solvable-only is on,
     loop until we find a solvable one (or give up after max_tries).
+    Returns (puzzle, pool_done). Deals come from the session's samplers
+    (one per pool and target), so a puzzle repeats only after its pool
+    has been dealt through.
     """
-    # recent_keys logic stays the same
+    # recent_keys still steer the first deals of a new pass away from the last ones
     recent = state.get("recent_keys") or []
+    samplers = state.setdefault("samplers", {})
+    scope = str(int(target))
+
+    # Precomputed table: draw straight from the solvable subset (one pick, no solver calls)
+    if int(target) != 24:
+        solvable = store.solvable_case_ids(int(target))
+        if solvable is not None:
+            puz, pool_done = store.random_pick(level, recent, eligible=solvable.__contains__,
+                                               samplers=samplers, scope=scope)
+            if puz:
+                return puz, pool_done
+
     tried = 0
-    chosen = None
+    chosen, pool_done = None, False
     while tried < max_tries:
-        puz, _pool_done = store.random_pick(level, recent)
+        puz, pool_done = store.random_pick(level, recent, samplers=samplers, scope=scope)
         chosen = puz
         if not puz:
             break
         # keep recent list tidy
         try:
-            from app.games.core.game_core import values_key
-            k = values_key(puz["cards"])
+            k = hand_key(puz["cards"])
             rk = state.setdefault("recent_keys", [])
             if k not in rk:
                 rk.append(k)
@@ -323,17 +291,17 @@ def _pick_random_for_target(store, level, state, target: int, max_tries: int = 6
             pass
 
         if int(target) == 24:
-            return puz  # any is fine
+            return puz, pool_done  # any is fine
         # non-24 → require solvable
         try:
             from app.games.core.game_core import solve_one
             if solve_one(puz["cards"], int(target)):
-                return puz
+                return puz, pool_done
         except Exception:
             # if solver fails, fall back to showing anyway
-            return puz
+            return puz, pool_done
         tried += 1
-    return chosen  # last seen, even if unsolvable (we tried!)
+    return chosen, pool_done  # last seen, even if unsolvable (we tried!)
 
 
 # -----------------------------------------------------------------------------
@@ -453,10 +421,10 @@ def api_next():
     sid = _sid()
     logger.info("API_NEXT Session ID: %s", sid)
     store = get_store()
-    if not store.by_id:
+    if not len(store):
         logger.warning("Store not loaded, forcing load...")
-        store.load(force=True)
-        logger.info("Store loaded with %d puzzles", len(store.by_id))
+        store = reload_store(full=True)
+        logger.info("Store loaded with %d puzzles", len(store))
 
     logger.info("=== api_next CALLED ===")
     logger.info("Request args: %s", dict(request.args))
@@ -467,6 +435,7 @@ def api_next():
 
     # Read and store the selected target (default 24)
     target = _get_target(state)  # from args/state
+    op_set = _get_op_set(state)
     logger.info("Using target: %d", target)
     theme = (request.args.get("theme") or "classic").strip().lower()
     level = (request.args.get("level") or "easy").strip().lower()
@@ -517,6 +486,7 @@ def api_next():
             "help_disabled": bool(state.get("help_disabled")),
             "pool_done": bool(pool_done),
             "target": int(state.get("target", 24)),
+            "ops": op_set,
             "stats": stats_payload(state),
             "meta": {"reveal": "all"},
         }
@@ -621,8 +591,7 @@ def api_next():
     puz = None
     pool_done = False
     try:
-        puz = _pick_random_for_target(store, level, state, target)
-        pool_done = False
+        puz, pool_done = _pick_random_for_target(store, level, state, target)
         if puz:
             logger.info("random_pick result: %s", puz["case_id"])
         else:
@@ -633,7 +602,7 @@ def api_next():
 
     if puz:
         try:
-            k = values_key(puz["cards"])
+            k = hand_key(puz["cards"])
             rk = state.setdefault("recent_keys", [])
             if k not in rk:
                 rk.append(k)
@@ -667,6 +636,7 @@ def api_check():
     answer = (data.get("answer") or "").strip()
     case_id = data.get("case_id")
     target = _get_target(state, data)
+    op_set = _get_op_set(state, data)
 
     logger.info("Check case_id=%s, target=%s, values=%s, answer=%s", case_id, target, values, answer)
 
@@ -678,7 +648,7 @@ def api_check():
 
     # "No solution" fast-path
     if answer.lower() in {"no solution", "nosolution", "no-solution", "n", "0", "-1"}:
-        correct, method_used = _no_solution_correct(values, case_id, target)
+        correct, method_used = _no_solution_correct(values, case_id, target, op_set)
         logger.info("No-solution claim: correct=%s via %s", correct, method_used)
         bump_attempt(state, correct=correct)
         if correct:
@@ -700,36 +670,16 @@ def api_check():
                 {"ok": False, "reason": f"This hand has a solution for target {target}.", "stats": stats_payload(state)}
             ), 200
 
-    # Normal expression path
-    norm = _normalize_expr(answer)
-    if not _expr_uses_exact_values(norm, values):
-        bump_attempt(state, correct=False)
-        cur = _current_hand(state)
-        if cur:
-            cur["attempts"] += 1
-            cur["incorrect_attempts"] += 1
-        return jsonify({"ok": False, "reason": "Expression must use each card exactly once."}), 200
-
-    try:
-        val = _safe_eval_number(norm)
-    except Exception:
-        bump_attempt(state, correct=False)
-        cur = _current_hand(state)
-        if cur:
-            cur["attempts"] += 1
-            cur["incorrect_attempts"] += 1
-        return jsonify({"ok": False, "reason": "Unsafe or invalid expression"}), 200
-
-    # compare to chosen target
-    correct = abs(val - float(target)) < 1e-6
-    bump_attempt(state, correct=correct)
+    # Normal expression path: cached verdict per (answer, hand, target, operator set)
+    result = check_expression(answer, values, int(target), op_set)
+    bump_attempt(state, correct=result.correct)
     cur = _current_hand(state)
 
-    if not correct:
+    if not result.correct:
         if cur:
             cur["attempts"] += 1
             cur["incorrect_attempts"] += 1
-        return jsonify({"ok": False, "reason": f"Your result = {val:g}, target = {target}"}), 200
+        return jsonify({"ok": False, "reason": result.reason}), 200
 
     # success
     bump_solved(state, state.get("current_effective_level"))
@@ -740,7 +690,68 @@ def api_check():
         cur["ended_at_ms"] = now_ms()
         _finalize_hand(state, outcome=cur["final_outcome"])
     _set_case_solved(state, state.get("current_case_id") or -1)
-    return jsonify({"ok": True, "kind": "exact", "stats": stats_payload(state), "target": target}), 200
+    known = _classify_solution(case_id, values, int(target), op_set, answer, result)
+    return jsonify({"ok": True, "kind": "exact", "known": known,
+                    "stats": stats_payload(state), "target": target}), 200
+
+
+def _classify_solution(case_id, values, target: int, op_set: str, answer: str, result) -> Optional[bool]:
+    """
+    True if a correct answer is one of the stored solutions of case_id (set
+    lookup on canonical forms), False if it's new (recorded for enrichment),
+    None when there's no stored set to compare with (other targets / op sets).
+    """
+    if not case_id or result.canonical is None or target != 24 or op_set != DEFAULT_OP_SET:
+        return None
+    try:
+        known = get_store().is_known_solution(int(case_id), values, result.canonical)
+    except (TypeError, ValueError):
+        return None
+    if known is False:
+        user_id = current_user.id if current_user.is_authenticated else None
+        record_discovery(int(case_id), values, target, answer, result.canonical, user_id=user_id)
+    return known
+
+# -----------------------------------------------------------------------------
+# API: Batch check (worksheet grading; stateless, NDJSON in and out)
+# -----------------------------------------------------------------------------
+@bp.post("/api/check/batch")
+def api_check_batch():
+    """
+    Grade many answers without a session: one verdict line per item, then a
+    {"done": true, ...} line. Body is NDJSON ({"values"|"case_id", "answer",
+    "target"?, "ops"?, "id"?} per line, streamed), or for small batches JSON
+    {"items": [...], "target"?, "ops"?}. Defaults come from ?target= / ?ops=.
+    """
+    store = get_store()
+    if request.is_json:
+        data = request.get_json(silent=True) or {}
+        items = data.get("items")
+        if not isinstance(items, list):
+            return jsonify({"ok": False, "reason": "Expected {\"items\": [...]} or an NDJSON body"}), 400
+        source = iter_items(items)
+    else:
+        data = {}
+        source = iter_ndjson(request.stream)
+    try:
+        target = int(data.get("target", request.args.get("target", 24)))
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "reason": "target must be an integer"}), 400
+    grader = BatchGrader(
+        cards_for=store.cards_for,
+        no_solution=lambda values, case_id, t, op_set: _no_solution_correct(values, case_id, t, op_set)[0],
+        is_known=store.is_known_solution,
+        target=target,
+        op_set=data.get("ops") or request.args.get("ops") or DEFAULT_OP_SET,
+    )
+    max_items = int(current_app.config.get("GAME24_BATCH_MAX_ITEMS", 20_000))
+
+    def lines():
+        for verdict in grader.run(source, max_items):
+            yield json.dumps(verdict) + "\n"
+        yield json.dumps(grader.summary()) + "\n"
+
+    return current_app.response_class(stream_with_context(lines()), mimetype="application/x-ndjson")
 
 # -----------------------------------------------------------------------------
 # API: Help  (use store for 24; solver for other targets)
@@ -760,9 +771,12 @@ def api_help():
     all_solutions = bool(data.get("all"))
     case_id = data.get("case_id")
     target = _get_target(state, data)
+    op_set = _get_op_set(state, data)
 
     if not values:
         return jsonify({"ok": False, "reason": "Missing values"}), 400
+    solver = get_solver_service()
+    values, target = solver.validate(values, target, op_set)
 
     ensure_played_once(state)
     bump_help(state, all=all_solutions)
@@ -772,8 +786,8 @@ def api_help():
     if cur:
         cur["helped"] = True
 
-    # Target-aware solution source
-    if int(target) == 24:
+    # Target-aware solution source (book and table cover the basic operator set only)
+    if int(target) == 24 and op_set == DEFAULT_OP_SET:
         store = get_store()
         puz = None
         if case_id:
@@ -788,9 +802,11 @@ def api_help():
                 return jsonify(
                     {"ok": True, "has_solution": False, "solutions": [], "stats": stats_payload(state)}
                 ), 200
-            out = sols24 if all_solutions else sols24[:1]
+            out = _distinct_solutions(values, 24, sols24) if all_solutions else sols24[:1]
             return jsonify(
-                {"ok": True, "has_solution": True, "solutions": out, "stats": stats_payload(state), "target": target}
+                {"ok": True, "has_solution": True, "solutions": out,
+                 "walkthroughs": _walkthroughs(out, store.get_by_values(values)),
+                 "stats": stats_payload(state), "target": target}
             ), 200
         else:
             sols = puz.get("solutions", []) or []
@@ -798,14 +814,35 @@ def api_help():
                 return jsonify(
                     {"ok": True, "has_solution": False, "solutions": [], "stats": stats_payload(state)}
                 ), 200
-            out = sols if all_solutions else sols[:1]
+            out = _distinct_solutions(values, 24, sols) if all_solutions else sols[:1]
             return jsonify(
-                {"ok": True, "has_solution": True, "solutions": out, "stats": stats_payload(state), "target": target}
+                {"ok": True, "has_solution": True, "solutions": out, "walkthroughs": _walkthroughs(out, puz),
+                 "stats": stats_payload(state), "target": target}
             ), 200
 
-    # Non-24 target: compute on demand
+    # Non-24 target: precomputed table first, compute on demand otherwise
+    store = get_store()
+    known = store.solvable_for(values, int(target)) if op_set == DEFAULT_OP_SET else None
+    if known is False:
+        return jsonify(
+            {
+                "ok": True,
+                "has_solution": False,
+                "solutions": [],
+                "message": f"No solution for target {target} with these cards.",
+                "stats": stats_payload(state),
+                "target": target,
+            }
+        ), 200
+    if known and not all_solutions:
+        expr = store.solution_for(values, int(target))
+        return jsonify(
+            {"ok": True, "has_solution": True, "solutions": [expr], "walkthroughs": _walkthroughs([expr]),
+             "stats": stats_payload(state), "target": target}
+        ), 200
+
     if all_solutions:
-        sols = enumerate_solutions(values, int(target), limit=50)
+        sols = solver.enumerate_solutions(values, int(target), limit=50, op_set=op_set)
         if not sols:
             return jsonify(
                 {
@@ -818,10 +855,11 @@ def api_help():
                 }
             ), 200
         return jsonify(
-            {"ok": True, "has_solution": True, "solutions": sols, "count": len(sols), "stats": stats_payload(state), "target": target}
+            {"ok": True, "has_solution": True, "solutions": sols, "walkthroughs": _walkthroughs(sols),
+             "count": len(sols), "stats": stats_payload(state), "target": target}
         ), 200
     else:
-        expr = solve_one(values, int(target))
+        expr = solver.solve_one(values, int(target), op_set)
         if not expr:
             return jsonify(
                 {
@@ -834,9 +872,144 @@ def api_help():
                 }
             ), 200
         return jsonify(
-            {"ok": True, "has_solution": True, "solutions": [expr], "stats": stats_payload(state), "target": target}
+            {"ok": True, "has_solution": True, "solutions": [expr], "walkthroughs": _walkthroughs([expr]),
+             "stats": stats_payload(state), "target": target}
+        ), 200
+
+# -----------------------------------------------------------------------------
+# API: Hint  (one rung per call: pair -> first step -> full solution)
+# -----------------------------------------------------------------------------
+def _first_solution(values: List[int], target: int, op_set: str, case_id: Any = None) -> Optional[str]:
+    """One solution from the cheapest source: book (24), solution table, then solver."""
+    if op_set == DEFAULT_OP_SET:
+        store = get_store()
+        if int(target) == 24:
+            puz = None
+            if case_id:
+                try:
+                    puz = store.get_by_id(int(case_id))
+                except (TypeError, ValueError):
+                    puz = None
+            if puz and hand_key(puz["cards"]) == hand_key(values):
+                sols = puz.get("solutions") or []
+            else:
+                sols, _has = _solutions_for_24(values)
+            return sols[0] if sols else None
+        known = store.solvable_for(values, int(target))
+        if known is False:
+            return None
+        if known:
+            return store.solution_for(values, int(target))
+    return get_solver_service().solve_one(values, int(target), op_set)
+
+@bp.post("/api/hint")
+def api_hint():
+    state = _state()
+    _debug_sid("api_hint")
+    if state.get("help_disabled"):
+        return jsonify(
+            {"ok": False, "error": "help_disabled", "reason": "Help is disabled in competition mode."}
+        ), 403
+
+    data = request.get_json(force=True) or {}
+    values = data.get("values")
+    target = _get_target(state, data)
+    op_set = _get_op_set(state, data)
+    if not values:
+        return jsonify({"ok": False, "reason": "Missing values"}), 400
+    values, target = get_solver_service().validate(values, target, op_set)
+
+    ladder = hint_ladder(
+        values, target, op_set,
+        lambda: _first_solution(values, target, op_set, data.get("case_id")),
+    )
+    if ladder is None:
+        return jsonify(
+            {
+                "ok": True,
+                "has_solution": False,
+                "hint": None,
+                "message": f"No solution for target {target} with these cards.",
+                "stats": stats_payload(state),
+                "target": target,
+            }
         ), 200
 
+    cur = _current_hand(state)
+    shown = int(cur.get("hint_level") or 0) if cur else 0
+    level = min(shown + 1, MAX_HINT_LEVEL)
+
+    ensure_played_once(state)
+    bump_hint(state, level)
+    if cur:
+        cur["hint_level"] = level
+    if level == MAX_HINT_LEVEL and shown < MAX_HINT_LEVEL:
+        # the last rung reveals the answer: same bookkeeping as /api/help
+        bump_revealed(state)
+        if cur:
+            cur["helped"] = True
+
+    return jsonify(
+        {
+            "ok": True,
+            "has_solution": True,
+            "hint": ladder[level - 1],
+            "hint_level": level,
+            "max_level": MAX_HINT_LEVEL,
+            "stats": stats_payload(state),
+            "target": target,
+        }
+    ), 200
+
+# -----------------------------------------------------------------------------
+# API: Reachable targets ("which targets can this hand make?")
+# -----------------------------------------------------------------------------
+TARGETS_MAX_SPAN = 10_000
+
+@bp.route("/api/targets", methods=["GET", "POST"])
+def api_targets():
+    """
+    Integer targets a hand can make with + - * / (every card used once).
+    GET ?values=1,2,3,4&min=-100&max=200  or  POST {"values": [...], "min": .., "max": ..}
+    """
+    data = (request.get_json(silent=True) or {}) if request.method == "POST" else {}
+    values = data.get("values")
+    if values is None:
+        raw = (request.args.get("values") or "").replace(" ", "")
+        values = [v for v in raw.split(",") if v] if raw else None
+    if not values:
+        return jsonify({"ok": False, "reason": "Missing values"}), 400
+    try:
+        t_min = int(data.get("min", request.args.get("min", 0)))
+        t_max = int(data.get("max", request.args.get("max", 100)))
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "reason": "min and max must be integers"}), 400
+    if t_min > t_max or t_max - t_min > TARGETS_MAX_SPAN:
+        return jsonify({"ok": False, "reason": f"need min <= max and a span of at most {TARGETS_MAX_SPAN}"}), 400
+
+    solver = get_solver_service()
+    values, _t = solver.validate(values, t_min)
+    solver.validate(values, t_max)
+    if len(values) > solver.inline_cards:
+        # 5-6 card subset DP: the process pool's admission limits and timeout apply
+        bits = solver.reachable_target_bits(values, t_min, t_max)
+    else:
+        try:
+            with step_budget(solver.step_budget, solver.timeout):
+                bits = get_store().reachable_target_bits(values, t_min, t_max)
+        except BudgetExceeded as e:
+            raise SolverTimeout(str(e))
+    targets = targets_from_bits(bits, t_min)
+    return jsonify({
+        "ok": True,
+        "values": values,
+        "min": t_min,
+        "max": t_max,
+        "count": len(targets),
+        "targets": targets,
+        "bits": format(bits, "x"),  # bit i <=> min + i
+    }), 200
+
 # -----------------------------------------------------------------------------
 # API: Skip
 # -----------------------------------------------------------------------------
@@ -891,12 +1064,14 @@ def _build_summary(state: Dict[str, Any]) -> Dict[str, Any]:
         tmp["ended_at_ms"] = tmp.get("ended_at_ms") or now_ms()
         per.append(tmp)
 
-    totals = {"solved": 0, "helped": 0, "incorrect": 0, "skipped": 0}
+    totals = {"solved": 0, "helped": 0, "hinted": 0, "incorrect": 0, "skipped": 0}
     buckets = {
         "solved_ids": [],
         "solved_no_help_ids": [],
         "solved_with_help_ids": [],
+        "solved_with_hint_ids": [],
         "helped_ids": [],
+        "hinted_ids": [],
         "incorrect_ids": [],
         "skipped_ids": [],
         "revealed_no_attempt_ids": [],
@@ -912,6 +1087,11 @@ def _build_summary(state: Dict[str, Any]) -> Dict[str, Any]:
         lvl = row.get("level") or "unknown"
         by = by_level.setdefault(lvl, {"played": 0, "solved": 0})
         by["played"] += 1
+        # partial hints (pair / first step) without the full reveal
+        hinted = 0 < int(row.get("hint_level") or 0) and not row.get("helped")
+        if hinted:
+            totals["hinted"] += 1
+            buckets["hinted_ids"].append(cid)
 
         if row.get("solved"):
             totals["solved"] += 1
@@ -919,6 +1099,8 @@ def _build_summary(state: Dict[str, Any]) -> Dict[str, Any]:
             buckets["solved_ids"].append(cid)
             if row.get("helped"):
                 buckets["solved_with_help_ids"].append(cid)
+            elif hinted:
+                buckets["solved_with_hint_ids"].append(cid)
             else:
                 buckets["solved_no_help_ids"].append(cid)
         else:
@@ -946,7 +1128,8 @@ def _build_summary(state: Dict[str, Any]) -> Dict[str, Any]:
         rows.sort(key=lambda r: int(r.get("started_at_ms") or 0))
         first = rows[0]
         solved_ever = any(bool(x.get("solved")) for x in rows)
-        if first.get("solved") and int(first.get("attempts") or 0) <= 1 and not first.get("helped"):
+        if (first.get("solved") and int(first.get("attempts") or 0) <= 1
+                and not first.get("helped") and not first.get("hint_level")):
             buckets["first_try_correct_ids"].append(cid)
         elif solved_ever:
             buckets["struggle_before_solve_ids"].append(cid)
@@ -961,13 +1144,16 @@ def _build_summary(state: Dict[str, Any]) -> Dict[str, Any]:
     lines.append("Totals")
     lines.append(f"  solved:   {totals['solved']}")
     lines.append(f"  helped:   {totals['helped']}")
+    lines.append(f"  hinted:   {totals['hinted']}")
     lines.append(f"  incorrect:{totals['incorrect']}")
     lines.append(f"  skipped:  {totals['skipped']}")
     lines.append("")
     lines.append("Case IDs")
     lines.append(fmt_ids("Solved (no help)", buckets["solved_no_help_ids"]).rstrip())
     lines.append(fmt_ids("Solved (with help)", buckets["solved_with_help_ids"]).rstrip())
+    lines.append(fmt_ids("Solved (with hints)", buckets["solved_with_hint_ids"]).rstrip())
     lines.append(fmt_ids("Helped (any)", buckets["helped_ids"]).rstrip())
+    lines.append(fmt_ids("Hinted (no reveal)", buckets["hinted_ids"]).rstrip())
     lines.append(fmt_ids("Incorrect (had wrong attempts)", buckets["incorrect_ids"]).rstrip())
     lines.append(fmt_ids("Skipped", buckets["skipped_ids"]).rstrip())
     lines.append(fmt_ids("Revealed no attempt", buckets["revealed_no_attempt_ids"]).rstrip())
@@ -994,7 +1180,8 @@ def _build_summary(state: Dict[str, Any]) -> Dict[str, Any]:
         sk  = "Y" if r.get("skipped") else "N"
         sv  = "Y" if r.get("solved") else "N"
         tgt = r.get("target") if r.get("target") is not None else ""
-        line = f"  #{cid:<4} attempts={att:<2} wrong={inc:<2} helped={h} skipped={sk} solved={sv}"
+        hl  = int(r.get("hint_level") or 0)
+        line = f"  #{cid:<4} attempts={att:<2} wrong={inc:<2} helped={h} hints={hl} skipped={sk} solved={sv}"
         if tgt != "": line += f" target={tgt}"
         act.append(line)
     report_html = "<pre>" + "\n".join(lines + act) + "</pre>"
@@ -1079,6 +1266,7 @@ def api_export_csv():
             "solved",
             "started_at_ms",
             "ended_at_ms",
+            "hint_level",
             # (optional) you can also add "target" here later if you want
         ]
     )
@@ -1095,6 +1283,7 @@ def api_export_csv():
                 int(bool(row.get("solved"))),
                 row.get("started_at_ms"),
                 row.get("ended_at_ms"),
+                int(row.get("hint_level") or 0),
             ]
         )
 
@@ -1179,6 +1368,46 @@ def api_pool():
         {"ok": True, "mode": mode, "count": len(case_ids), "time_left": tleft, "help_disabled": state["help_disabled"]}
     ), 200
 
+@bp.route("/api/pool/query", methods=["GET", "POST"])
+def api_pool_query():
+    """
+    Case ids matching feature constraints, ready to POST to /api/pool.
+    POST {"count": 20, "level": "medium", "solvable": [24], "needs_division": true,
+          "repeated_ranks": false, "stratify": "band", "seed": 7}  or the same as
+    query args (?count=20&level=medium&solvable=24,10&face_cards=false).
+    Constraints: level, band, n_solutions (n or {"min", "max"}), solvable /
+    unsolvable (targets), needs_division, needs_fraction, needs_exponent,
+    repeated_ranks, face_cards (see games/core/feature_index.py).
+    """
+    data = (request.get_json(silent=True) or {}) if request.method == "POST" else request.args.to_dict()
+    if not isinstance(data, dict):
+        return jsonify({"ok": False, "reason": "Expected a JSON object"}), 400
+    data = dict(data)
+    limit = int(current_app.config.get("GAME24_POOL_QUERY_MAX", 500))
+    try:
+        count = int(data.pop("count", limit))
+        seed = data.pop("seed", None)
+        rng = random.Random(int(seed)) if seed is not None else random
+    except (TypeError, ValueError):
+        return jsonify({"ok": False, "reason": "count and seed must be integers"}), 400
+    if not 1 <= count <= limit:
+        return jsonify({"ok": False, "reason": f"count must be between 1 and {limit}"}), 400
+    stratify = str(data.pop("stratify", "band")).strip().lower()
+
+    started = time.perf_counter()
+    try:
+        out = get_store().feature_index().query(data, count=count, stratify=stratify, rng=rng)
+    except QueryError as e:
+        return jsonify({"ok": False, "reason": str(e)}), 400
+    return jsonify({
+        "ok": True,
+        "count": len(out["case_ids"]),
+        "case_ids": out["case_ids"],
+        "matched": out["matched"],
+        "strata": out["strata"],
+        "took_us": round((time.perf_counter() - started) * 1e6),
+    }), 200
+
 @bp.get("/api/pool/debug")
 def api_pool_debug():
     state = _state()
@@ -1241,15 +1470,31 @@ def api_debug_store():
     return jsonify(
         {
             "loaded_from": store.loaded_from,
-            "total_puzzles": len(store.by_id),
+            "total_puzzles": len(store),
             "pools": store.pool_report(),
-            "has_data": bool(store.by_id),
+            "has_data": bool(len(store)),
         }
     )
 
+@bp.get("/api/debug/caches")
+def api_debug_caches():
+    return jsonify({"ok": True, "caches": cache_stats(), "solver": get_solver_service().stats()})
+
+# -----------------------------------------------------------------------------
+# Solver admission errors (see solver_service.py)
+# -----------------------------------------------------------------------------
+@bp.errorhandler(SolverRejected)
+def _solver_rejected(e):
+    return jsonify({"ok": False, "reason": str(e)}), 400
+
+@bp.errorhandler(SolverBusy)
+@bp.errorhandler(SolverTimeout)
+def _solver_unavailable(e):
+    logger.warning("solver unavailable: %s", e)
+    return jsonify({"ok": False, "reason": "The solver is busy or the hand is too hard right now.", "retry": True}), 503
+
 @bp.before_request
 def ensure_store_loaded():
-    store = get_store()
-    if not store.by_id:
-        store.load(force=True)
+    get_store()
+    check_store_version()
 
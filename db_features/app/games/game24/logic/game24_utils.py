@@ -1,4 +1,7 @@
 from .database_helpers import get_game_data, save_game_data
+from app.games.core.evaluator import evaluate
+from app.games.core.game_core import hand_key
+from app.games.core.rational import eq
 import uuid
 import json
 from pathlib import Path
@@ -10,7 +13,7 @@ POOLS_ADV = None
 default_state = None
 SESSIONS = {}      # sid -> state dict
 PUZZLES_BY_ID = {} # filled by app.py after loading JSON
-PUZZLES_BY_KEY = {}# values_key "1-4-8-8" -> puzzle
+PUZZLES_BY_KEY = {}# hand_key([1, 4, 8, 8]) -> puzzle
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
@@ -242,7 +245,7 @@ def init_shared_state():
 
     # Create lookups
     PUZZLES_BY_ID = {int(p['case_id']): p for p in ALL_PUZZLES}
-    PUZZLES_BY_KEY = {_values_key(p['cards']): p for p in ALL_PUZZLES}
+    PUZZLES_BY_KEY = {hand_key(p['cards']): p for p in ALL_PUZZLES}
     print(f"~~~I loaded PUZZLES_BY_ID {len(PUZZLES_BY_ID)} puzzles ")
     print(f"~~~I loaded PUZZLES_BY_KEY {len(PUZZLES_BY_KEY)} puzzles ")
 
@@ -253,16 +256,12 @@ def init_shared_state():
     logger.info("✓ Pre-processed into difficulty pools")
 
 # ===== HELPER FUNCTIONS =====
-def _values_key(cards):
-    """Convert cards to sorted key string"""
-    return "-".join(map(str, sorted(map(int, cards or []))))
-
 def _build_index(puzzles):
     """Build index for pool processing"""
     idx = []
     for p in puzzles:
         vals = list(map(int, p.get('cards') or []))
-        key = _values_key(vals)
+        key = hand_key(vals)
         idx.append((p, vals, key))
     print(f"~~~_build_index={idx[:3]}")
     return idx
@@ -335,18 +334,16 @@ def pre_process_pool(puzzles):
 # lib/games/game24_utils.py - ADD THIS FUNCTION
 def validate_solution(puzzle_id, user_solution):
     """Validate if the solution produces 24"""
-    # Placeholder - implement your actual validation logic
+    if not is_safe_expression(user_solution):
+        return False
+    # shared bounded evaluator (no eval(): "9**9**9**9" passes the character check)
     try:
-        # Basic safety check before eval
-        if not is_safe_expression(user_solution):
-            return False
-
-        # Evaluate the expression
-        result = eval(user_solution)
-        return abs(result - 24) < 0.001  # Allow for floating point precision
-
-    except:
+        result = evaluate(user_solution)
+    except (ValueError, ArithmeticError):
         return False
+    if isinstance(result, tuple):
+        return eq(result, (24, 1))
+    return abs(result - 24) < 0.001  # irrational powers come back as floats
 
 def is_safe_expression(expr):
     """Basic safety check for mathematical expressions"""
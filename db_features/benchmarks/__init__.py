@@ -0,0 +1 @@
+# benchmarks/ — standalone timing scripts; run from db_features/ with `python -m benchmarks.<name>`
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+enumerate_solutions: exhaustive search + string dedupe vs canonical-form search.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_enumerate
+    python -m benchmarks.bench_enumerate --targets 24 10 --limit 50
+
+"before" is the pre-canonical enumeration (every merge order, every operand
+order, duplicates dropped only when the rendered string repeats); "after" is
+game_core.enumerate_solutions. Reported per target over all 1820 4-card
+hands: merges expanded, solutions returned, and wall time.
+"""
+from __future__ import annotations
+import argparse, time
+from typing import Callable, Dict, List, Sequence
+
+from app.games.core import game_core
+from app.games.core.solution_table import all_hands
+
+_COUNT = [0]
+
+
+def _before(values: Sequence[int], target: int, limit: int) -> List[str]:
+    t = (int(target), 1)
+    sols, seen = [], set()
+
+    def dfs(nums, exps):
+        if len(sols) >= limit:
+            return
+        if len(nums) == 1:
+            if game_core.rat_eq(nums[0], t) and exps[0] not in seen:
+                seen.add(exps[0])
+                sols.append(exps[0])
+            return
+        for i, j, sym, val in game_core._merges(nums):
+            _COUNT[0] += 1
+            dfs(game_core._rest(nums, i, j) + (val,),
+                game_core._rest(exps, i, j) + (f"({exps[i]}{sym}{exps[j]})",))
+            if len(sols) >= limit:
+                return
+
+    dfs(tuple((int(x), 1) for x in values), tuple(str(int(x)) for x in values))
+    return sols
+
+
+_combine = game_core._combine
+
+
+def _counting_combine(a, b, nonneg):
+    out = _combine(a, b, nonneg)
+    _COUNT[0] += len(out)
+    return out
+
+
+def _after(values: Sequence[int], target: int, limit: int) -> List[str]:
+    return game_core.enumerate_solutions(values, target, limit=limit)
+
+
+ENGINES: Dict[str, Callable] = {"exhaustive": _before, "canonical": _after}
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--targets", type=int, nargs="+", default=[24, 10])
+    ap.add_argument("--limit", type=int, default=50)
+    args = ap.parse_args()
+
+    hands = [list(h) for h in all_hands()]
+    game_core._combine = _counting_combine
+    try:
+        print(f"{'target':>6} {'engine':>11} {'merges':>10} {'solutions':>10} {'at limit':>10} {'total s':>8}")
+        for t in args.targets:
+            for name, fn in ENGINES.items():
+                _COUNT[0] = 0
+                game_core.clear_solver_cache()
+                n_sols = capped = 0
+                t0 = time.perf_counter()
+                for vals in hands:
+                    sols = fn(vals, t, args.limit)
+                    n_sols += len(sols)
+                    capped += len(sols) >= args.limit
+                elapsed = time.perf_counter() - t0
+                print(f"{t:>6} {name:>11} {_COUNT[0]:>10} {n_sols:>10} {capped:>10} {elapsed:>8.2f}")
+    finally:
+        game_core._combine = _combine
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Expression evaluation: the evaluators the tree used to carry vs the shared
+compiled evaluator in app/games/core/evaluator.py.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_evaluator
+    python -m benchmarks.bench_evaluator --repeat 5 --variants 0
+
+Reference copies (see "reference" below):
+  - compile_eval   old core/evaluator.safe_eval: ast check + compile + eval
+  - bounded        safe_eval_bounded (no_database/game24/safety_eval.py)
+  - ast_fraction   walkthrough / hand_features: ast walk over Fractions
+Current:
+  - parse          expr_parser.parse_expression (single pass, no closures)
+  - compiled       evaluator.evaluate: cold (empty compile cache), then warm;
+                   about half of a cold fill is GC passes over the closures
+                   piling up in the cache (check with gc.disable())
+  - steps          evaluator steps(), what walkthroughs and features read
+
+Corpus: benchmarks/corpus.py (book solutions plus typed variants). Values are
+compared wherever a reference and the compiled evaluator both produce one.
+"""
+from __future__ import annotations
+import argparse, ast, math, operator, time
+from fractions import Fraction
+from typing import Callable, List, Optional
+
+from app.games.core.evaluator import COMPILE_CACHE, compile_expression, evaluate
+from app.games.core.expr_parser import parse_expression
+from app.games.core.rational import to_float
+from benchmarks.corpus import load_corpus
+
+_GLYPHS = str.maketrans({"×": "*", "÷": "/", "−": "-"})
+_RANKS = str.maketrans({"A": "1", "J": "11", "Q": "12", "K": "13"})
+
+
+def _plain(expr: str) -> str:
+    """What the older evaluators expect: ASCII operators, digits only, ** for powers."""
+    return expr.translate(_GLYPHS).translate(_RANKS).replace("^", "**")
+
+
+# -------- reference: compile + eval (old core/evaluator.py) --------
+_EVAL_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Constant, ast.Add, ast.Sub,
+               ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd, ast.Load)
+
+
+def compile_eval(expr: str) -> float:
+    tree = ast.parse(expr, mode="eval")
+    for node in ast.walk(tree):
+        if not isinstance(node, _EVAL_NODES):
+            raise ValueError("illegal")
+    return float(eval(compile(tree, "<expr>", "eval"), {"__builtins__": {}}, {}))
+
+
+# -------- reference: safe_eval_bounded (no_database/game24/safety_eval.py) --------
+_BINOPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+           ast.Div: operator.truediv, ast.Pow: operator.pow}
+
+
+def bounded(expr: str) -> float:
+    def ev(n):
+        if isinstance(n, ast.Constant) and isinstance(n.value, (int, float)):
+            return float(n.value)
+        if isinstance(n, ast.UnaryOp) and isinstance(n.op, (ast.USub, ast.UAdd)):
+            v = ev(n.operand)
+            return -v if isinstance(n.op, ast.USub) else v
+        if isinstance(n, ast.BinOp) and type(n.op) in _BINOPS:
+            a, b = ev(n.left), ev(n.right)
+            if isinstance(n.op, ast.Pow):
+                if abs(b - round(b)) > 1e-12 or abs(b) > 5:
+                    raise ValueError("exponent")
+                if a and abs(b) * math.log10(abs(a)) > 9.5:
+                    raise ValueError("power")
+            v = _BINOPS[type(n.op)](a, b)
+            if not math.isfinite(v) or abs(v) > 1e9:
+                raise ValueError("too large")
+            return v
+        raise ValueError("unsupported")
+    return ev(ast.parse(expr, mode="eval").body)
+
+
+# -------- reference: ast walk over Fractions (old walkthrough / hand_features) --------
+def ast_fraction(expr: str) -> Fraction:
+    def walk(n) -> Fraction:
+        if isinstance(n, ast.Constant) and isinstance(n.value, (int, float)):
+            return Fraction(n.value)
+        if isinstance(n, ast.UnaryOp) and isinstance(n.op, ast.USub):
+            return -walk(n.operand)
+        if isinstance(n, ast.UnaryOp) and isinstance(n.op, ast.UAdd):
+            return walk(n.operand)
+        if isinstance(n, ast.BinOp):
+            a, b = walk(n.left), walk(n.right)
+            op = type(n.op)
+            if op is ast.Add: return a + b
+            if op is ast.Sub: return a - b
+            if op is ast.Mult: return a * b
+            if op is ast.Div: return a / b
+            if op is ast.Pow and b.denominator == 1 and abs(b) <= 12: return a ** int(b)
+        raise ValueError("unsupported")
+    return walk(ast.parse(expr, mode="eval").body)
+
+
+# -------- current --------
+def parse(expr: str):
+    return parse_expression(expr).value
+
+
+def compiled(expr: str):
+    return evaluate(expr)
+
+
+def steps(expr: str):
+    return compile_expression(expr).steps()
+
+
+def _try(fn: Callable, expr: str) -> Optional[float]:
+    try:
+        v = fn(expr)
+    except Exception:
+        return None
+    if v is None:
+        return None
+    return to_float(v) if isinstance(v, tuple) else float(v)
+
+
+def _time(fn: Callable, exprs: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for e in exprs:
+            try:
+                fn(e)
+            except Exception:
+                pass
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--variants", type=int, default=2, help="Typed variants per book solution.")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    typed = [answer for _values, _target, answer in load_corpus(args.variants)]
+    plain = [_plain(e) for e in typed]
+    print(f"corpus: {len(typed)} expressions ({len(set(typed))} distinct)")
+
+    for name, ref in (("compile_eval", compile_eval), ("bounded", bounded), ("ast_fraction", ast_fraction)):
+        both = differ = 0
+        for t, p in zip(typed, plain):
+            a, b = _try(ref, p), _try(compiled, t)
+            if a is not None and b is not None:
+                both += 1
+                differ += not math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+        print(f"  {name:>12} vs compiled: {both} evaluated by both, {differ} different values")
+
+    rows = [("compile_eval", compile_eval, plain), ("bounded", bounded, plain),
+            ("ast_fraction", ast_fraction, plain), ("parse", parse, typed)]
+    for name, fn, exprs in rows:
+        took = _time(fn, exprs, args.repeat)
+        print(f"{name:>14}: {took:.3f}s total, {took / len(exprs) * 1e6:.1f} us/expr")
+
+    COMPILE_CACHE.clear()
+    COMPILE_CACHE.resize(max_entries=2 * len(typed))
+    for rnd in ("cold", "warm"):
+        took = _time(compiled, typed, 1)
+        print(f"{'compiled':>14}: {took:.3f}s total, {took / len(typed) * 1e6:.1f} us/expr ({rnd})")
+    took = _time(steps, typed, args.repeat)
+    print(f"{'steps':>14}: {took:.3f}s total, {took / len(typed) * 1e6:.1f} us/expr (warm)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+/api/check answer handling: the previous four-pass path (str.replace +
+regex normalise, ast literal check, ast exact eval, float fallback) vs the
+single-pass Pratt parser in app/games/core/expr_parser.py (through
+answer_check.evaluate_answer, i.e. without the verdict cache), plus the
+cached answer_check.check_expression path /api/check uses, replayed twice
+over the corpus as a class resubmitting the same answers would.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_expr_parser
+    python -m benchmarks.bench_expr_parser --repeat 5 --variants 4
+
+The corpus is benchmarks/corpus.py: every book solution in answers.json plus
+variants of it the way students type them. Both paths must return the same
+verdict and reason for every answer.
+"""
+from __future__ import annotations
+import argparse, ast, time
+from typing import List, Tuple
+
+from app.games.core.answer_check import (
+    CARD_REASON, CHECK_CACHE, INVALID_REASON, check_expression, evaluate_answer,
+)
+from app.games.core.game_core import normalize_rank_expr
+from app.games.core.op_sets import literals_match
+from app.games.core.rational import (
+    rat, norm, add, sub, mul, div, neg, pow_int, eq, is_integer, to_float,
+)
+from benchmarks.corpus import load_corpus
+
+
+# -------- reference: the checker as it was in game24_routes.api_check --------
+_ALLOWED = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Add, ast.Sub, ast.Mult, ast.Div,
+            ast.Pow, ast.USub, ast.UAdd, ast.Load, ast.Constant, ast.Tuple, ast.List)
+
+
+class _Irrational(Exception):
+    pass
+
+
+def _legacy_normalize(expr: str) -> str:
+    s = expr or ""
+    s = s.replace("^", "**").replace("×", "*").replace("∗", "*").replace("·", "*")
+    s = s.replace("÷", "/").replace("／", "/")
+    s = s.replace("−", "-").replace("—", "-").replace("–", "-")
+    return normalize_rank_expr(s)
+
+
+def _legacy_uses(expr: str, values: List[int], concat: bool) -> bool:
+    try:
+        node = ast.parse(expr, mode="eval")
+    except Exception:
+        return False
+    lits = [int(n.value) for n in ast.walk(node)
+            if isinstance(n, ast.Constant) and isinstance(n.value, (int, float))]
+    try:
+        return literals_match(lits, values, concat=concat)
+    except Exception:
+        return False
+
+
+def _legacy_eval(expr: str, exact: bool):
+    def rec(n):
+        if not isinstance(n, _ALLOWED):
+            raise ValueError("disallowed")
+        if isinstance(n, ast.Expression):
+            return rec(n.body)
+        if isinstance(n, ast.Constant):
+            if isinstance(n.value, (int, float)) and not isinstance(n.value, bool):
+                return rat(n.value) if exact else float(n.value)
+            raise ValueError("constant")
+        if isinstance(n, ast.UnaryOp):
+            v = rec(n.operand)
+            if isinstance(n.op, ast.UAdd):
+                return v
+            if isinstance(n.op, ast.USub):
+                return neg(v) if exact else -v
+            raise ValueError("unary")
+        if isinstance(n, ast.BinOp):
+            a, b = rec(n.left), rec(n.right)
+            op = type(n.op)
+            if not exact:
+                if op is ast.Add: return a + b
+                if op is ast.Sub: return a - b
+                if op is ast.Mult: return a * b
+                if op is ast.Div:
+                    if abs(b) < 1e-12:
+                        raise ZeroDivisionError
+                    return a / b
+                if op is ast.Pow:
+                    if abs(a) > 1e6 or abs(b) > 12:
+                        raise ValueError("pow")
+                    return a ** b
+                raise ValueError("binop")
+            if op is ast.Add: return add(a, b)
+            if op is ast.Sub: return sub(a, b)
+            if op is ast.Mult: return mul(a, b)
+            if op is ast.Div:
+                q = div(a, b)
+                if q is None:
+                    raise ZeroDivisionError
+                return q
+            if op is ast.Pow:
+                if abs(a[0]) > 1e6 * a[1] or abs(b[0]) > 12 * b[1]:
+                    raise ValueError("pow")
+                if not is_integer(b):
+                    raise _Irrational()
+                p = pow_int(norm(a), b[0] // b[1])
+                if p is None:
+                    raise ZeroDivisionError
+                return p
+            raise ValueError("binop")
+        raise ValueError("node")
+    return rec(ast.parse(expr, mode="eval"))
+
+
+def legacy_check(values: List[int], target: int, answer: str, concat: bool = False) -> Tuple[bool, str]:
+    expr = _legacy_normalize(answer.strip())
+    if not _legacy_uses(expr, values, concat):
+        return False, CARD_REASON
+    try:
+        try:
+            exact = _legacy_eval(expr, True)
+            val, ok = to_float(exact), eq(exact, (int(target), 1))
+        except _Irrational:
+            val = _legacy_eval(expr, False)
+            ok = abs(val - float(target)) < 1e-6
+    except Exception:
+        return False, INVALID_REASON
+    return (True, "") if ok else (False, f"Your result = {val:g}, target = {target}")
+
+
+# -------- current: single pass --------
+def parser_check(values: List[int], target: int, answer: str, concat: bool = False) -> Tuple[bool, str]:
+    r = evaluate_answer(answer.strip(), values, target, concat)
+    return r.correct, r.reason
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--variants", type=int, default=2, help="Typed variants per book solution.")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    cases = load_corpus(args.variants)
+    mismatches = [(c, legacy_check(*c), parser_check(*c)) for c in cases]
+    mismatches = [m for m in mismatches if m[1] != m[2]]
+    correct = sum(parser_check(*c)[0] for c in cases)
+    print(f"corpus: {len(cases)} answers ({correct} correct), mismatches: {len(mismatches)}")
+    for case, old, new in mismatches[:10]:
+        print(f"  {case}: legacy={old} parser={new}")
+
+    for name, fn in (("legacy", legacy_check), ("parser", parser_check)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            for c in cases:
+                fn(*c)
+            best = min(best, time.perf_counter() - t0)
+        print(f"{name:>7}: {best:.3f}s total, {best / len(cases) * 1e6:.1f} us/answer")
+
+    CHECK_CACHE.clear()
+    CHECK_CACHE.resize(max_entries=2 * len(cases))
+    for rnd in ("cold", "warm"):
+        hits = CHECK_CACHE.hits
+        t0 = time.perf_counter()
+        for values, target, answer in cases:
+            check_expression(answer, values, target)
+        took = time.perf_counter() - t0
+        print(f"{'cached':>7}: {took:.3f}s total, {took / len(cases) * 1e6:.1f} us/answer "
+              f"({rnd}, {(CHECK_CACHE.hits - hits) / len(cases):.0%} hits)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Hand keys: values_key strings ("01-04-08-08") vs packed hand_key ints.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_hand_key
+    python -m benchmarks.bench_hand_key --repeat 5 --lookups 200000
+
+Rows:
+  - build        key of a hand (sort + format / sort + shift)
+  - dict get     key built per lookup, then a dict hit (store / table lookups)
+  - recent       pool filter against the last 50 dealt keys (random_pick)
+Every 4-card hand over ranks 1..13 is checked to get a distinct key that
+decodes back to the hand and survives the string form used at API boundaries
+(hand_key_str / parse_hand_key).
+"""
+from __future__ import annotations
+import argparse, random, time
+from itertools import combinations_with_replacement
+from typing import Callable
+
+from app.games.core.game_core import hand_key, hand_key_str, hand_values, parse_hand_key, values_key
+
+
+def _time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--lookups", type=int, default=100_000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    hands = [list(h) for h in combinations_with_replacement(range(1, 14), 4)]
+    keys = {hand_key(h) for h in hands}
+    bad = sum(hand_values(hand_key(h)) != h or parse_hand_key(hand_key_str(hand_key(h))) != hand_key(h)
+              for h in hands)
+    print(f"hands: {len(hands)}, distinct keys: {len(keys)}, round-trip failures: {bad}")
+
+    rng = random.Random(7)
+    dealt = [rng.sample(rng.choice(hands), 4) for _ in range(args.lookups)]
+    by_str = {values_key(h): i for i, h in enumerate(hands)}
+    by_int = {hand_key(h): i for i, h in enumerate(hands)}
+    recent = [rng.choice(hands) for _ in range(50)]
+    recent_str = set(values_key(h) for h in recent)
+    recent_int = set(hand_key(h) for h in recent)
+    pool_str = [values_key(h) for h in hands]
+    pool_int = [hand_key(h) for h in hands]
+
+    rows = [
+        ("build", lambda: [values_key(h) for h in dealt], lambda: [hand_key(h) for h in dealt], len(dealt)),
+        ("dict get", lambda: [by_str[values_key(h)] for h in dealt],
+                     lambda: [by_int[hand_key(h)] for h in dealt], len(dealt)),
+        ("recent", lambda: [k for _ in range(50) for k in pool_str if k not in recent_str],
+                   lambda: [k for _ in range(50) for k in pool_int if k not in recent_int], 50 * len(hands)),
+    ]
+    for name, as_str, as_int, n in rows:
+        a = _time(as_str, args.repeat)
+        b = _time(as_int, args.repeat)
+        print(f"{name:>10}: values_key {a / n * 1e9:7.0f} ns   hand_key {b / n * 1e9:7.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
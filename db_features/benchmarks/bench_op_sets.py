@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Solve time per operator set (basic, pow, concat) over all 4-card hands.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_op_sets
+    python -m benchmarks.bench_op_sets --ops basic pow --targets 24 100 --enum-hands 200
+
+For every operator set: solve_one on all 1820 hands per target (warm memo,
+as in a long-lived worker, plus the memo size it ends with), then
+enumerate_solutions on the first --enum-hands hands. The solvable column
+shows how much each set widens the game.
+"""
+from __future__ import annotations
+import argparse, statistics, time
+
+from app.games.core import game_core
+from app.games.core.op_sets import OP_SETS
+from app.games.core.solution_table import all_hands
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--ops", nargs="+", default=list(OP_SETS), choices=list(OP_SETS))
+    ap.add_argument("--targets", type=int, nargs="+", default=[24, 10, 36, 100])
+    ap.add_argument("--enum-hands", type=int, default=300)
+    args = ap.parse_args()
+
+    hands = [list(h) for h in all_hands()]
+    print(f"{'ops':>7} {'target':>6} {'solvable':>8} {'mean us':>9} {'max us':>9} "
+          f"{'memo':>7} {'enum s':>7} {'sols':>6}")
+    for op_set in args.ops:
+        game_core.clear_solver_cache()
+        for t in args.targets:
+            times, solvable = [], 0
+            for vals in hands:
+                t0 = time.perf_counter()
+                solvable += game_core.solve_one(vals, t, op_set) is not None
+                times.append((time.perf_counter() - t0) * 1e6)
+            t0 = time.perf_counter()
+            n_sols = sum(len(game_core.enumerate_solutions(vals, t, op_set=op_set))
+                         for vals in hands[:args.enum_hands])
+            enum_s = time.perf_counter() - t0
+            memo = len(game_core.SOLVER_CACHES[op_set if op_set != "concat" else "basic"])
+            print(f"{op_set:>7} {t:>6} {solvable:>8} {statistics.mean(times):>9.1f} {max(times):>9.1f} "
+                  f"{memo:>7} {enum_s:>7.2f} {n_sols:>6}")
+
+
+if __name__ == "__main__":
+    main()
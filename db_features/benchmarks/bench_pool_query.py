@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Pool queries over the feature bitsets (app/games/core/feature_index.py) vs
+filtering store payloads one puzzle at a time.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_pool_query
+    python -m benchmarks.bench_pool_query --copies 4 --repeat 500
+
+Rows:
+  - build     FeatureIndex for the store (once per store version)
+  - scan      get_by_id per case_id + Python predicates (what a hand-rolled
+              pool builder does), then random.sample
+  - index     FeatureIndex.query: bitset ANDs, stratified sample
+Both sides answer "20 solvable hands needing division, no repeated ranks,
+medium"; the matched counts are compared.
+"""
+from __future__ import annotations
+import argparse, random, time
+
+from benchmarks.bench_store_layout import build_columns, load_rows
+
+QUERY = {"solvable": 24, "needs_division": True, "repeated_ranks": False, "level": "medium"}
+
+
+def scan(store, ids, count: int, rng: random.Random):
+    hits = []
+    for cid in ids:
+        p = store.get_by_id(cid)
+        sols = p["solutions"]
+        if (p["level"] == "medium" and sols and all("/" in s for s in sols)
+                and len(set(p["cards"])) == len(p["cards"])):
+            hits.append(cid)
+    return rng.sample(hits, min(count, len(hits))), len(hits)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--copies", type=int, default=1, help="Copies of answers.json under fresh case_ids.")
+    ap.add_argument("--repeat", type=int, default=200)
+    ap.add_argument("--count", type=int, default=20)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    store = build_columns(load_rows(args.copies))
+    ids = list(store.ids)
+
+    t0 = time.perf_counter()
+    index = store.feature_index()
+    print(f"rows: {len(store)}, index build {time.perf_counter() - t0:.3f}s")
+
+    t0 = time.perf_counter()
+    _picked, scanned = scan(store, ids, args.count, rng)
+    took_scan = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(args.repeat):
+        out = index.query(QUERY, count=args.count, rng=rng)
+    took_index = (time.perf_counter() - t0) / args.repeat
+    print(f"matched: scan {scanned}, index {out['matched']}")
+    print(f"  scan: {took_scan * 1e6:9.1f} us/query")
+    print(f" index: {took_index * 1e6:9.1f} us/query (strata {out['strata']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Per-hand 4-card solve time: fractions.Fraction search vs (n, d) int pairs.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_rational
+    python -m benchmarks.bench_rational --targets 24 10 36 --repeat 3
+
+"before" is a copy of the recursive search as it was written on Fraction;
+"after" is game_core.solve_one on rational pairs. Every one of the 1820
+hands over ranks 1..13 is solved cold (memo cleared per hand) for each
+target, and both engines must agree on solvability.
+"""
+from __future__ import annotations
+import argparse, statistics, time
+from fractions import Fraction
+from typing import Callable, Dict, List, Sequence
+
+from app.games.core import game_core
+from app.games.core.solution_table import all_hands
+
+
+# -------- reference: the same search on Fraction --------
+_FRAC_MEMO: Dict = {}
+
+
+def _frac_merges(nums):
+    n = len(nums)
+    seen = set()
+    for x in range(n):
+        for y in range(x + 1, n):
+            i, j = (x, y) if nums[x] <= nums[y] else (y, x)
+            pair = (nums[i], nums[j])
+            if pair in seen:
+                continue
+            seen.add(pair)
+            a, b = pair
+            yield i, j, "+", a + b
+            yield i, j, "*", a * b
+            yield i, j, "-", a - b
+            yield j, i, "-", b - a
+            if b != 0:
+                yield i, j, "/", a / b
+            if a != 0:
+                yield j, i, "/", b / a
+
+
+def _frac_can_reach(nums, target) -> bool:
+    if len(nums) == 1:
+        return nums[0] == target
+    key = (nums, target)
+    hit = _FRAC_MEMO.get(key)
+    if hit is not None:
+        return hit
+    found = any(
+        _frac_can_reach(tuple(sorted(game_core._rest(nums, i, j) + (val,))), target)
+        for i, j, _sym, val in _frac_merges(nums)
+    )
+    _FRAC_MEMO[key] = found
+    return found
+
+
+def _frac_search_one(nums, exps, target):
+    if len(nums) == 1:
+        return exps[0] if nums[0] == target else None
+    for i, j, sym, val in _frac_merges(nums):
+        restn = game_core._rest(nums, i, j) + (val,)
+        if _frac_can_reach(tuple(sorted(restn)), target):
+            reste = game_core._rest(exps, i, j) + (f"({exps[i]}{sym}{exps[j]})",)
+            return _frac_search_one(restn, reste, target)
+    return None
+
+
+def _before(values: Sequence[int], target: int):
+    _FRAC_MEMO.clear()
+    return _frac_search_one(tuple(Fraction(v) for v in values), tuple(str(v) for v in values), Fraction(target))
+
+
+def _after(values: Sequence[int], target: int):
+    game_core.clear_solver_cache()
+    return game_core.solve_one(values, target)
+
+
+ENGINES: Dict[str, Callable] = {"fraction": _before, "int-pair": _after}
+
+
+def _run(fn: Callable, hands: List[List[int]], target: int, repeat: int):
+    best: List[float] = [float("inf")] * len(hands)
+    solvable = []
+    for _ in range(repeat):
+        solvable = []
+        for k, vals in enumerate(hands):
+            t0 = time.perf_counter()
+            out = fn(vals, target)
+            best[k] = min(best[k], (time.perf_counter() - t0) * 1e6)
+            solvable.append(out is not None)
+    return best, solvable
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--targets", type=int, nargs="+", default=[24, 10, 36])
+    ap.add_argument("--repeat", type=int, default=1, help="keep the best of N runs per hand")
+    args = ap.parse_args()
+
+    hands = [list(h) for h in all_hands()]
+    print(f"{'target':>6} {'engine':>9} {'hands':>6} {'solvable':>8} "
+          f"{'mean us':>9} {'p50 us':>9} {'max us':>10} {'total s':>8}")
+    for t in args.targets:
+        results = {}
+        for name, fn in ENGINES.items():
+            times, solvable = _run(fn, hands, t, args.repeat)
+            results[name] = (times, solvable)
+            print(f"{t:>6} {name:>9} {len(hands):>6} {sum(solvable):>8} "
+                  f"{statistics.mean(times):>9.1f} {statistics.median(times):>9.1f} "
+                  f"{max(times):>10.1f} {sum(times) / 1e6:>8.2f}")
+        (tb, sb), (ta, sa) = results["fraction"], results["int-pair"]
+        if sb != sa:
+            raise SystemExit(f"target {t}: engines disagree on solvability")
+        print(f"{'':>6} {'speedup':>9} {statistics.mean(tb) / statistics.mean(ta):>25.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Dealing: Game24Store.random_pick filtering the whole pool per pick vs the
+per-session sampler (app/games/core/pool_sampler.py).
+
+Usage (from db_features/):
+    python -m benchmarks.bench_sampler
+    python -m benchmarks.bench_sampler --deals 5000 --copies 4
+
+Rows (per deal, 50 recent hands tracked like api_next does):
+  - filter    random_pick without samplers: eligibility list + recent filter
+  - sampler   random_pick with a session samplers dict
+each for every case_id eligible and for half of them eligible (the solvable
+subset of an off-24 target). Also reports repeats within the first pass and
+the size of the sparse swap map left at the end.
+"""
+from __future__ import annotations
+import argparse, random, time
+from typing import Any, Callable, Dict, List, Optional
+
+from app.games.core.game_core import hand_key
+from benchmarks.bench_store_layout import build_columns, load_rows
+
+
+def deal(store, n: int, eligible: Optional[Callable[[int], bool]], samplers: Optional[Dict[str, Any]]) -> List[int]:
+    recent: List[int] = []
+    out = []
+    for _ in range(n):
+        puz, _done = store.random_pick("medium", recent, eligible=eligible, samplers=samplers, scope="bench")
+        out.append(puz["case_id"])
+        recent.append(hand_key(puz["cards"]))
+        del recent[:-50]
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--deals", type=int, default=2000)
+    ap.add_argument("--copies", type=int, default=1, help="Copies of answers.json under fresh case_ids.")
+    args = ap.parse_args()
+
+    random.seed(7)
+    store = build_columns(load_rows(args.copies))
+    pool = len(store.pools["medium"])
+    print(f"medium pool: {pool} rows, {args.deals} deals")
+    for label, eligible in (("all eligible", None), ("half eligible", lambda cid: cid % 2 == 0)):
+        for name, samplers in (("filter", None), ("sampler", {})):
+            t0 = time.perf_counter()
+            ids = deal(store, args.deals, eligible, samplers)
+            took = time.perf_counter() - t0
+            first = ids[:min(args.deals, pool if eligible is None else pool // 2)]
+            extra = ""
+            if samplers:
+                extra = f", sparse entries left {max(len(st['s']) for st in samplers.values())}"
+            print(f"{label:>13} {name:>7}: {took / args.deals * 1e6:7.1f} us/deal, "
+                  f"repeats in first pass {len(first) - len(set(first))}{extra}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Recursive pair search (game_core._search_one) vs subset DP (subset_solver).
+
+Usage (from db_features/):
+    python -m benchmarks.bench_solvers
+    python -m benchmarks.bench_solvers --cards 4 5 --hands 50 --targets 24 10 36
+
+Each hand is solved cold (both caches cleared) for every target; the table
+reports mean / max milliseconds per solve and how many targets were solvable.
+6-card recursive solves of unsolvable targets take tens of seconds each, so
+the default sample for 6 cards is deliberately small.
+"""
+from __future__ import annotations
+import argparse, random, statistics, time
+from typing import Callable, Dict, List, Sequence
+
+from app.games.core import game_core, subset_solver
+
+DEFAULT_HANDS = {4: 60, 5: 12, 6: 2}
+
+
+def _recursive(values: Sequence[int], target: int):
+    game_core.clear_solver_cache()
+    return game_core._search_one(
+        tuple((int(v), 1) for v in values), tuple(str(v) for v in values), (int(target), 1)
+    )
+
+
+def _subset(values: Sequence[int], target: int):
+    subset_solver.clear_cache()
+    return subset_solver.solve_subset(values, target)
+
+
+ENGINES: Dict[str, Callable] = {"recursive": _recursive, "subset": _subset}
+
+
+def _time(fn: Callable, hands: List[List[int]], targets: Sequence[int]):
+    times, solved = [], 0
+    for vals in hands:
+        for t in targets:
+            t0 = time.perf_counter()
+            out = fn(vals, t)
+            times.append((time.perf_counter() - t0) * 1000.0)
+            solved += out is not None
+    return times, solved
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cards", type=int, nargs="+", default=[4, 5, 6])
+    ap.add_argument("--hands", type=int, default=None, help="hands per card count (default 60/12/2)")
+    ap.add_argument("--targets", type=int, nargs="+", default=[24, 10, 36])
+    ap.add_argument("--seed", type=int, default=24)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'cards':>5} {'engine':>10} {'solves':>7} {'solvable':>8} {'mean ms':>10} {'max ms':>10}")
+    for k in args.cards:
+        n = args.hands or DEFAULT_HANDS.get(k, 2)
+        hands = [sorted(rng.randint(1, 13) for _ in range(k)) for _ in range(n)]
+        for name, fn in ENGINES.items():
+            times, solved = _time(fn, hands, args.targets)
+            print(f"{k:>5} {name:>10} {len(times):>7} {solved:>8} "
+                  f"{statistics.mean(times):>10.2f} {max(times):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Game24Store memory and lookup latency: the per-puzzle object layout the store
+used to keep vs the column (typed array) layout in puzzle_store_game24.py.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_store_layout
+    python -m benchmarks.bench_store_layout --copies 4 --repeat 5
+
+Reference copy (see "reference" below):
+  - objects   frozen G24Puzzle per row, by_id / by_key dicts, walkthrough and
+              canonical-form dicts, pools of (puzzle, cards, key) triples
+Current:
+  - columns   Game24Store: uint8 cards, int32 ids + sorted index, level / flag
+              code arrays, pools of row indices, packed solution text
+
+Rows come from answers.json; --copies repeats them under fresh case_ids to
+see how both layouts grow. Memory is what tracemalloc still holds once the
+loader rows are built and packed (the compiled-expression cache is warmed
+first, so neither side is charged for it). Payloads of both layouts are
+compared for every case_id.
+"""
+from __future__ import annotations
+import argparse, gc, json, random, time, tracemalloc
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.games.core.answer_check import canonical_forms
+from app.games.core.game_core import hand_key, values_key
+from app.games.core.puzzle_store_game24 import G24Puzzle, Game24Store
+from app.games.core.walkthrough import trace_all
+from benchmarks.corpus import ANSWERS
+
+Row = Tuple[int, List[int], List[str], Optional[str]]
+
+
+# -------- reference: object-per-puzzle layout (old puzzle_store_game24.py) --------
+@dataclass(frozen=True)
+class OldPuzzle:
+    case_id: int
+    cards: List[int]
+    solutions: List[str]
+    level: Optional[str]
+    features: Optional[Dict[str, Any]] = None
+
+
+class ObjectStore:
+    def __init__(self, puzzles: List[OldPuzzle], simple: List[bool], hard: List[bool]):
+        self.by_id = {p.case_id: p for p in puzzles}
+        self.by_key = {values_key(p.cards): p for p in puzzles}
+        self.walkthroughs = {p.case_id: trace_all(p.solutions) for p in puzzles}
+        self.solution_forms = {p.case_id: canonical_forms(p.solutions) for p in puzzles}
+        triplets = [(p, p.cards, values_key(p.cards)) for p in puzzles]
+        levels = [(p.level or "").lower() for p in puzzles]
+        has_sol = [bool(p.solutions) for p in puzzles]
+
+        def select(pred):
+            return [t for i, t in enumerate(triplets) if pred(i)]
+
+        self.pools = {
+            "nosol": select(lambda i: not has_sol[i]),
+            "easy_like": select(lambda i: levels[i] == "easy" and has_sol[i])
+                         + select(lambda i: levels[i] == "medium" and simple[i]),
+            "medium": select(lambda i: levels[i] == "medium"),
+            "hard_like": select(lambda i: levels[i] == "hard")
+                         + select(lambda i: levels[i] == "medium" and hard[i]),
+        }
+
+    def get_by_id(self, case_id: int):
+        p = self.by_id.get(int(case_id))
+        return self._to_payload(p) if p else None
+
+    def get_by_values(self, values: List[int]):
+        p = self.by_key.get(values_key(values))
+        return self._to_payload(p) if p else None
+
+    def random_pick(self, level: str, recent_keys: List[str], eligible: Optional[Callable[[int], bool]] = None):
+        pool = self.pools[level]
+        base = pool if eligible is None else [t for t in pool if eligible(int(t[0].case_id))]
+        if not base:
+            return None, True
+        recent = set(recent_keys[-50:])
+        candidates = [t for t in base if t[2] not in recent]
+        if not candidates:
+            return self._to_payload(random.choice(base)[0]), True
+        return self._to_payload(random.choice(candidates)[0]), False
+
+    def _to_payload(self, p: OldPuzzle) -> Dict[str, Any]:
+        return {
+            "case_id": p.case_id,
+            "cards": list(p.cards),
+            "solutions": list(p.solutions),
+            "level": p.level,
+            "features": dict(p.features) if p.features else None,
+            "walkthroughs": [list(w) for w in self.walkthroughs.get(p.case_id, ())],
+        }
+
+
+# -------- harness --------
+def load_rows(copies: int) -> List[Row]:
+    data = json.loads(ANSWERS.read_text(encoding="utf-8"))
+    base = [(int(r["case_id"]), [int(c) for c in r["cards"]], list(r.get("solutions") or []),
+             (r.get("level") or "").strip().lower() or None) for r in data]
+    step = max(cid for cid, *_ in base) + 1
+    return [(cid + k * step, cards, sols, lvl) for k in range(copies) for cid, cards, sols, lvl in base]
+
+
+def build_objects(rows: List[Row], simple: List[bool], hard: List[bool]) -> ObjectStore:
+    # fresh lists per row, as the DB loader decodes them from JSONB
+    return ObjectStore([OldPuzzle(cid, list(cards), list(sols), lvl) for cid, cards, sols, lvl in rows],
+                       simple, hard)
+
+
+def build_columns(rows: List[Row]) -> Game24Store:
+    store = Game24Store()
+    store._build_caches([G24Puzzle(cid, list(cards), list(sols), lvl) for cid, cards, sols, lvl in rows])
+    return store
+
+
+def measure(build: Callable[[], Any]) -> Tuple[Any, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    store = build()
+    took = time.perf_counter() - t0
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return store, held, took
+
+
+def _time(fn: Callable, args: List[Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for a in args:
+            fn(*a)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(args)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--copies", type=int, default=1, help="Copies of answers.json under fresh case_ids.")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--picks", type=int, default=2000)
+    args = ap.parse_args()
+
+    rows = load_rows(args.copies)
+    warm = build_columns(rows)      # warms the compile cache; also supplies the pool flags
+    puzzles = [G24Puzzle(cid, cards, sols, lvl) for cid, cards, sols, lvl in rows]
+    simple, hard = warm._complexity_flags(puzzles, [bool(p.solutions) for p in puzzles])
+    del warm, puzzles
+
+    old, old_mem, old_build = measure(lambda: build_objects(rows, simple, hard))
+    new, new_mem, new_build = measure(lambda: build_columns(rows))
+    print(f"rows: {len(rows)}, pools: {new.pool_report()}")
+    print(f"{'objects':>8}: {old_mem / 1024:9.1f} KiB held, build {old_build:.3f}s")
+    print(f"{'columns':>8}: {new_mem / 1024:9.1f} KiB held, build {new_build:.3f}s "
+          f"({old_mem / max(new_mem, 1):.1f}x smaller)")
+
+    differ = sum(old.get_by_id(cid) != new.get_by_id(cid) for cid, *_ in rows)
+    print(f"payloads: {len(rows)} case_ids compared, {differ} different")
+
+    rng = random.Random(7)
+    ids = [(rng.choice(rows)[0],) for _ in range(args.picks)]
+    hands = [(rng.choice(rows)[1],) for _ in range(args.picks)]
+    recent_hands = [rng.choice(rows)[1] for _ in range(50)]
+    recent = {ObjectStore: [values_key(h) for h in recent_hands],     # string keys then
+              Game24Store: [hand_key(h) for h in recent_hands]}
+    odd = lambda cid: cid % 2 == 1
+    cases = [
+        ("get_by_id", lambda s: s.get_by_id, ids),
+        ("get_by_values", lambda s: s.get_by_values, hands),
+        ("random_pick", lambda s: lambda: s.random_pick("medium", recent[type(s)]), [()] * (args.picks // 10)),
+        ("pick eligible", lambda s: lambda: s.random_pick("medium", recent[type(s)], odd), [()] * (args.picks // 10)),
+    ]
+    for name, fn, calls in cases:
+        a = _time(fn(old), calls, args.repeat)
+        b = _time(fn(new), calls, args.repeat)
+        print(f"{name:>14}: objects {a * 1e6:8.1f} us   columns {b * 1e6:8.1f} us")
+
+
+if __name__ == "__main__":
+    main()
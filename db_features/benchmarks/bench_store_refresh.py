@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Store reload: a full rebuild vs Game24Store.refreshed() patching the
+published version with the rows that were (de)activated or inserted since
+its watermark.
+
+Usage (from db_features/):
+    python -m benchmarks.bench_store_refresh
+    python -m benchmarks.bench_store_refresh --copies 4 --changes 50
+
+The "DB" is answers.json rows with Puzzle ids 1..N held in memory
+(TableStore below answers _active_ids / _load_from_db from it), so only
+the store side is timed. Rows:
+  - full      _build_caches over every active row
+  - refresh   refreshed(): deactivate --changes rows, insert as many new ones
+Payloads, pools and db ids of both results are compared.
+"""
+from __future__ import annotations
+import argparse, random, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.games.core.puzzle_store_game24 import G24Puzzle, Game24Store, STORE_LAYOUT
+from benchmarks.bench_store_layout import load_rows
+
+TABLE: Dict[int, Tuple[bool, G24Puzzle]] = {}
+
+
+class TableStore(Game24Store):
+    def _active_ids(self) -> List[int]:
+        return [i for i in sorted(TABLE) if TABLE[i][0]]
+
+    def _load_from_db(self, only: Optional[List[int]] = None) -> Tuple[List[G24Puzzle], List[int]]:
+        ids = [i for i in sorted(TABLE) if TABLE[i][0] and (only is None or i in only)]
+        return [TABLE[i][1] for i in ids], ids
+
+    def _watermark(self) -> Dict[str, Any]:
+        ids = self._active_ids()
+        return {"layout": STORE_LAYOUT, "dataset": "bench", "game_updated": None,
+                "active": len(ids), "max_id": ids[-1], "id_sum": sum(ids)}
+
+    def _load_solution_table(self) -> None:
+        self.solution_table = None
+
+
+def full_build() -> TableStore:
+    store = TableStore()
+    store.watermark = store._watermark()
+    store._build_caches(*store._load_from_db())
+    return store
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--copies", type=int, default=1, help="Copies of answers.json under fresh case_ids.")
+    ap.add_argument("--changes", type=int, default=5, help="Rows deactivated and rows inserted.")
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    for i, (cid, cards, sols, lvl) in enumerate(load_rows(args.copies), start=1):
+        TABLE[i] = (True, G24Puzzle(cid, list(cards), list(sols), lvl, db_id=i))
+    old = full_build()
+
+    for i in rng.sample(sorted(TABLE), args.changes):
+        TABLE[i] = (False, TABLE[i][1])
+    top = max(TABLE)
+    for k, i in enumerate(rng.sample(sorted(TABLE), args.changes), start=1):
+        p = TABLE[i][1]
+        TABLE[top + k] = (True, G24Puzzle(p.case_id + 10_000_000, p.cards, p.solutions, p.level, db_id=top + k))
+
+    t0 = time.perf_counter()
+    full = full_build()
+    took_full = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = old.refreshed()
+    took_refresh = time.perf_counter() - t0
+
+    diffs = sum(full.get_by_id(cid) != new.get_by_id(cid) for cid in set(full.ids) | set(new.ids))
+    same = (full.pool_report() == new.pool_report() and list(full.db_ids) == list(new.db_ids))
+    print(f"rows: {len(old)} -> {len(new)}, new version {new is not old}, "
+          f"payload differences {diffs}, pools/db ids match {same}")
+    print(f"    full: {took_full * 1e3:8.1f} ms")
+    print(f" refresh: {took_refresh * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
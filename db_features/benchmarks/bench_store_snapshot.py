@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Store boot: building Game24Store from puzzle rows (what a worker does when
+it reads the DB) vs installing the binary snapshot written by
+`flask game24-rebuild-store` (app/games/core/store_snapshot.py).
+
+Usage (from db_features/):
+    python -m benchmarks.bench_store_snapshot
+    python -m benchmarks.bench_store_snapshot --copies 4 --repeat 5
+
+Rows:
+  - rows       _build_caches over answers.json rows (the DB query itself,
+               which the snapshot also skips, is not counted)
+  - write      write_snapshot to a temp file
+  - snapshot   a fresh store's _load_snapshot (mmap, checksum, array copies)
+Every payload of the snapshot-booted store is compared with the original.
+"""
+from __future__ import annotations
+import argparse, tempfile, time
+from pathlib import Path
+
+from app.games.core.puzzle_store_game24 import Game24Store
+from benchmarks.bench_store_layout import build_columns, load_rows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--copies", type=int, default=1, help="Copies of answers.json under fresh case_ids.")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    rows = load_rows(args.copies)
+    took_rows = took_snap = float("inf")
+    for _ in range(args.repeat):
+        t0 = time.perf_counter()
+        store = build_columns(rows)
+        took_rows = min(took_rows, time.perf_counter() - t0)
+    store.watermark = {"bench": len(rows)}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "game24_store.snapshot"
+        t0 = time.perf_counter()
+        size = store.write_snapshot(path)
+        took_write = time.perf_counter() - t0
+        for _ in range(args.repeat):
+            fresh = Game24Store()
+            fresh.watermark = store.watermark
+            t0 = time.perf_counter()
+            assert fresh._load_snapshot(path)
+            took_snap = min(took_snap, time.perf_counter() - t0)
+
+    diffs = sum(store.get_by_id(cid) != fresh.get_by_id(cid) for cid in store.ids)
+    print(f"rows: {len(store)}, snapshot {size / 1024:.0f} KiB, payload differences {diffs}")
+    print(f"     rows: {took_rows * 1e3:8.1f} ms")
+    print(f"    write: {took_write * 1e3:8.1f} ms")
+    print(f" snapshot: {took_snap * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
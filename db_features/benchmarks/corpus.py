@@ -0,0 +1,91 @@
+"""
+Shared expression corpus for the evaluator benchmarks and fuzzers.
+
+- load_corpus(): every book solution in answers.json plus variants of it the
+  way students type them (rank letters, × ÷ − glyphs, no spaces, one
+  operator swapped so about half the answers are wrong).
+- random_expression() / mutate(): random well-formed expressions over a hand
+  (rank letters, glyphs, unary signs, ^ / ** with small exponents, redundant
+  parentheses) and character-level mutations of them.
+"""
+from __future__ import annotations
+import json, random, re
+from pathlib import Path
+from typing import List, Tuple
+
+ANSWERS = Path(__file__).resolve().parents[1] / "app" / "games" / "game24" / "static" / "answers.json"
+
+Case = Tuple[List[int], int, str]   # values, target, answer
+
+_RANK_LETTER = {1: "A", 11: "J", 12: "Q", 13: "K"}
+_GLYPH = {"*": "×", "/": "÷", "-": "−"}
+
+
+def _variant(expr: str, rng: random.Random) -> str:
+    out = expr
+    if rng.random() < 0.4:
+        out = re.sub(r"\b(1|11|12|13)\b", lambda m: _RANK_LETTER[int(m.group(1))], out)
+    if rng.random() < 0.4:
+        out = "".join(_GLYPH.get(c, c) if rng.random() < 0.5 else c for c in out)
+    if rng.random() < 0.3:
+        out = out.replace(" ", "")
+    if rng.random() < 0.5:
+        ops = [i for i, c in enumerate(out) if c in "+-*/"]
+        if ops:
+            i = rng.choice(ops)
+            out = out[:i] + rng.choice("+-*/") + out[i + 1:]
+    return out
+
+
+def load_corpus(variants: int = 2, seed: int = 7) -> List[Case]:
+    rng = random.Random(seed)
+    rows = json.loads(ANSWERS.read_text(encoding="utf-8"))
+    cases: List[Case] = []
+    for row in rows:
+        cards = [int(c) for c in row["cards"]]
+        for sol in row.get("solutions") or []:
+            cases.append((cards, 24, sol))
+            cases.extend((cards, 24, _variant(sol, rng)) for _ in range(variants))
+    return cases
+
+
+_LETTER = {1: "A", 10: "T", 11: "J", 12: "Q", 13: "K"}
+_OPS = ["+", "-", "*", "/", "^", "**", "×", "÷", "−", "·"]
+_NOISE = list("+-*/^() 0123456789AJQKx.×÷−")
+
+
+def _literal(v: int, rng: random.Random) -> str:
+    if v in _LETTER and rng.random() < 0.3:
+        return _LETTER[v].lower() if rng.random() < 0.2 else _LETTER[v]
+    return str(v)
+
+
+def random_expression(vals: List[int], rng: random.Random) -> str:
+    if len(vals) == 1:
+        s = _literal(vals[0], rng)
+    else:
+        k = rng.randint(1, len(vals) - 1)
+        op = rng.choice(_OPS)
+        right = random_expression(vals[k:], rng)
+        if op in ("^", "**"):   # keep exponents small so every evaluator stays cheap
+            right = rng.choice(["2", "3", "-1", "0", "13", "(1/2)"]) if rng.random() < 0.7 else right
+        sp = " " if rng.random() < 0.5 else ""
+        s = f"{random_expression(vals[:k], rng)}{sp}{op}{sp}{right}"
+    if rng.random() < 0.3:
+        s = f"({s})"
+    if rng.random() < 0.1:
+        s = rng.choice(["-", "+", "--"]) + s
+    return s
+
+
+def mutate(s: str, rng: random.Random) -> str:
+    """Drop, duplicate or insert one character."""
+    if not s:
+        return s
+    i = rng.randrange(len(s))
+    kind = rng.random()
+    if kind < 0.33:
+        return s[:i] + s[i + 1:]
+    if kind < 0.66:
+        return s[:i] + s[i] + s[i:]
+    return s[:i] + rng.choice(_NOISE) + s[i:]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Differential fuzz: single-pass expr_parser checker vs the previous ast-based
+checker (reference copy in bench_expr_parser), same verdict and reason; and
+the compiled closures of evaluator.py vs the parser's own value.
+
+Usage (from db_features/):
+    python -m benchmarks.fuzz_expr_parser
+    python -m benchmarks.fuzz_expr_parser --cases 200000 --seed 3
+
+Inputs come from benchmarks/corpus.py: random well-formed expressions over a
+random 4-card hand and character-level mutations of them, so syntax errors,
+wrong literals, division by zero and oversized powers are all exercised. Exits non-zero on any verdict / result mismatch.
+
+Known, intended differences:
+  - input that is valid Python but not arithmetic (calls like 7(A), //,
+    names): both reject it, the old path with "Unsafe or invalid
+    expression", the parser with the card message it gives any syntax error.
+    Counted as reason-only differences, not failures.
+  - a negative base with a fractional exponent: the old float fallback
+    reported a complex "result"; the parser rejects it as invalid.
+  - decimal literals (not generated): the old check truncated them (2.5
+    counted as the card 2); the parser never matches them to a card.
+"""
+from __future__ import annotations
+import argparse, random, sys
+
+from app.games.core.evaluator import EvalError, ExprSyntaxError, evaluate
+from app.games.core.expr_parser import parse_expression
+from benchmarks.bench_expr_parser import CARD_REASON, INVALID_REASON, legacy_check, parser_check
+from benchmarks.corpus import mutate, random_expression
+
+
+def _compiled_agrees(ans: str) -> bool:
+    """evaluate() and parse_expression() accept the same input and give the same value."""
+    try:
+        parsed = parse_expression(ans)
+    except ExprSyntaxError:
+        try:
+            evaluate(ans)
+        except ExprSyntaxError:
+            return True
+        return False
+    try:
+        value = evaluate(ans)
+    except EvalError:
+        return parsed.value is None
+    if parsed.value is None or isinstance(value, tuple) != parsed.exact:
+        return False
+    return value == parsed.value if parsed.exact else abs(value - parsed.value) <= 1e-9 * max(1.0, abs(value))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--cases", type=int, default=50_000)
+    ap.add_argument("--seed", type=int, default=1)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    bad = reason_only = 0
+    verdicts = {"correct": 0, "cards": 0, "invalid": 0, "wrong": 0}
+    for _ in range(args.cases):
+        vals = [rng.randint(1, 13) for _ in range(4)]
+        order = vals[:]
+        rng.shuffle(order)
+        ans = random_expression(order, rng)
+        if rng.random() < 0.4:
+            ans = mutate(ans, rng)
+        target = rng.choice([24, 24, 10, 1, 0])
+        old = legacy_check(vals, target, ans)
+        new = parser_check(vals, target, ans)
+        if old != new and not old[0] and not new[0] and (
+            {old[1], new[1]} == {CARD_REASON, INVALID_REASON}
+            or (new[1] == INVALID_REASON and "j, target" in old[1])   # complex result
+        ):
+            reason_only += 1
+        elif old != new:
+            bad += 1
+            if bad <= 20:
+                print(f"MISMATCH {vals} t={target} {ans!r}: legacy={old} parser={new}")
+        if not _compiled_agrees(ans):
+            bad += 1
+            if bad <= 20:
+                print(f"MISMATCH compiled vs parser {ans!r}")
+        reason = new[1]
+        verdicts["correct" if new[0] else "cards" if "card" in reason
+                 else "invalid" if "invalid" in reason else "wrong"] += 1
+    print(f"{args.cases} cases, {bad} mismatches, {reason_only} reason-only (see docstring); "
+          f"parser verdicts: {verdicts}")
+    sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()